@@ -22,12 +22,19 @@ from modules.moduloB1_jubilacion import mostrar_moduloB1
 from modules.moduloC_bonos import mostrar_moduloC
 from modules.moduloB2_pension import mostrar_moduloB2
 from reporte import mostrar_reporte
+from modules.ejecucion import (
+    ejecutar_modulo, iniciar_ejecucion_completa, mostrar_latencias, mostrar_memoria_sesion,
+    registrar_ejecucion_completa
+)
+from nucleo.cache import estadisticas_cache, limpiar_caches, memoria_cache, obtener_almacen
 
 
 # Navegación del sidebar se implementa con HTML/JS para hacer scroll sin recarga
 
 
 def main():
+    inicio = iniciar_ejecucion_completa()
+
     # Sidebar con enlaces que hacen scroll dentro de la misma página
     with st.sidebar:
         st.title("Navegación")
@@ -41,7 +48,40 @@ def main():
         st.markdown("---")
         st.markdown("Navega entre módulos rápidamente haciendo click en estas opciones.")
 
-    # Área principal: renderizamos TODOS los módulos en orden, con anclas HTML
+        # Aciertos y fallos de los cálculos memoizados
+        with st.expander("⚙️ Caché de cálculos"):
+            estadisticas = estadisticas_cache()
+            memoria = memoria_cache()
+            aciertos = sum(e["aciertos"] + e["aciertos_disco"] for e in estadisticas)
+            llamadas = aciertos + sum(e["fallos"] for e in estadisticas)
+            st.metric("Tasa de aciertos", f"{aciertos / llamadas:.0%}" if llamadas else "—")
+            st.caption(f"Memoria: {memoria['bytes'] / 2**20:,.1f} de {memoria['max_bytes'] / 2**20:,.0f} MB")
+            if estadisticas:
+                st.dataframe(
+                    [{"Función": e["funcion"].rsplit(".", 1)[-1], "Aciertos": e["aciertos"] + e["aciertos_disco"],
+                      "Fallos": e["fallos"], "Aciertos (%)": round(e["tasa_aciertos"] * 100, 1),
+                      "Entradas": f"{e['entradas']}/{e['max_entradas']}", "MB": round(e["bytes"] / 2**20, 2),
+                      "En SQLite": e["disco"]["entradas"]}
+                     for e in estadisticas],
+                    hide_index=True
+                )
+            almacen = obtener_almacen()
+            if almacen is not None:
+                disco = sum(e["disco"]["bytes"] for e in estadisticas) / 2**20
+                st.caption(f"💾 SQLite: `{almacen.ruta}` · {disco:,.1f} de {almacen.max_bytes / 2**20:,.0f} MB")
+            # 🧹 Vaciar la memoria del proceso; el archivo SQLite solo si se pide
+            vaciar_disco = almacen is not None and st.checkbox("Vaciar también SQLite")
+            if st.button("🧹 Vaciar caché"):
+                limpiar_caches(disco=vaciar_disco)
+
+        # 🧠 Memoria de la sesión por clave y presupuesto por sesión
+        mostrar_memoria_sesion()
+
+        # 🐞 Latencia de la página completa frente a la de cada módulo
+        mostrar_latencias()
+
+    # Área principal: renderizamos TODOS los módulos en orden, con anclas HTML.
+    # Cada módulo es un fragmento: sus controles solo vuelven a ejecutar ese módulo
     st.header("Simulador de Fondo de Jubilación")
 
     # Introducción/Resumen arriba de Módulo A
@@ -63,33 +103,33 @@ def main():
     # Ancla y Módulo A
     st.markdown('<div id="modA"></div>', unsafe_allow_html=True)
     st.markdown("## Módulo A – Crecimiento de Cartera")
-    mostrar_moduloA()
+    ejecutar_modulo("A", mostrar_moduloA)
 
     st.markdown("---")
 
     # Ancla y Módulo B1
     st.markdown('<div id="modB1"></div>', unsafe_allow_html=True)
     st.markdown("## Módulo B1 – Impuestos y Saldo Neto")
-    mostrar_moduloB1()
+    ejecutar_modulo("B1", mostrar_moduloB1)
 
     st.markdown("---")
 
     # Ancla y Módulo B2
     st.markdown('<div id="modB2"></div>', unsafe_allow_html=True)
     st.markdown("## Módulo B2 – Proyección de Pensión")
-    mostrar_moduloB2()
+    ejecutar_modulo("B2", mostrar_moduloB2)
 
     st.markdown("---")
 
     # Ancla y Módulo C
     st.markdown('<div id="modC"></div>', unsafe_allow_html=True)
     st.markdown("## Módulo C – Bonos")
-    mostrar_moduloC()
+    ejecutar_modulo("C", mostrar_moduloC)
 
     st.markdown("---")
 
     # Usar el módulo separado para renderizar la sección de reporte
-    mostrar_reporte()
+    ejecutar_modulo("Reporte", mostrar_reporte)
 
     # No usamos query params; el comportamiento de scroll se logra con enlaces hash
 
@@ -114,6 +154,7 @@ def main():
     </script>
     """
     st.markdown(scroll_js, unsafe_allow_html=True)
+    registrar_ejecucion_completa(inicio)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
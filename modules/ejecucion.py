@@ -0,0 +1,193 @@
+import os
+import time
+
+import streamlit as st
+
+from nucleo.cache import calcular_llave, estimar_tamaño
+from nucleo.grafo import GrafoResultados
+
+
+# Claves de session_state que cada módulo deja para los que dependen de él.
+# Orden de dependencias: A → B1 → B2 → reporte y C → reporte.
+SALIDAS_MODULOS = {
+    "A": ("saldo_bruto", "aportes_totales", "interes_total", "monto_inicial",
+          "aporte_periodico", "frecuencia_aporte", "tea", "edad_actual", "edad_jubilacion"),
+    "B1": ("saldo_neto", "tipo_inversion", "tasa_impuesto", "monto_impuesto", "ganancia"),
+    "B2": ("pension_mensual", "total_recibido", "total_neto", "tasa_retorno", "años_retiro",
+           "tasa_impuesto_retiro", "escenarios_B2", "pension_vitalicia"),
+    "C": ("bono_vp", "bono_params", "bono_riesgo"),
+    "Reporte": (),
+}
+
+# Ejecuciones que se guardan para el panel de latencia
+MAX_LATENCIAS = 60
+
+# Memoria máxima de st.session_state por sesión (MB)
+PRESUPUESTO_SESION_MB = float(os.environ.get("SIMULADOR_SESION_MB", 8))
+
+# Claves que se pueden descartar para respetar el presupuesto, de la que menos se pierde a la que más:
+# el registro de latencias y las simulaciones Monte Carlo opcionales (basta con volver a simular)
+CLAVES_DESCARTABLES = ("latencias", "montecarlo_B2", "montecarlo_A")
+
+
+def _huella_salidas(nombre):
+    """Llave que cambia cuando cambia alguna salida del módulo."""
+    valores = tuple(st.session_state.get(clave) for clave in SALIDAS_MODULOS[nombre])
+    try:
+        return calcular_llave(nombre, valores, {})
+    except TypeError:
+        return repr(valores)
+
+
+def obtener_grafo():
+    """Grafo de resultados versionados de la sesión (ver `nucleo.grafo`)."""
+    if "grafo_resultados" not in st.session_state:
+        st.session_state["grafo_resultados"] = GrafoResultados()
+    return st.session_state["grafo_resultados"]
+
+
+def iniciar_ejecucion_completa():
+    """
+    Marca el inicio de una ejecución de toda la página (al principio de `main`).
+
+    Retorna:
+    --------
+    inicio : float
+        time.perf_counter() para `registrar_ejecucion_completa`
+    """
+    st.session_state["ejecucion_completa"] = True
+    return time.perf_counter()
+
+
+def es_ejecucion_parcial():
+    """
+    True si Streamlit solo está ejecutando fragmentos (no la página completa).
+
+    Los fragmentos que se vuelven a ejecutar solos no pasan por `main`, así que
+    la marca de `iniciar_ejecucion_completa` sigue apagada por la última
+    `registrar_ejecucion_completa`. Si una ejecución completa se interrumpe, la
+    marca queda encendida y la siguiente ejecución parcial se toma como completa
+    (solo se omite volver a ejecutar la página).
+    """
+    return not st.session_state.get("ejecucion_completa", True)
+
+
+def registrar_latencia(ejecucion, modulo, inicio):
+    """Guarda la duración (desde `inicio`, de time.perf_counter) de una ejecución."""
+    latencias = st.session_state.setdefault("latencias", [])
+    latencias.append({"Ejecución": ejecucion, "Módulo": modulo,
+                      "ms": round((time.perf_counter() - inicio) * 1000, 1)})
+    del latencias[:-MAX_LATENCIAS]
+
+
+@st.fragment
+def ejecutar_modulo(nombre, mostrar):
+    """
+    Ejecuta un módulo como fragmento: al interactuar con sus controles solo se
+    vuelve a ejecutar este módulo, no toda la página.
+
+    Si en esa ejecución parcial cambian las salidas del módulo, se vuelve a
+    ejecutar la aplicación completa para que los módulos que dependen de él
+    (ver `SALIDAS_MODULOS`) se actualicen.
+
+    Parámetros:
+    -----------
+    nombre : str
+        Llave del módulo en `SALIDAS_MODULOS`
+    mostrar : callable
+        Función que dibuja el módulo (mostrar_moduloA, ...)
+    """
+    parcial = es_ejecucion_parcial()
+    huella = _huella_salidas(nombre)
+    inicio = time.perf_counter()
+    mostrar()
+    registrar_latencia("parcial" if parcial else "completa", nombre, inicio)
+    if parcial and _huella_salidas(nombre) != huella:
+        st.rerun(scope="app")
+
+
+def memoria_sesion():
+    """
+    Bytes aproximados de cada clave de st.session_state (ver `estimar_tamaño`).
+
+    Retorna:
+    --------
+    filas : list[dict]
+        {"Clave", "bytes"} por clave, de mayor a menor
+    """
+    filas = [{"Clave": str(clave), "bytes": estimar_tamaño(valor)} for clave, valor in st.session_state.items()]
+    return sorted(filas, key=lambda fila: fila["bytes"], reverse=True)
+
+
+def respetar_presupuesto_sesion(max_bytes=None):
+    """
+    Descarta claves de `CLAVES_DESCARTABLES` hasta que la sesión quede dentro del presupuesto.
+
+    Parámetros:
+    -----------
+    max_bytes : int, opcional
+        Presupuesto; por defecto PRESUPUESTO_SESION_MB
+
+    Retorna:
+    --------
+    total : int
+        Bytes de la sesión después de descartar
+    descartadas : list[str]
+        Claves que se borraron
+    """
+    if max_bytes is None:
+        max_bytes = PRESUPUESTO_SESION_MB * 2**20
+    total = sum(fila["bytes"] for fila in memoria_sesion())
+    descartadas = []
+    for clave in CLAVES_DESCARTABLES:
+        if total <= max_bytes:
+            break
+        if clave in st.session_state:
+            total -= estimar_tamaño(st.session_state[clave])
+            del st.session_state[clave]
+            descartadas.append(clave)
+    return total, descartadas
+
+
+def registrar_ejecucion_completa(inicio):
+    """Guarda la duración de la ejecución de toda la página y apaga la marca de `iniciar_ejecucion_completa`."""
+    registrar_latencia("completa", "App", inicio)
+    st.session_state["ejecucion_completa"] = False
+
+
+@st.fragment
+def mostrar_latencias():
+    """Panel de depuración con la latencia de las últimas ejecuciones completas y parciales."""
+    if not st.toggle("🐞 Latencia de ejecuciones", key="mostrar_latencias"):
+        return
+    latencias = st.session_state.get("latencias", [])
+    if not latencias:
+        st.caption("Todavía no hay ejecuciones registradas.")
+        return
+
+    completas = [l["ms"] for l in latencias if l["Módulo"] == "App"]
+    parciales = [l["ms"] for l in latencias if l["Ejecución"] == "parcial"]
+    col1, col2 = st.columns(2)
+    col1.metric("Página completa", f"{sum(completas) / len(completas):,.0f} ms" if completas else "—",
+                help="Promedio: lo que costaba cualquier interacción antes de aislar los módulos.")
+    col2.metric("Solo el módulo", f"{sum(parciales) / len(parciales):,.0f} ms" if parciales else "—",
+                help="Promedio de las ejecuciones parciales (un módulo).")
+    st.dataframe(latencias[::-1][:20], hide_index=True)
+    st.button("🔄 Actualizar", key="actualizar_latencias")
+
+
+def mostrar_memoria_sesion():
+    """Panel con la memoria de la sesión por clave frente al presupuesto (aplicándolo antes)."""
+    total, descartadas = respetar_presupuesto_sesion()
+    presupuesto = PRESUPUESTO_SESION_MB * 2**20
+    with st.expander("🧠 Memoria de la sesión"):
+        st.metric("Sesión", f"{total / 2**10:,.1f} KB", help="Tamaño aproximado de st.session_state.")
+        st.progress(min(total / presupuesto, 1.0), text=f"Presupuesto: {PRESUPUESTO_SESION_MB:,.0f} MB")
+        if descartadas:
+            st.warning(f"Se descartaron para respetar el presupuesto: {', '.join(descartadas)}.")
+        elif total > presupuesto:
+            st.warning("La sesión supera el presupuesto aun sin las claves descartables.")
+        st.dataframe(
+            [{"Clave": fila["Clave"], "KB": round(fila["bytes"] / 2**10, 1)} for fila in memoria_sesion()],
+            hide_index=True
+        )
@@ -0,0 +1,155 @@
+"""
+Capa de gráficos: las figuras de matplotlib se convierten en PNG, se cierran
+siempre y el PNG se memoiza según los datos, así que volver a ejecutar la
+página con los mismos datos no crea ninguna figura nueva.
+
+Mediciones:
+    python -m modules.graficos [ejecuciones] [--sin-cache]   # memoria en 1,000 ejecuciones simuladas
+    python -m modules.graficos --bonos                       # tiempo de la gráfica de flujos de bonos
+"""
+import io
+from functools import wraps
+
+import numpy as np
+import matplotlib.pyplot as plt
+import streamlit as st
+
+from nucleo.cache import memoizar
+
+
+# Puntos por serie como máximo al dibujar calendarios largos
+MAX_PUNTOS_GRAFICO = 600
+
+# Resolución de los PNG
+DPI_GRAFICOS = 100
+
+
+def reducir_puntos(n, max_puntos=MAX_PUNTOS_GRAFICO):
+    """
+    Índices de a lo sumo `max_puntos` posiciones repartidas uniformemente en
+    una serie de `n` puntos, incluidas la primera y la última.
+
+    Retorna:
+    --------
+    indices : numpy.ndarray
+        Todos los índices si n <= max_puntos
+    """
+    if n <= max_puntos:
+        return np.arange(n)
+    return np.unique(np.linspace(0, n - 1, max_puntos).round().astype(np.int64))
+
+
+def figura_a_png(fig, dpi=DPI_GRAFICOS):
+    """Dibuja la figura en PNG y la cierra (aunque falle el dibujo)."""
+    try:
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png", dpi=dpi)
+        return buffer.getvalue()
+    finally:
+        plt.close(fig)
+
+
+def grafico_cacheado(funcion=None, *, max_entradas=32):
+    """
+    Convierte una función que crea una figura en otra que devuelve el PNG,
+    memoizado por sus entradas (DataFrames y arreglos incluidos).
+
+    Parámetros:
+    -----------
+    funcion : callable
+        Función que devuelve una matplotlib.figure.Figure
+    max_entradas : int
+        Imágenes guardadas en memoria para esta función
+
+    Retorna:
+    --------
+    renderizar : callable
+        Misma firma que `funcion`; devuelve bytes PNG
+    """
+    def decorar(funcion):
+        @wraps(funcion)
+        def renderizar(*args, **kwargs):
+            return figura_a_png(funcion(*args, **kwargs))
+
+        renderizar.__qualname__ = f"{funcion.__qualname__}[png]"
+        return memoizar(renderizar, max_entradas=max_entradas)
+
+    return decorar(funcion) if funcion is not None else decorar
+
+
+def mostrar_grafico(png):
+    """Muestra un PNG de `grafico_cacheado` con el ancho del contenedor (como st.pyplot)."""
+    st.image(png, width="stretch")
+
+
+def _medir_memoria(n_ejecuciones, sin_cache):
+    """Memoria en ejecuciones simuladas: cada una redibuja los gráficos de A, B2 y C
+    con uno de varios juegos de datos, como al mover los controles."""
+    import resource
+    import time
+
+    from modules.moduloA_cartera import graficar_crecimiento
+    from modules.moduloB2_pension import graficar_retiro
+    from modules.moduloC_bonos import graficar_flujos_bono
+    from nucleo.bonos import calcular_flujos_bono
+    from nucleo.cartera import calcular_calendario_cartera
+    from nucleo.pension import simular_retiro
+
+    juegos = [
+        ((calcular_calendario_cartera(5000, 200, "Mensual", tea, 30, 65),),
+         (simular_retiro(300000, tasa / 100, 25, 0.05),),
+         (calcular_flujos_bono(1000, 5, 12, tea, 30)['valor_descontado'], 12))
+        for tea, tasa in ((6, 4), (8, 5), (10, 6))
+    ]
+    graficos = (graficar_crecimiento, graficar_retiro, graficar_flujos_bono)
+    if sin_cache:
+        # Como antes: una figura nueva por ejecución, sin cerrarla
+        dibujar = [lambda *datos, f=f: f(*datos).canvas.draw() for f in graficos]
+    else:
+        dibujar = [grafico_cacheado(f) for f in graficos]
+
+    def memoria_mb():
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize() / 2**20
+
+    print(f"{'ejecución':>10} {'memoria (MB)':>13} {'figuras abiertas':>17} {'ms/ejecución':>13}")
+    inicio = time.perf_counter()
+    for i in range(1, n_ejecuciones + 1):
+        for funcion, datos in zip(dibujar, juegos[i % len(juegos)]):
+            funcion(*datos)
+        if i % (n_ejecuciones // 10 or 1) == 0:
+            ms = (time.perf_counter() - inicio) * 1000 / i
+            print(f"{i:>10,} {memoria_mb():>13,.1f} {len(plt.get_fignums()):>17,} {ms:>13,.1f}")
+
+
+def _medir_grafica_bonos(periodos=(10, 100, 1000, 10000), frecuencia=4, repeticiones=3):
+    """Tiempo de crear y dibujar la gráfica de flujos, frente a una barra con etiqueta por periodo."""
+    import time
+
+    from modules.moduloC_bonos import graficar_flujos_bono
+
+    def barras_categoricas(valores, frecuencia):
+        fig, ax = plt.subplots(figsize=(6, 3))
+        ax.bar(np.arange(1, len(valores) + 1).astype(str), valores, color='#2b8cbe')
+        plt.tight_layout()
+        return fig
+
+    print(f"{'periodos':>9} {'barras por periodo (ms)':>24} {'eje numérico (ms)':>18}")
+    for n in periodos:
+        valores = 50 / 1.015 ** np.arange(1, n + 1)
+        tiempos = []
+        for graficar in (barras_categoricas, graficar_flujos_bono):
+            inicio = time.perf_counter()
+            for _ in range(repeticiones):
+                figura_a_png(graficar(valores, frecuencia))
+            tiempos.append((time.perf_counter() - inicio) * 1000 / repeticiones)
+        print(f"{n:>9,} {tiempos[0]:>24,.1f} {tiempos[1]:>18,.1f}")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if "--bonos" in sys.argv:
+        _medir_grafica_bonos()
+    else:
+        _medir_memoria(int(next((a for a in sys.argv[1:] if a.isdigit()), 1000)), "--sin-cache" in sys.argv)
@@ -1,169 +1,88 @@
+from functools import partial
+
 import streamlit as st
-import numpy as np
-import pandas as pd
 import matplotlib.pyplot as plt
 
+from nucleo.cartera import (
+    COLUMNAS_TABLA_CARTERA, FRECUENCIAS, calcular_tasa_periodo, calcular_resumen_cartera, calcular_tabla_cartera,
+    calcular_calendario_cartera, pagina_tabla_cartera, resumir_tabla_cartera_por_año,
+    simular_crecimiento_cartera, simular_cartera_lote, simular_cartera_lote_df
+)
+from nucleo.montecarlo import simular_montecarlo_cartera
+from nucleo.cache import memoizar
+from modules.ejecucion import obtener_grafo
+from modules.graficos import grafico_cacheado, mostrar_grafico, reducir_puntos
 
-def calcular_tasa_periodo(tea, frecuencia):
-    """
-    Convierte la TEA a tasa por periodo según la frecuencia de aportes.
-    
-    Parámetros:
-    -----------
-    tea : float
-        Tasa Efectiva Anual (en decimal, ej: 0.08 para 8%)
-    frecuencia : str
-        "Mensual", "Trimestral", "Semestral", "Anual"
-    
-    Retorna:
-    --------
-    tasa_periodo : float
-        Tasa equivalente por periodo
-    periodos_por_año : int
-        Número de periodos en un año
-    """
-    frecuencias = {
-        "Mensual": 12,
-        "Trimestral": 4,
-        "Semestral": 2,
-        "Anual": 1
-    }
-    
-    periodos_por_año = frecuencias[frecuencia]
-    
-    # Fórmula de tasa equivalente: (1 + TEA)^(1/n) - 1
-    tasa_periodo = (1 + tea) ** (1 / periodos_por_año) - 1
-    
-    return tasa_periodo, periodos_por_año
 
+# Interfaz pública; los nombres del motor (`nucleo.cartera`) se reexportan para las importaciones existentes
+__all__ = [
+    "FRECUENCIAS", "calcular_tasa_periodo", "calcular_resumen_cartera", "calcular_tabla_cartera",
+    "simular_crecimiento_cartera", "simular_cartera_lote", "simular_cartera_lote_df",
+    "FILAS_POR_PAGINA", "graficar_crecimiento", "graficar_crecimiento_png", "mostrar_tabla_cartera",
+    "mostrar_moduloA",
+]
 
-def simular_crecimiento_cartera(monto_inicial, aporte_periodico, frecuencia, tea, edad_actual, edad_jubilacion):
-    """
-    Simula el crecimiento de una cartera con interés compuesto.
-    Ahora los aportes se consideran al FINAL del periodo.
-    
-    Parámetros:
-    -----------
-    monto_inicial : float
-        Depósito inicial en USD
-    aporte_periodico : float
-        Aporte regular en USD (0 si no hay aportes)
-    frecuencia : str
-        "Mensual", "Trimestral", "Semestral", "Anual"
-    tea : float
-        Tasa Efectiva Anual en porcentaje (ej: 8 para 8%)
-    edad_actual : int
-        Edad actual del usuario
-    edad_jubilacion : int
-        Edad planeada de jubilación
-    
-    Retorna:
-    --------
-    df_resultados : pandas.DataFrame
-        Tabla detallada periodo por periodo
-    saldo_final : float
-        Capital acumulado al final del plazo
-    total_aportado : float
-        Total de dinero aportado (inicial + aportes)
-    interes_total_ganado : float
-        Total de intereses generados
-    """
-    
-    # Validaciones básicas
-    if edad_jubilacion <= edad_actual:
-        raise ValueError("La edad de jubilación debe ser mayor a la edad actual")
-    if tea < 0 or tea > 50:
-        raise ValueError("La TEA debe estar entre 0% y 50%")
-    if monto_inicial < 0 or aporte_periodico < 0:
-        raise ValueError("Los montos no pueden ser negativos")
-    
-    # Cálculos iniciales
-    plazo_años = edad_jubilacion - edad_actual
-    tea_decimal = tea / 100  # Convertir porcentaje a decimal
-    tasa_periodo, periodos_por_año = calcular_tasa_periodo(tea_decimal, frecuencia)
-    total_periodos = plazo_años * periodos_por_año
-    
-    # Inicializar listas para almacenar resultados
-    periodos = []
-    saldos_iniciales = []
-    aportes = []
-    intereses = []
-    saldos_finales = []
-    
-    # Simulación periodo por periodo
-    saldo = monto_inicial
-    
-    for periodo in range(total_periodos + 1):
-        # Registrar estado inicial del periodo
-        periodos.append(periodo)
-        saldos_iniciales.append(saldo)
-        
-        if periodo == 0:
-            # En el periodo 0 solo tenemos el monto inicial, no hay aporte ni intereses aún
-            aportes.append(0.0)  # 👈 NO hay aporte en el periodo 0
-            intereses.append(0.0)
-            saldos_finales.append(saldo)
-        else:
-            # Calcular interés sobre el saldo INICIAL del periodo
-            interes_periodo = saldo * tasa_periodo
-            # Nuevo saldo al final del periodo: saldo + interes + aporte
-            saldo = saldo + interes_periodo + aporte_periodico  # 👈 Aporte se suma DESPUÉS del interés
-            
-            # Registrar valores para este periodo
-            aportes.append(aporte_periodico)
-            intereses.append(interes_periodo)
-            saldos_finales.append(saldo)
 
-    # Crear DataFrame con resultados
-    df_resultados = pd.DataFrame({
-        'Periodo': periodos,
-        'Saldo Inicial (USD)': saldos_iniciales,
-        'Aporte (USD)': aportes,
-        'Interés Ganado (USD)': intereses,
-        'Saldo Final (USD)': saldos_finales
-    })
-    
-    # Redondear a 2 decimales
-    df_resultados = df_resultados.round(2)
-    
-    # Calcular métricas finales
-    saldo_final = saldos_finales[-1]
-    total_aportado = monto_inicial + (aporte_periodico * total_periodos)  # Incluye el monto inicial
-    interes_total_ganado = saldo_final - total_aportado
-    
-    return df_resultados, saldo_final, total_aportado, interes_total_ganado
+# Versiones memoizadas: las mismas entradas devuelven el resultado guardado
+# (la simulación Monte Carlo siempre recibe semilla, así que es determinista).
+# El calendario no se guarda en cada sesión: se regenera de los parámetros y esta
+# caché del proceso lo comparte entre todas las sesiones con el mismo plan.
+calcular_calendario_cartera_cache = memoizar(calcular_calendario_cartera, max_entradas=32)
+simular_montecarlo_cartera_cache = memoizar(simular_montecarlo_cartera, max_entradas=16)
 
+# Filas por página de la tabla por periodo
+FILAS_POR_PAGINA = 50
 
-def graficar_crecimiento(df_resultados):
+
+def graficar_crecimiento(columnas, bandas=None):
     """
     Genera gráfica de crecimiento de la cartera usando matplotlib.
     
     Parámetros:
     -----------
-    df_resultados : pandas.DataFrame
-        Tabla con los resultados periodo por periodo
+    columnas : dict[str, numpy.ndarray] or pandas.DataFrame
+        Calendario periodo por periodo (resultado de `calcular_calendario_cartera`);
+        también acepta el `df_resultados` de `simular_crecimiento_cartera`
+    bandas : dict, opcional
+        Resultado de `simular_montecarlo_cartera`; si se indica, se dibuja el
+        abanico de percentiles (P5–P95, P25–P75 y mediana) sobre la gráfica
     
     Retorna:
     --------
     fig : matplotlib.figure.Figure
-        Figura de matplotlib para mostrar en Streamlit
+        Figura de matplotlib para mostrar en Streamlit (con a lo sumo
+        MAX_PUNTOS_GRAFICO puntos por serie)
     """
-    # Calcular aportes acumulados por periodo
-    aportes_acumulados = df_resultados['Aporte (USD)'].cumsum()
+    if hasattr(columnas, 'columns'):
+        columnas = {clave: columnas[nombre].to_numpy() for nombre, clave in COLUMNAS_TABLA_CARTERA.items()}
+
+    # Calcular aportes acumulados por periodo (sobre la tabla completa) y reducir los puntos a dibujar
+    indices = reducir_puntos(len(columnas['periodo']))
+    aportes_acumulados = columnas['aporte'].cumsum()[indices]
+    periodo = columnas['periodo'][indices]
+    saldo_final = columnas['saldo_final'][indices]
     
     # Crear la gráfica
     fig, ax = plt.subplots(figsize=(12, 6))
     
-    ax.plot(df_resultados['Periodo'], df_resultados['Saldo Final (USD)'], 
+    ax.plot(periodo, saldo_final, 
             label='Saldo Total', linewidth=2.5, color='#2E86AB')
-    ax.plot(df_resultados['Periodo'], aportes_acumulados, 
+    ax.plot(periodo, aportes_acumulados, 
             label='Aportes Acumulados', linewidth=2, color='#A23B72', linestyle='--')
     
-    ax.fill_between(df_resultados['Periodo'], 
+    ax.fill_between(periodo, 
                     aportes_acumulados, 
-                    df_resultados['Saldo Final (USD)'],
+                    saldo_final,
                     alpha=0.3, color='#06D6A0', label='Intereses Ganados')
     
+    if bandas is not None:
+        indices = reducir_puntos(len(bandas['periodos']))
+        periodos = bandas['periodos'][indices]
+        p = {percentil: valores[indices] for percentil, valores in bandas['percentiles'].items()}
+        ax.fill_between(periodos, p[5], p[95], alpha=0.15, color='#F18F01', label='Rango P5–P95')
+        ax.fill_between(periodos, p[25], p[75], alpha=0.3, color='#F18F01', label='Rango P25–P75')
+        ax.plot(periodos, p[50], label='Mediana (P50)', linewidth=2, color='#C73E1D')
+    
     ax.set_xlabel('Periodo', fontsize=12)
     ax.set_ylabel('Monto (USD)', fontsize=12)
     ax.set_title('Crecimiento de la Cartera en el Tiempo', fontsize=14, fontweight='bold')
@@ -178,6 +97,45 @@ def graficar_crecimiento(df_resultados):
     return fig
 
 
+# PNG memoizado según los datos: la figura se crea (y se cierra) solo cuando cambian
+graficar_crecimiento_png = grafico_cacheado(graficar_crecimiento)
+
+
+def mostrar_tabla_cartera(columnas, periodos_por_año):
+    """
+    Tabla del calendario por año (con detalle de un año) o por periodo en páginas.
+    Solo se formatean y se envían al navegador las filas visibles.
+    """
+    opcion_tabla = st.radio(
+        "Selecciona qué mostrar:",
+        ["Resumen por año", "Por periodo"],
+        horizontal=True
+    )
+    n_periodos = len(columnas['periodo']) - 1
+
+    if opcion_tabla == "Resumen por año":
+        st.dataframe(resumir_tabla_cartera_por_año(columnas, periodos_por_año),
+                     width="stretch", hide_index=True)
+        n_años = -(-n_periodos // periodos_por_año)
+        año = st.selectbox(
+            "Ver los periodos de un año:",
+            [None] + list(range(1, n_años + 1)),
+            format_func=lambda a: "—" if a is None else f"Año {a}"
+        )
+        if año is not None:
+            inicio = 1 + (año - 1) * periodos_por_año
+            st.dataframe(pagina_tabla_cartera(columnas, inicio, inicio + periodos_por_año),
+                         width="stretch", hide_index=True)
+        return
+
+    n_paginas = n_periodos // FILAS_POR_PAGINA + 1  # La fila 0 (monto inicial) va en la primera página
+    pagina = st.number_input(f"Página (de {n_paginas})", min_value=1, max_value=n_paginas, value=1, step=1)
+    inicio = (pagina - 1) * FILAS_POR_PAGINA
+    fin = min(inicio + FILAS_POR_PAGINA, n_periodos + 1)
+    st.dataframe(pagina_tabla_cartera(columnas, inicio, fin), width="stretch", hide_index=True)
+    st.caption(f"Periodos {inicio} a {fin - 1} de {n_periodos}.")
+
+
 def mostrar_moduloA():
     """
     Módulo A: Crecimiento de cartera.
@@ -253,6 +211,54 @@ def mostrar_moduloA():
             help="Edad a la que planeas jubilarte. Debe ser mayor a tu edad actual."
         )
     
+    # ============ MODO DE SIMULACIÓN ============
+    modo = st.radio(
+        "Modo de simulación",
+        ["Determinista (TEA fija)", "Estocástico (Monte Carlo)"],
+        horizontal=True,
+        help="El modo estocástico simula miles de trayectorias con rendimientos aleatorios alrededor de la TEA."
+    )
+    estocastico = modo.startswith("Estocástico")
+    
+    if estocastico:
+        col_mc1, col_mc2 = st.columns(2)
+        with col_mc1:
+            volatilidad = st.number_input(
+                "Volatilidad anual (%)",
+                min_value=0.0,
+                max_value=100.0,
+                value=15.0,
+                step=1.0,
+                help="Desviación estándar anual de los rendimientos. La TEA se usa como rendimiento medio."
+            )
+            distribucion = st.selectbox(
+                "Distribución de rendimientos",
+                options=["normal", "lognormal"],
+                help="Normal: rendimientos simétricos. Lognormal: el valor nunca puede caer a cero en un periodo."
+            )
+        with col_mc2:
+            n_trayectorias = st.number_input(
+                "Número de trayectorias",
+                min_value=100,
+                max_value=200000,
+                value=10000,
+                step=1000,
+                help="Más trayectorias dan percentiles más estables pero tardan más."
+            )
+            semilla = st.number_input(
+                "Semilla aleatoria",
+                min_value=0,
+                value=42,
+                step=1,
+                help="Con la misma semilla se obtienen exactamente los mismos resultados."
+            )
+    
+    # Entradas del resultado de A: si cambian sin volver a calcular, B1, B2 y el reporte quedan desactualizados
+    parametros = dict(monto_inicial=monto_inicial, aporte_periodico=aporte_periodico, frecuencia=frecuencia,
+                      tea=tea, edad_actual=edad_actual, edad_jubilacion=edad_jubilacion)
+    grafo = obtener_grafo()
+    grafo.observar("A", parametros)
+
     # ============ VALIDACIONES ============
     if monto_inicial == 0 and aporte_periodico == 0:
         st.warning("⚠️ Debes ingresar al menos un monto inicial o un aporte periódico.")
@@ -263,22 +269,17 @@ def mostrar_moduloA():
         return None, None
     
     # ============ BOTÓN PARA CALCULAR ============
-    if st.button("🚀 Calcular Crecimiento", type="primary", use_container_width=True):
+    if st.button("🚀 Calcular Crecimiento", type="primary", width="stretch"):
         
         try:
             with st.spinner("Calculando proyección..."):
                 # Ejecutar simulación
-                df_resultados, saldo_final, total_aportado, interes_total = simular_crecimiento_cartera(
-                    monto_inicial=monto_inicial,
-                    aporte_periodico=aporte_periodico,
-                    frecuencia=frecuencia,
-                    tea=tea,
-                    edad_actual=edad_actual,
-                    edad_jubilacion=edad_jubilacion
+                # (el resultado de A son solo los totales; el calendario se regenera al mostrarlo)
+                (saldo_final, total_aportado, interes_total), _ = grafo.actualizar(
+                    "A", parametros, partial(calcular_resumen_cartera, **parametros)
                 )
                 
                 plazo_años = edad_jubilacion - edad_actual
-                rentabilidad = (interes_total / total_aportado) * 100 if total_aportado > 0 else 0
 
                 # ============ MOSTRAR RESULTADOS ============
                 st.divider()
@@ -300,12 +301,7 @@ def mostrar_moduloA():
                 # ============ GUARDAR EN SESSION STATE ============
                 st.session_state['saldo_bruto'] = saldo_final
                 st.session_state['aportes_totales'] = total_aportado
-                st.session_state['df_resultados'] = df_resultados
-                st.session_state['rentabilidad'] = rentabilidad
-                st.session_state['plazo_años'] = plazo_años
                 st.session_state['interes_total'] = interes_total
-                st.session_state['saldo_final'] = saldo_final
-                st.session_state['total_aportado'] = total_aportado
 
                 # Guardar inputs y edades en session_state para el reporte
                 st.session_state['monto_inicial'] = float(monto_inicial)
@@ -315,41 +311,62 @@ def mostrar_moduloA():
                 st.session_state['edad_actual'] = int(edad_actual)
                 st.session_state['edad_jubilacion'] = int(edad_jubilacion)
                 
+                # ============ SIMULACIÓN MONTE CARLO (OPCIONAL) ============
+                # (la sesión guarda los argumentos; los percentiles quedan en la caché compartida)
+                if estocastico:
+                    argumentos_montecarlo = dict(
+                        monto_inicial=monto_inicial,
+                        aporte_periodico=aporte_periodico,
+                        frecuencia=frecuencia,
+                        tea=tea,
+                        volatilidad=volatilidad,
+                        edad_actual=edad_actual,
+                        edad_jubilacion=edad_jubilacion,
+                        n_trayectorias=int(n_trayectorias),
+                        distribucion=distribucion,
+                        semilla=int(semilla)
+                    )
+                    simular_montecarlo_cartera_cache(**argumentos_montecarlo)
+                    st.session_state['montecarlo_A'] = argumentos_montecarlo
+                else:
+                    st.session_state.pop('montecarlo_A', None)
+                
                 st.success("✅ Cálculo completado. Los valores se han guardado para usar en el Módulo B (Jubilación).")
         
         except Exception as e:
             st.error(f"❌ Error en el cálculo: {str(e)}")
 
     # ============ MOSTRAR RESULTADOS SI EXISTEN EN SESSION STATE ============
-    if 'df_resultados' in st.session_state:
-        df_resultados = st.session_state['df_resultados']
-        saldo_final = st.session_state['saldo_final']
-        total_aportado = st.session_state['total_aportado']
-        interes_total = st.session_state['interes_total']
-        rentabilidad = st.session_state['rentabilidad']
-        plazo_años = st.session_state['plazo_años']
+    if 'saldo_bruto' in st.session_state:
+        saldo_final = st.session_state['saldo_bruto']
+        total_aportado = st.session_state['aportes_totales']
+        columnas = calcular_calendario_cartera_cache(
+            monto_inicial=st.session_state['monto_inicial'],
+            aporte_periodico=st.session_state['aporte_periodico'],
+            frecuencia=st.session_state['frecuencia_aporte'],
+            tea=st.session_state['tea'],
+            edad_actual=st.session_state['edad_actual'],
+            edad_jubilacion=st.session_state['edad_jubilacion']
+        )
     
+        argumentos_montecarlo = st.session_state.get('montecarlo_A')
+        montecarlo = None if argumentos_montecarlo is None else simular_montecarlo_cartera_cache(**argumentos_montecarlo)
+        
+        # ============ RESULTADOS MONTE CARLO ============
+        if montecarlo is not None:
+            st.markdown("### 🎲 Distribución del saldo final (Monte Carlo)")
+            st.caption(f"{montecarlo['n_trayectorias']:,} trayectorias simuladas.")
+            cols_p = st.columns(len(montecarlo['percentiles']))
+            for col_p, (p, valores) in zip(cols_p, montecarlo['percentiles'].items()):
+                col_p.metric(f"P{p}", f"${valores[-1]:,.0f}")
+        
         # ============ GRÁFICA ============
         st.markdown("### 📉 Gráfica de Crecimiento")
-        fig = graficar_crecimiento(df_resultados)
-        st.pyplot(fig)
+        mostrar_grafico(graficar_crecimiento_png(columnas, bandas=montecarlo))
         
         # ============ TABLA DETALLADA ============
         st.markdown("### 📋 Tabla Detallada de Crecimiento")
-        
-        # Mostrar opciones de visualización
-        opcion_tabla = st.radio(
-            "Selecciona qué mostrar:",
-            ["Primeros 10 periodos", "Últimos 10 periodos", "Tabla completa"],
-            horizontal=True
-        )
-        
-        if opcion_tabla == "Primeros 10 periodos":
-            st.dataframe(df_resultados.head(10), use_container_width=True)
-        elif opcion_tabla == "Últimos 10 periodos":
-            st.dataframe(df_resultados.tail(10), use_container_width=True)
-        else:
-            st.dataframe(df_resultados, use_container_width=True, height=400)
+        mostrar_tabla_cartera(columnas, FRECUENCIAS[st.session_state['frecuencia_aporte']])
         
         # Retornar valores para integración
         return saldo_final, total_aportado  
@@ -1,5 +1,11 @@
+from functools import partial
+
 import streamlit as st
 
+from nucleo.impuestos import calcular_saldo_neto, obtener_tasa_impuesto
+from modules.ejecucion import obtener_grafo
+
+
 def mostrar_moduloB1():
     """
     Módulo B1: Cálculo del saldo neto en jubilación tras impuestos.
@@ -38,12 +44,11 @@ def mostrar_moduloB1():
         help="Determina la tasa de impuesto: 5% (BVL) o 29.5% (BEX) sobre **las ganancias**."
     )
 
-    # 5. Cálculos
-    anos_inversion = edad_jubilacion - edad_actual
-    ganancia = max(0.0, saldo_bruto - aportes_totales)  # Nunca negativa
-    tasa_impuesto = 0.05 if "BVL" in tipo_inversion else 0.295
-    monto_impuesto = ganancia * tasa_impuesto
-    saldo_neto = saldo_bruto - monto_impuesto
+    # 5. Cálculos (solo si cambió el tipo de inversión o el resultado del Módulo A)
+    tasa_impuesto = obtener_tasa_impuesto(tipo_inversion)
+    (ganancia, monto_impuesto, saldo_neto), recalculado = obtener_grafo().actualizar(
+        "B1", tipo_inversion, partial(calcular_saldo_neto, saldo_bruto, aportes_totales, tasa_impuesto)  # Ganancia nunca negativa
+    )
 
     # 6. Mostrar resultados
     st.divider()
@@ -59,9 +64,10 @@ def mostrar_moduloB1():
     st.write(f"- **Impuesto a pagar:** USD ${monto_impuesto:,.2f}")
     st.success(f"### Saldo neto disponible: **USD ${saldo_neto:,.2f}**")
 
-    # 7. Guardar en session_state para Módulo B2
+    # 7. Guardar en session_state para Módulo B2 (sin reescribirlo si no cambió)
+    if not recalculado:
+        return saldo_neto
     st.session_state["saldo_neto"] = saldo_neto
-    st.session_state["anos_inversion"] = anos_inversion  # Por si acaso
 
     # Guardar parámetros/entradas relevantes para el reporte
     st.session_state["tipo_inversion"] = tipo_inversion
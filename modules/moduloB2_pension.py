@@ -1,11 +1,457 @@
-import streamlit as st
+from functools import partial
+
 import numpy as np
+import streamlit as st
+import matplotlib.pyplot as plt
+
+from nucleo.impuestos import obtener_tasa_impuesto
+from nucleo.pension import calcular_pension, comparar_escenarios, simular_retiro
+from nucleo.montecarlo import simular_montecarlo_retiro
+from nucleo.mortalidad import (
+    RUTA_TABLA_MORTALIDAD, SEXOS, calcular_pension_vitalicia, esperanza_vida, leer_tabla_mortalidad
+)
+from nucleo.objetivo import resolver_aporte, resolver_monto_inicial, resolver_tea, resolver_edad_jubilacion
+from nucleo.cache import memoizar
+from modules.ejecucion import obtener_grafo
+from modules.graficos import grafico_cacheado, mostrar_grafico, reducir_puntos
+from modules.moduloB2_sensibilidad import mostrar_sensibilidad
+
+
+# Versiones memoizadas: las mismas entradas devuelven el resultado guardado
+calcular_pension_cache = memoizar(calcular_pension)
+calcular_pension_vitalicia_cache = memoizar(calcular_pension_vitalicia)
+simular_retiro_cache = memoizar(simular_retiro, max_entradas=16)
+simular_montecarlo_retiro_cache = memoizar(simular_montecarlo_retiro, max_entradas=8)
+
+
+# Escenarios con los que arranca la tabla de comparación
+ESCENARIOS_INICIALES = {
+    "Edad de retiro": [60, 65],
+    "Tasa de retorno (%)": [5.0, 6.0],
+    "Años de jubilación": [20, 18],
+}
+
+# Escenarios que se grafican como máximo (la tabla los muestra todos)
+MAXIMO_ESCENARIOS_GRAFICO = 30
+
+# Mejores escenarios que se guardan en la sesión para el reporte
+ESCENARIOS_REPORTE = 5
+
+# Parámetro del Módulo A que se despeja y formato de su resultado
+VARIABLES_OBJETIVO = {
+    "Aporte periódico": "${:,.2f}",
+    "Monto inicial": "${:,.2f}",
+    "TEA": "{:,.2f}%",
+    "Edad de jubilación": "{:.0f} años",
+}
+
+
+def mostrar_pension_objetivo(tasa_retorno, años_retiro, aviso=None):
+    """
+    Calcula en vivo cuánto debe valer un parámetro del Módulo A para alcanzar
+    una pensión mensual objetivo, con los demás datos de A, B1 y B2 fijos.
+    `aviso` se muestra bajo el título (por ejemplo, que la pensión es a plazo fijo).
+    """
+    requeridos = ("monto_inicial", "aporte_periodico", "frecuencia_aporte", "tea", "edad_actual", "edad_jubilacion")
+    if any(st.session_state.get(clave) is None for clave in requeridos):
+        return None
+
+    st.divider()
+    st.markdown("### 🎯 Pensión objetivo")
+    if aviso:
+        st.caption(aviso)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        pension_objetivo = st.number_input(
+            "Pensión mensual deseada (USD):",
+            min_value=1.0,
+            value=1500.0,
+            step=100.0,
+            help="Pensión mensual que quieres recibir."
+        )
+    with col2:
+        variable = st.radio(
+            "Parámetro a calcular:",
+            list(VARIABLES_OBJETIVO),
+            help="Los demás parámetros se toman del Módulo A, el impuesto de B1 y el retiro de arriba."
+        )
+
+    datos = dict(
+        frecuencia=st.session_state["frecuencia_aporte"],
+        edad_actual=st.session_state["edad_actual"],
+        tasa_impuesto=st.session_state.get("tasa_impuesto", 0.0),
+        tasa_retorno=tasa_retorno,
+        años_retiro=años_retiro
+    )
+    monto_inicial = st.session_state["monto_inicial"]
+    aporte_periodico = st.session_state["aporte_periodico"]
+    tea = st.session_state["tea"]
+    edad_jubilacion = st.session_state["edad_jubilacion"]
+
+    if variable == "Aporte periódico":
+        valor = resolver_aporte(pension_objetivo, monto_inicial, tea=tea, edad_jubilacion=edad_jubilacion, **datos)
+        actual = aporte_periodico
+    elif variable == "Monto inicial":
+        valor = resolver_monto_inicial(pension_objetivo, aporte_periodico, tea=tea,
+                                       edad_jubilacion=edad_jubilacion, **datos)
+        actual = monto_inicial
+    elif variable == "TEA":
+        valor = resolver_tea(pension_objetivo, monto_inicial, aporte_periodico,
+                             edad_jubilacion=edad_jubilacion, **datos)
+        actual = tea
+    else:
+        valor = resolver_edad_jubilacion(pension_objetivo, monto_inicial, aporte_periodico, tea=tea, **datos)
+        actual = edad_jubilacion
+
+    valor = float(valor)
+    formato = VARIABLES_OBJETIVO[variable]
+    if not np.isfinite(valor):
+        st.warning(f"⚠️ Con los demás parámetros actuales no es posible alcanzar ${pension_objetivo:,.2f} "
+                   f"variando solo el parámetro «{variable}».")
+    else:
+        st.success(f"🎯 Para una pensión de ${pension_objetivo:,.2f}: {variable} = **{formato.format(valor)}** "
+                   f"(actual: {formato.format(actual)})")
+    return valor
+
+
+def graficar_retiro(df_retiro):
+    """
+    Gráfica del saldo durante el retiro y de la parte de cada retiro que es interés.
+
+    Parámetros:
+    -----------
+    df_retiro : pandas.DataFrame
+        Resultado de `simular_retiro`
+
+    Retorna:
+    --------
+    fig : matplotlib.figure.Figure
+    """
+    df_retiro = df_retiro.iloc[reducir_puntos(len(df_retiro))]
+    años = df_retiro['Mes'] / 12
+    fig, (ax_saldo, ax_retiro) = plt.subplots(2, 1, figsize=(12, 7), sharex=True,
+                                              gridspec_kw={'height_ratios': [2, 1]})
+
+    ax_saldo.plot(años, df_retiro['Saldo Final (USD)'], color='#2E86AB', linewidth=2.5, label='Saldo')
+    ax_saldo.fill_between(años, 0, df_retiro['Saldo Final (USD)'], color='#2E86AB', alpha=0.2)
+    ax_saldo.set_ylabel('Saldo (USD)', fontsize=12)
+    ax_saldo.set_title('Evolución del Saldo durante el Retiro', fontsize=14, fontweight='bold')
+    ax_saldo.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x:,.0f}'))
+    ax_saldo.grid(True, alpha=0.3)
+
+    # Cada retiro se divide en interés del mes y devolución de capital
+    interes = df_retiro['Interés (USD)']
+    ax_retiro.fill_between(años, 0, interes, color='#F18F01', alpha=0.6, label='Interés')
+    ax_retiro.fill_between(años, interes, df_retiro['Retiro (USD)'], color='#A23B72', alpha=0.6, label='Capital')
+    ax_retiro.set_xlabel('Años de retiro', fontsize=12)
+    ax_retiro.set_ylabel('Retiro mensual', fontsize=12)
+    ax_retiro.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x:,.0f}'))
+    ax_retiro.legend(loc='upper right', fontsize=10)
+    ax_retiro.grid(True, alpha=0.3)
+
+    plt.tight_layout()
+    return fig
+
+
+# PNG memoizados según los datos: las figuras se crean (y se cierran) solo cuando cambian
+graficar_retiro_png = grafico_cacheado(graficar_retiro)
+
+
+def mostrar_calendario_retiro(saldo_neto, tasa_retorno, años_retiro, tasa_impuesto, pension_mensual=None):
+    """
+    Calendario mes a mes del retiro (saldo, interés, retiro e impuesto).
+    Se recalcula en cada ejecución a partir de los datos ya guardados en
+    session_state, así que la tabla no se guarda aparte.
+
+    Con `pension_mensual` (pensión vitalicia) cada mes se retira ese monto del
+    saldo y el calendario termina cuando el saldo se agota.
+    """
+    st.markdown("### 📆 Calendario mensual del retiro")
+    df_retiro = simular_retiro_cache(saldo_neto, tasa_retorno, años_retiro, tasa_impuesto, pension_mensual)
+    if pension_mensual is not None:
+        meses = len(df_retiro)
+        if meses < años_retiro * 12:
+            st.caption(
+                f"Retirando la pensión vitalicia de ${pension_mensual:,.2f} cada mes, tu saldo se agota en el mes "
+                f"{meses} ({meses / 12:,.1f} años). Desde ahí la pensión se sigue pagando con el aporte de los "
+                f"afiliados que fallecen antes (por eso es mayor que una anualidad al mismo plazo)."
+            )
+        else:
+            st.caption(f"Retiros de la pensión vitalicia de ${pension_mensual:,.2f} durante {años_retiro} años.")
+
+    mostrar_grafico(graficar_retiro_png(df_retiro))
+
+    opcion_tabla = st.radio(
+        "Meses del calendario a mostrar:",
+        ["Primeros 12 meses", "Últimos 12 meses", "Tabla completa"],
+        horizontal=True,
+        key="calendario_retiro_vista"
+    )
+    if opcion_tabla == "Primeros 12 meses":
+        st.dataframe(df_retiro.head(12), width="stretch")
+    elif opcion_tabla == "Últimos 12 meses":
+        st.dataframe(df_retiro.tail(12), width="stretch")
+    else:
+        st.dataframe(df_retiro, width="stretch", height=400)
+    return df_retiro
+
+
+def graficar_montecarlo_retiro(montecarlo, edad_inicio):
+    """
+    Bandas de percentiles del saldo durante el retiro e histograma de la edad de agotamiento.
+
+    Parámetros:
+    -----------
+    montecarlo : dict
+        Resultado de `simular_montecarlo_retiro`
+    edad_inicio : int
+        Edad al iniciar el retiro (0 para expresar el eje en años de retiro)
+
+    Retorna:
+    --------
+    fig : matplotlib.figure.Figure
+    """
+    indices = reducir_puntos(len(montecarlo['periodos']))
+    edades = edad_inicio + montecarlo['periodos'][indices]
+    p = {percentil: valores[indices] for percentil, valores in montecarlo['percentiles'].items()}
+    fig, (ax_saldo, ax_ruina) = plt.subplots(1, 2, figsize=(12, 5))
+
+    ax_saldo.fill_between(edades, p[5], p[95], alpha=0.15, color='#F18F01', label='Rango P5–P95')
+    ax_saldo.fill_between(edades, p[25], p[75], alpha=0.3, color='#F18F01', label='Rango P25–P75')
+    ax_saldo.plot(edades, p[50], label='Mediana (P50)', linewidth=2, color='#C73E1D')
+    ax_saldo.set_xlabel('Edad' if edad_inicio else 'Años de retiro', fontsize=12)
+    ax_saldo.set_ylabel('Saldo (USD)', fontsize=12)
+    ax_saldo.set_title('Saldo durante el retiro', fontsize=14, fontweight='bold')
+    ax_saldo.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x:,.0f}'))
+    ax_saldo.legend(fontsize=10)
+    ax_saldo.grid(True, alpha=0.3)
+
+    edades_agotamiento = montecarlo['edades_agotamiento']
+    if len(edades_agotamiento):
+        ax_ruina.hist(edades_agotamiento, bins=min(40, len(montecarlo['periodos'])), color='#A23B72', alpha=0.8)
+    else:
+        ax_ruina.text(0.5, 0.5, 'Ninguna trayectoria se agotó', ha='center', va='center',
+                      transform=ax_ruina.transAxes)
+    ax_ruina.set_xlabel('Edad al agotarse el fondo' if edad_inicio else 'Años hasta agotarse', fontsize=12)
+    ax_ruina.set_ylabel('Trayectorias', fontsize=12)
+    ax_ruina.set_title('¿Cuándo se agota el fondo?', fontsize=14, fontweight='bold')
+    ax_ruina.grid(True, alpha=0.3)
+
+    plt.tight_layout()
+    return fig
+
+
+graficar_montecarlo_retiro_png = grafico_cacheado(graficar_montecarlo_retiro)
+
+
+def mostrar_riesgo_secuencia(saldo_neto, pension_mensual, tasa_retorno, años_retiro, edad_jubilacion):
+    """
+    Modo estocástico del retiro: simula trayectorias de rendimientos mensuales
+    retirando la pensión cada mes y muestra la probabilidad de agotar el fondo.
+    """
+    st.markdown("### 🎲 Riesgo de secuencia de rendimientos")
+    modo = st.radio(
+        "Modo del retiro",
+        ["Determinista (tasa fija)", "Estocástico (Monte Carlo)"],
+        horizontal=True,
+        help="El modo estocástico retira la pensión cada mes con rendimientos aleatorios alrededor de la tasa de retorno.",
+        key="modo_retiro_B2"
+    )
+    if not modo.startswith("Estocástico"):
+        return None
+
+    col_mc1, col_mc2 = st.columns(2)
+    with col_mc1:
+        volatilidad = st.number_input(
+            "Volatilidad anual en el retiro (%)",
+            min_value=0.0,
+            max_value=100.0,
+            value=10.0,
+            step=1.0,
+            help="Desviación estándar anual de los rendimientos. La tasa de retorno se usa como rendimiento medio."
+        )
+        distribucion = st.selectbox(
+            "Distribución de rendimientos",
+            options=["normal", "lognormal"],
+            help="Normal: rendimientos simétricos. Lognormal: el valor nunca puede caer a cero en un periodo.",
+            key="distribucion_retiro_B2"
+        )
+    with col_mc2:
+        n_trayectorias = st.number_input(
+            "Número de trayectorias",
+            min_value=100,
+            max_value=200000,
+            value=10000,
+            step=1000,
+            help="Más trayectorias dan probabilidades más estables pero tardan más.",
+            key="trayectorias_retiro_B2"
+        )
+        semilla = st.number_input(
+            "Semilla aleatoria",
+            min_value=0,
+            value=42,
+            step=1,
+            help="Con la misma semilla se obtienen exactamente los mismos resultados.",
+            key="semilla_retiro_B2"
+        )
+
+    parametros = (float(saldo_neto), float(pension_mensual), float(tasa_retorno), float(volatilidad),
+                  int(años_retiro), distribucion, int(n_trayectorias), int(semilla))
+    if st.button("🎲 Simular retiro"):
+        # La sesión guarda solo los argumentos; las trayectorias resumidas quedan en la caché compartida
+        argumentos = {
+            'saldo_neto': saldo_neto, 'pension_mensual': pension_mensual, 'tasa_retorno': tasa_retorno,
+            'volatilidad': volatilidad, 'años_retiro': años_retiro, 'edad_jubilacion': edad_jubilacion or 0,
+            'n_trayectorias': int(n_trayectorias), 'distribucion': distribucion, 'semilla': int(semilla)
+        }
+        with st.spinner("Simulando trayectorias del retiro..."):
+            simular_montecarlo_retiro_cache(**argumentos)
+        st.session_state['montecarlo_B2'] = {'parametros': parametros, 'argumentos': argumentos}
+
+    simulacion = st.session_state.get('montecarlo_B2')
+    if simulacion is None:
+        return None
+    if simulacion['parametros'] != parametros:
+        st.info("Los parámetros cambiaron desde la última simulación. Pulsa **🎲 Simular retiro** para actualizarla.")
+        return None
+
+    montecarlo = simular_montecarlo_retiro_cache(**simulacion['argumentos'])
+    percentiles_edad = montecarlo['percentiles_edad_agotamiento']
+    col_r1, col_r2, col_r3 = st.columns(3)
+    col_r1.metric("Probabilidad de agotar el fondo", f"{montecarlo['probabilidad_ruina']:.1%}")
+    col_r2.metric("Saldo final mediano (P50)", f"${montecarlo['percentiles'][50][-1]:,.0f}")
+    if percentiles_edad:
+        col_r3.metric("Agotamiento mediano (P50)", f"{percentiles_edad[50]:,.1f} años")
+    st.caption(
+        f"{montecarlo['n_trayectorias']:,} trayectorias · retiro mensual de ${pension_mensual:,.2f} · "
+        "las trayectorias agotadas dejan de simularse."
+    )
+
+    mostrar_grafico(graficar_montecarlo_retiro_png(montecarlo, edad_jubilacion or 0))
+    return montecarlo
+
+
+def graficar_escenarios(df_escenarios, maximo=MAXIMO_ESCENARIOS_GRAFICO):
+    """
+    Barras horizontales con la pensión mensual de los mejores escenarios.
+
+    Parámetros:
+    -----------
+    df_escenarios : pandas.DataFrame
+        Resultado de `comparar_escenarios` (ya ordenado por pensión)
+    maximo : int
+        Escenarios que se grafican como máximo
+
+    Retorna:
+    --------
+    fig : matplotlib.figure.Figure
+    """
+    df = df_escenarios.head(maximo).iloc[::-1]
+    etiquetas = [
+        f"#{e} · {edad} años · {tasa:.1f}% · {anios}a"
+        for e, edad, tasa, anios in zip(df['Escenario'], df['Edad de retiro'],
+                                        df['Tasa de retorno (%)'], df['Años de jubilación'])
+    ]
+    fig, ax = plt.subplots(figsize=(10, max(2.5, 0.3 * len(df) + 1)))
+    ax.barh(etiquetas, df['Pensión mensual'], color='#2E86AB')
+    ax.set_xlabel('Pensión mensual (USD)')
+    ax.xaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x:,.0f}'))
+    ax.set_title('Pensión mensual por escenario')
+    ax.grid(True, axis='x', alpha=0.3)
+    plt.tight_layout()
+    return fig
+
+
+graficar_escenarios_png = grafico_cacheado(graficar_escenarios)
+
+
+def mostrar_escenarios(saldo_neto, edad_actual, tasa_impuesto, aviso=None):
+    """
+    Tabla editable de escenarios (edad de retiro, tasa de retorno y años de
+    jubilación). Todos se evalúan en una sola llamada vectorizada, se ordenan
+    por pensión mensual y se guardan en session_state para el reporte.
+    `aviso` se muestra bajo el título.
+    """
+    import pandas as pd
+
+    st.divider()
+    st.markdown("### 🔍 Comparar escenarios de jubilación")
+    if aviso:
+        st.caption(aviso)
+
+    if edad_actual is None:
+        edad_actual = st.number_input("Ingresa tu edad actual (solo para comparar):", min_value=18, value=40)
+
+    st.caption("Agrega, edita o elimina filas; cada fila es un escenario.")
+    df_entrada = st.data_editor(
+        pd.DataFrame(ESCENARIOS_INICIALES),
+        num_rows="dynamic",
+        width="stretch",
+        column_config={
+            "Edad de retiro": st.column_config.NumberColumn(min_value=50, max_value=80, step=1, required=True),
+            "Tasa de retorno (%)": st.column_config.NumberColumn(min_value=0.0, step=0.1, format="%.2f",
+                                                                 required=True),
+            "Años de jubilación": st.column_config.NumberColumn(min_value=1, step=1, required=True),
+        },
+        key="escenarios_B2_entrada"
+    )
+
+    df_entrada = df_entrada.dropna()
+    if df_entrada.empty:
+        st.info("Agrega al menos un escenario.")
+        st.session_state.pop("escenarios_B2", None)
+        return None
+    descartados = int((df_entrada["Edad de retiro"] < edad_actual).sum())
+    df_entrada = df_entrada[df_entrada["Edad de retiro"] >= edad_actual]
+    if descartados:
+        st.warning(f"⚠️ Se omitieron {descartados} escenario(s) con edad de retiro menor que la edad actual ({edad_actual}).")
+    if df_entrada.empty:
+        st.session_state.pop("escenarios_B2", None)
+        return None
+
+    df_escenarios = comparar_escenarios(
+        saldo_neto, edad_actual,
+        df_entrada["Edad de retiro"].to_numpy(),
+        df_entrada["Tasa de retorno (%)"].to_numpy(dtype=float) / 100,
+        df_entrada["Años de jubilación"].to_numpy(),
+        tasa_impuesto
+    )
+    st.session_state["escenarios_B2"] = {
+        "mejores": df_escenarios.head(ESCENARIOS_REPORTE).to_dict("records"),
+        "total": len(df_escenarios),
+    }
+
+    st.markdown("#### 📊 Resultados comparativos")
+    mejor = df_escenarios.iloc[0]
+    peor = df_escenarios.iloc[-1]
+    st.success(
+        f"🟢 Mejor escenario: #{mejor['Escenario']:.0f} (retiro a los {mejor['Edad de retiro']:.0f} años, "
+        f"{mejor['Tasa de retorno (%)']:.2f}%, {mejor['Años de jubilación']:.0f} años) con una pensión de "
+        f"**${mejor['Pensión mensual']:,.2f}** al mes."
+    )
+    if len(df_escenarios) > 1:
+        st.caption(
+            f"Diferencia entre el mejor y el peor de {len(df_escenarios):,} escenarios: "
+            f"${mejor['Pensión mensual'] - peor['Pensión mensual']:,.2f} al mes "
+            f"(saldo: ${mejor['Saldo al retiro'] - peor['Saldo al retiro']:,.2f})."
+        )
+
+    mostrar_grafico(graficar_escenarios_png(df_escenarios))
+    if len(df_escenarios) > MAXIMO_ESCENARIOS_GRAFICO:
+        st.caption(f"El gráfico muestra los {MAXIMO_ESCENARIOS_GRAFICO} mejores escenarios.")
+
+    formato = {c: "${:,.2f}" for c in ("Saldo al retiro", "Pensión mensual", "Total", "Impuesto", "Total neto")}
+    formato["Tasa de retorno (%)"] = "{:.2f}%"
+    st.dataframe(df_escenarios.style.format(formato), width="stretch", hide_index=True)
+    return df_escenarios
+
 
 def mostrar_moduloB2():
     """
     Módulo B2: Proyección de pensión mensual a partir del saldo neto obtenido en B1.
     Lee el saldo_neto desde st.session_state y calcula la pensión mensual estimada.
-    También permite comparar dos escenarios de jubilación.
+    También permite comparar cualquier número de escenarios de jubilación.
     """
 
     st.subheader("💰 Módulo B2 – Proyección de pensión mensual")
@@ -28,23 +474,56 @@ def mostrar_moduloB2():
         help="Selecciona el origen de las ganancias para aplicar el impuesto correspondiente sobre la rentabilidad."
     )
 
-    if "BVL" in tipo_inversion:
-        tasa_impuesto = 0.05
-    elif "BEX" in tipo_inversion:
-        tasa_impuesto = 0.295
-    else:
-        tasa_impuesto = 0.0
+    tasa_impuesto = obtener_tasa_impuesto(tipo_inversion)
 
     # 2️⃣ Parámetros principales del retiro
     st.markdown("### 📆 Parámetros del retiro")
 
-    años_retiro = st.number_input(
-        "Años estimados de jubilación:",
-        min_value=1,
-        value=20,
-        step=1,
-        help="Número de años que esperas recibir la pensión."
+    duracion = st.radio(
+        "Duración de la pensión:",
+        ["Plazo fijo (años)", "Vitalicia (tabla de mortalidad)"],
+        horizontal=True,
+        help="La pensión vitalicia se paga mientras vivas; su monto se calcula con la probabilidad de supervivencia de cada mes."
     )
+    vitalicia = duracion.startswith("Vitalicia")
+
+    if vitalicia:
+        col_v1, col_v2 = st.columns(2)
+        with col_v1:
+            ruta_tabla = st.text_input(
+                "Tabla de mortalidad (CSV con columnas edad, sexo, qx):",
+                value=RUTA_TABLA_MORTALIDAD,
+                help="Ruta local del archivo. La tabla incluida es ilustrativa; usa la tabla oficial para cálculos reales."
+            )
+        try:
+            tabla = leer_tabla_mortalidad(ruta_tabla)
+        except (OSError, ValueError) as e:
+            st.error(f"❌ No se pudo leer la tabla de mortalidad: {str(e)}")
+            return None
+        with col_v2:
+            sexo = st.selectbox(
+                "Sexo:",
+                options=list(tabla.sexos),
+                format_func=lambda codigo: SEXOS.get(codigo, codigo)
+            )
+        if edad_jubilacion is None:
+            edad_jubilacion = st.number_input("Edad al jubilarse:", min_value=18, max_value=int(tabla.edades[-1]), value=65)
+        esperanza = esperanza_vida(edad_jubilacion, sexo, tabla)
+        # El calendario, la pensión objetivo y la sensibilidad usan la esperanza de vida como horizonte
+        años_retiro = max(1, int(round(esperanza)))
+        st.caption(
+            f"Esperanza de vida a los {edad_jubilacion} años: **{esperanza:,.1f} años**. "
+            f"El calendario retira la pensión vitalicia cada mes; la pensión objetivo, los escenarios "
+            f"y la sensibilidad se calculan a plazo fijo ({años_retiro} años o los de cada escenario)."
+        )
+    else:
+        años_retiro = st.number_input(
+            "Años estimados de jubilación:",
+            min_value=1,
+            value=20,
+            step=1,
+            help="Número de años que esperas recibir la pensión."
+        )
 
     tasa_retorno = st.number_input(
         "Tasa de retorno anual durante el retiro (%):",
@@ -58,93 +537,62 @@ def mostrar_moduloB2():
     # 3️⃣ Cálculo de pensión mensual base
     st.markdown("### 🧮 Cálculo de pensión mensual")
 
-    tasa_mensual = tasa_retorno / 12
-    n_meses = años_retiro * 12
-
-    if tasa_mensual == 0:
-        pension_mensual = saldo_neto / n_meses
+    # Solo se recalcula si cambian estos parámetros o el saldo neto de B1
+    if vitalicia:
+        entradas = ("vitalicia", tasa_retorno, edad_jubilacion, sexo, tabla, tasa_impuesto)
+        calcular = partial(calcular_pension_vitalicia_cache, saldo_neto, tasa_retorno, edad_jubilacion, sexo, tabla,
+                           tasa_impuesto)
     else:
-        pension_mensual = saldo_neto * (tasa_mensual / (1 - (1 + tasa_mensual) ** -n_meses))
-
-    total_recibido = pension_mensual * n_meses
-    ganancia_total = total_recibido - saldo_neto
-    impuesto_final = ganancia_total * tasa_impuesto
-    total_neto = total_recibido - impuesto_final
+        entradas = ("plazo_fijo", tasa_retorno, años_retiro, tasa_impuesto)
+        calcular = partial(calcular_pension_cache, saldo_neto, tasa_retorno, años_retiro, tasa_impuesto)
+    resultado, recalculado = obtener_grafo().actualizar("B2", entradas, calcular)
+    pension_mensual, total_recibido, ganancia_total, impuesto_final, total_neto = resultado
 
     st.success(f"💵 Pensión mensual estimada: **${pension_mensual:,.2f} USD**")
-    st.write(f"Total estimado recibido en {años_retiro} años (neto): **${total_neto:,.2f} USD**")
+    if vitalicia:
+        st.write(f"Total esperado recibido en vida (neto): **${total_neto:,.2f} USD**")
+    else:
+        st.write(f"Total estimado recibido en {años_retiro} años (neto): **${total_neto:,.2f} USD**")
     st.caption(f"(Impuesto aplicado sobre ganancia: ${impuesto_final:,.2f})")
 
-    # 4️⃣ Comparar escenarios
-    st.divider()
-    st.markdown("### 🔍 Comparar escenarios de jubilación")
+    # 📆 Calendario mes a mes del retiro
+    # En modo vitalicio se retira la pensión mostrada arriba (no la anualidad a `años_retiro`)
+    mostrar_calendario_retiro(saldo_neto, tasa_retorno, años_retiro, tasa_impuesto,
+                              pension_mensual if vitalicia else None)
 
-    col1, col2 = st.columns(2)
-    with col1:
-        edad_1 = st.number_input("Edad de retiro (escenario 1):", min_value=50, max_value=80, value=60)
-        tasa_1 = st.number_input("Tasa de retorno anual (escenario 1) %:", min_value=0.0, value=5.0, step=0.1) / 100
-        años_retiro_1 = st.number_input("Años de jubilación (escenario 1):", min_value=1, value=20, step=1)
-    with col2:
-        edad_2 = st.number_input("Edad de retiro (escenario 2):", min_value=50, max_value=80, value=65)
-        tasa_2 = st.number_input("Tasa de retorno anual (escenario 2) %:", min_value=0.0, value=6.0, step=0.1) / 100
-        años_retiro_2 = st.number_input("Años de jubilación (escenario 2):", min_value=1, value=18, step=1)
-
-    if st.button("🔎 Comparar escenarios"):
-        if edad_actual is None:
-            edad_actual = st.number_input("Ingresa tu edad actual (solo para comparar):", min_value=18, value=40)
-
-        # Simular crecimiento del fondo hasta la edad de jubilación
-        saldo_esc1 = saldo_neto * ((1 + tasa_1) ** (edad_1 - edad_actual))
-        saldo_esc2 = saldo_neto * ((1 + tasa_2) ** (edad_2 - edad_actual))
-
-        # Calcular pensión mensual para cada escenario
-        tasa_mensual_1 = tasa_1 / 12
-        tasa_mensual_2 = tasa_2 / 12
-        n_meses_1 = años_retiro_1 * 12
-        n_meses_2 = años_retiro_2 * 12
-
-        if tasa_mensual_1 == 0:
-            pension_1 = saldo_esc1 / n_meses_1
-        else:
-            pension_1 = saldo_esc1 * (tasa_mensual_1 / (1 - (1 + tasa_mensual_1) ** -n_meses_1))
+    # 🎲 Retiro con rendimientos aleatorios (probabilidad de agotar el fondo)
+    if vitalicia:
+        # La renta vitalicia se paga mientras vivas: no hay un fondo propio que se agote
+        st.markdown("### 🎲 Riesgo de secuencia de rendimientos")
+        st.info("No aplica a la pensión vitalicia: su pago no se agota ni depende de los rendimientos de tu saldo. "
+                "Elige «Plazo fijo» para simular el riesgo de agotar el fondo.")
+    else:
+        mostrar_riesgo_secuencia(saldo_neto, pension_mensual, tasa_retorno, años_retiro, edad_jubilacion)
 
-        if tasa_mensual_2 == 0:
-            pension_2 = saldo_esc2 / n_meses_2
-        else:
-            pension_2 = saldo_esc2 * (tasa_mensual_2 / (1 - (1 + tasa_mensual_2) ** -n_meses_2))
-
-        # Aplicar impuesto sobre ganancia
-        total_1 = pension_1 * n_meses_1
-        total_2 = pension_2 * n_meses_2
-        impuesto_1 = max(0, (total_1 - saldo_esc1) * tasa_impuesto)
-        impuesto_2 = max(0, (total_2 - saldo_esc2) * tasa_impuesto)
-        total_1_neto = total_1 - impuesto_1
-        total_2_neto = total_2 - impuesto_2
-
-        # Mostrar resultados
-        st.markdown("#### 📊 Resultados comparativos")
-
-        colA, colB = st.columns(2)
-        with colA:
-            st.info(f"**Escenario 1 ({edad_1} años)**")
-            st.write(f"- Saldo acumulado: **${saldo_esc1:,.2f}**")
-            st.write(f"- Pensión mensual: **${pension_1:,.2f}**")
-            st.write(f"- Total neto: **${total_1_neto:,.2f}**")
-        with colB:
-            st.success(f"**Escenario 2 ({edad_2} años)**")
-            st.write(f"- Saldo acumulado: **${saldo_esc2:,.2f}**")
-            st.write(f"- Pensión mensual: **${pension_2:,.2f}**")
-            st.write(f"- Total neto: **${total_2_neto:,.2f}**")
-
-        diferencia_pension = pension_2 - pension_1
-        diferencia_saldo = saldo_esc2 - saldo_esc1
-
-        if diferencia_pension > 0:
-            st.success(f"🟢 Jubilarse a los {edad_2} años aumenta la pensión mensual en **${diferencia_pension:,.2f}** (y el saldo en ${diferencia_saldo:,.2f}).")
-        else:
-            st.warning(f"🟠 Jubilarse antes reduce la pensión mensual en **${abs(diferencia_pension):,.2f}** (y el saldo en ${abs(diferencia_saldo):,.2f}).")
+    # Las secciones siguientes usan la anualidad a plazo fijo, no la tabla de mortalidad
+    aviso = None
+    if vitalicia:
+        aviso = (f"Calculado como pensión a plazo fijo de {años_retiro} años (sin la tabla de mortalidad), "
+                 f"así que no coincide con la pensión vitalicia de arriba.")
 
-    # 5️⃣ Guardar resultados en session_state
+    # 🎯 Pensión objetivo: despeja un parámetro del Módulo A para llegar a la pensión deseada
+    mostrar_pension_objetivo(tasa_retorno, años_retiro, aviso)
+
+    # 4️⃣ Comparar escenarios
+    mostrar_escenarios(saldo_neto, edad_actual, tasa_impuesto,
+                       "Cada escenario es una pensión a plazo fijo (sin la tabla de mortalidad)." if vitalicia else None)
+
+    # 🗺️ Sensibilidad de la pensión neta a dos o tres parámetros a la vez
+    mostrar_sensibilidad(tasa_retorno, años_retiro, tasa_impuesto, aviso)
+
+    # 5️⃣ Guardar resultados en session_state (sin reescribirlos si no cambiaron)
+    if not recalculado:
+        return pension_mensual
+    if vitalicia:
+        st.session_state["pension_vitalicia"] = {"sexo": sexo, "edad": int(edad_jubilacion),
+                                                 "esperanza_vida": float(esperanza)}
+    else:
+        st.session_state.pop("pension_vitalicia", None)
     st.session_state["pension_mensual"] = pension_mensual
     st.session_state["total_recibido"] = total_neto
 
@@ -152,7 +600,6 @@ def mostrar_moduloB2():
     st.session_state["tasa_retorno"] = float(tasa_retorno)
     st.session_state["años_retiro"] = int(años_retiro)
     st.session_state["tasa_impuesto_retiro"] = float(tasa_impuesto)
-    st.session_state["impuesto_final"] = float(impuesto_final)
     st.session_state["total_neto"] = float(total_neto)
 
     return pension_mensual
@@ -0,0 +1,158 @@
+import streamlit as st
+import numpy as np
+import matplotlib.pyplot as plt
+
+from nucleo.sensibilidad import calcular_malla_sensibilidad
+from nucleo.cache import memoizar
+from modules.graficos import grafico_cacheado, mostrar_grafico
+
+
+# Parámetros que se pueden barrer: etiqueta, límites del control, rango y puntos por defecto,
+# y si son enteros. La tasa de retorno se muestra en % y se pasa al núcleo en decimal.
+PARAMETROS_SENSIBILIDAD = {
+    "tea": ("TEA (%)", 0.0, 50.0, 0.0, 15.0, 100, False),
+    "aporte_periodico": ("Aporte periódico (USD)", 0.0, 10000.0, 0.0, 1000.0, 100, False),
+    "edad_jubilacion": ("Edad de jubilación", 19.0, 100.0, 50.0, 89.0, 40, True),
+    "monto_inicial": ("Monto inicial (USD)", 0.0, 500000.0, 0.0, 50000.0, 100, False),
+    "tasa_retorno": ("Tasa de retorno en el retiro (%)", 0.0, 20.0, 0.0, 10.0, 50, False),
+    "años_retiro": ("Años de jubilación", 1.0, 50.0, 5.0, 40.0, 36, True),
+}
+
+EJES_POR_DEFECTO = ["tea", "aporte_periodico", "edad_jubilacion"]
+
+
+def _valores_eje(nombre, inicio, fin, puntos):
+    """Valores de un eje en las unidades del núcleo."""
+    entero = PARAMETROS_SENSIBILIDAD[nombre][-1]
+    if entero:
+        valores = np.unique(np.round(np.linspace(inicio, fin, puntos)))
+    else:
+        valores = np.linspace(inicio, fin, puntos)
+    return valores / 100 if nombre == "tasa_retorno" else valores
+
+
+@memoizar(max_entradas=8)
+def calcular_malla_cacheada(definicion_ejes, base):
+    """
+    Malla de pensión neta memoizada por definición de ejes y parámetros base,
+    para que mover el corte del tercer eje no la vuelva a calcular.
+
+    Parámetros:
+    -----------
+    definicion_ejes : tuple
+        Tuplas (nombre, inicio, fin, puntos) en el orden de los ejes
+    base : dict
+        Parámetros fijos (ver `calcular_malla_sensibilidad`)
+    """
+    ejes = {nombre: _valores_eje(nombre, inicio, fin, puntos) for nombre, inicio, fin, puntos in definicion_ejes}
+    return calcular_malla_sensibilidad(ejes, base)
+
+
+def graficar_mapa_calor(valores_x, valores_y, matriz, etiqueta_x, etiqueta_y):
+    """
+    Mapa de calor de la pensión neta: `matriz` tiene forma (len(valores_x), len(valores_y)).
+
+    Retorna:
+    --------
+    fig : matplotlib.figure.Figure
+    """
+    fig, ax = plt.subplots(figsize=(10, 6))
+    imagen = ax.imshow(
+        matriz.T, origin='lower', aspect='auto', cmap='viridis',
+        extent=(valores_x[0], valores_x[-1], valores_y[0], valores_y[-1])
+    )
+    barra = fig.colorbar(imagen, ax=ax)
+    barra.set_label('Pensión mensual neta (USD)')
+    barra.formatter = plt.FuncFormatter(lambda x, p: f'${x:,.0f}')
+    barra.update_ticks()
+    ax.set_xlabel(etiqueta_x)
+    ax.set_ylabel(etiqueta_y)
+    ax.set_title('Sensibilidad de la pensión mensual neta')
+    plt.tight_layout()
+    return fig
+
+
+graficar_mapa_calor_png = grafico_cacheado(graficar_mapa_calor, max_entradas=16)
+
+
+def mostrar_sensibilidad(tasa_retorno, años_retiro, tasa_impuesto_retiro, aviso=None):
+    """
+    Barre dos o tres parámetros de la cadena A → B1 → B2 a la vez y muestra la
+    pensión neta como mapa de calor (con un control para el corte del tercer eje).
+    `aviso` se muestra bajo el título.
+    """
+    requeridos = ("monto_inicial", "aporte_periodico", "frecuencia_aporte", "tea", "edad_actual", "edad_jubilacion")
+    if any(st.session_state.get(clave) is None for clave in requeridos):
+        return None
+
+    st.divider()
+    st.markdown("### 🗺️ Sensibilidad de la pensión")
+    if aviso:
+        st.caption(aviso)
+
+    nombres = st.multiselect(
+        "Parámetros a variar (2 o 3):",
+        list(PARAMETROS_SENSIBILIDAD),
+        default=EJES_POR_DEFECTO,
+        max_selections=3,
+        format_func=lambda nombre: PARAMETROS_SENSIBILIDAD[nombre][0],
+        help="Los dos primeros forman los ejes del mapa; el tercero se recorre con un control deslizante."
+    )
+    if len(nombres) < 2:
+        st.info("Selecciona al menos dos parámetros.")
+        return None
+
+    definicion_ejes = []
+    columnas = st.columns(len(nombres))
+    for columna, nombre in zip(columnas, nombres):
+        etiqueta, minimo, maximo, inicio, fin, puntos, entero = PARAMETROS_SENSIBILIDAD[nombre]
+        with columna:
+            if nombre == "edad_jubilacion":
+                inicio = min(max(inicio, st.session_state["edad_actual"] + 1.0), fin)
+            rango = st.slider(etiqueta, min_value=minimo, max_value=maximo, value=(inicio, fin),
+                              step=1.0 if entero else None, key=f"sens_rango_{nombre}")
+            puntos = st.number_input(f"Puntos ({etiqueta})", min_value=2, max_value=200, value=puntos,
+                                     key=f"sens_puntos_{nombre}")
+        definicion_ejes.append((nombre, float(rango[0]), float(rango[1]), int(puntos)))
+
+    base = {
+        "monto_inicial": float(st.session_state["monto_inicial"]),
+        "aporte_periodico": float(st.session_state["aporte_periodico"]),
+        "frecuencia": st.session_state["frecuencia_aporte"],
+        "tea": float(st.session_state["tea"]),
+        "edad_actual": int(st.session_state["edad_actual"]),
+        "edad_jubilacion": int(st.session_state["edad_jubilacion"]),
+        "tasa_impuesto": float(st.session_state.get("tasa_impuesto", 0.0)),
+        "tasa_retorno": float(tasa_retorno),
+        "años_retiro": int(años_retiro),
+        "tasa_impuesto_retiro": float(tasa_impuesto_retiro),
+    }
+    malla = calcular_malla_cacheada(tuple(definicion_ejes), base)
+
+    # Valores de los ejes en las unidades de la interfaz (tasa de retorno en %)
+    valores = [v * 100 if n == "tasa_retorno" else v for n, v in zip(malla.parametros, malla.valores)]
+    matriz = malla.pension_neta
+    titulo = ""
+    if len(nombres) == 3:
+        etiqueta_corte = PARAMETROS_SENSIBILIDAD[nombres[2]][0]
+        indice = st.select_slider(
+            f"Corte: {etiqueta_corte}",
+            options=list(range(len(valores[2]))),
+            value=len(valores[2]) // 2,
+            format_func=lambda i: f"{valores[2][i]:,.2f}"
+        )
+        matriz = matriz[:, :, indice]
+        titulo = f" ({etiqueta_corte} = {valores[2][indice]:,.2f})"
+
+    mostrar_grafico(graficar_mapa_calor_png(valores[0], valores[1], matriz,
+                                            PARAMETROS_SENSIBILIDAD[nombres[0]][0],
+                                            PARAMETROS_SENSIBILIDAD[nombres[1]][0]))
+
+    if np.all(np.isnan(matriz)):
+        st.warning("⚠️ Ninguna combinación tiene una edad de jubilación mayor que la edad actual.")
+    else:
+        st.caption(
+            f"Pensión neta{titulo}: mínima ${np.nanmin(matriz):,.2f} · máxima ${np.nanmax(matriz):,.2f} · "
+            f"malla de {' × '.join(str(len(v)) for v in valores)} combinaciones"
+        )
+    return malla
@@ -1,9 +1,111 @@
+from functools import partial
+
 import streamlit as st
-import pandas as pd
 import numpy as np
-import math
 import matplotlib.pyplot as plt
 
+from nucleo.bonos import OPCIONES_FRECUENCIA, analizar_riesgo_bonos, calcular_rendimiento, valorar_bono
+from nucleo.cache import memoizar
+from modules.ejecucion import obtener_grafo
+from modules.graficos import grafico_cacheado, mostrar_grafico
+
+
+# Versiones memoizadas: las mismas entradas devuelven el resultado guardado
+valorar_bono_cache = memoizar(valorar_bono)
+analizar_riesgo_bonos_cache = memoizar(analizar_riesgo_bonos, max_entradas=32)
+calcular_rendimiento_cache = memoizar(calcular_rendimiento, max_entradas=32)
+
+# Columnas que debe tener el CSV de la cartera de bonos
+COLUMNAS_CARTERA_BONOS = ("valor_nominal", "tasa_cupon", "frecuencia", "tasa_tea", "anios")
+
+# Periodos a partir de los cuales la gráfica de flujos agrega por año
+UMBRAL_FLUJOS_POR_PERIODO = 120
+
+# Formato de la tabla de choques de tasa
+FORMATO_CHOQUES = {"Valor presente": "{:,.2f}", "Variación (%)": "{:+.2f}%"}
+
+
+def tabla_choques(choques_pb, vp_choques):
+    """
+    Tabla de valor presente ante choques paralelos de la TEA.
+    
+    Parámetros:
+    -----------
+    choques_pb : numpy.ndarray
+        Choques en puntos básicos (incluye el 0)
+    vp_choques : numpy.ndarray
+        Valor presente bajo cada choque
+    
+    Retorna:
+    --------
+    df : pandas.DataFrame
+        Columnas "Choque (pb)", "Valor presente" y "Variación (%)" respecto del choque 0
+    """
+    import pandas as pd
+
+    vp_base = vp_choques[np.flatnonzero(choques_pb == 0)[0]] if np.any(choques_pb == 0) else np.nan
+    return pd.DataFrame({
+        "Choque (pb)": choques_pb.astype(int),
+        "Valor presente": vp_choques,
+        "Variación (%)": (vp_choques / vp_base - 1) * 100
+    })
+
+
+def graficar_flujos_bono(valor_descontado, frecuencia, umbral=UMBRAL_FLUJOS_POR_PERIODO):
+    """
+    Valor presente de los flujos del bono y su acumulado, sobre un eje numérico.
+
+    Hasta `umbral` periodos se dibuja un escalón por periodo; con más, los
+    flujos se suman por año. Cada serie es un único objeto de matplotlib
+    (escalones y línea) construido con los mismos arreglos, así que el costo no
+    crece con una barra y una etiqueta por flujo.
+
+    Parámetros:
+    -----------
+    valor_descontado : numpy.ndarray
+        Valor presente de cada flujo, periodo 1..n (columna "Valor descontado" de `valorar_bono`)
+    frecuencia : int
+        Pagos por año
+    umbral : int
+        Periodos a partir de los cuales se agrega por año
+
+    Retorna:
+    --------
+    fig : matplotlib.figure.Figure
+    """
+    valores = np.nan_to_num(np.asarray(valor_descontado, dtype=float), nan=0.0, posinf=0.0, neginf=0.0)
+    if len(valores) > umbral:
+        # Un escalón por año: suma de los flujos de sus periodos (el último año puede estar incompleto)
+        valores = np.add.reduceat(valores, np.arange(0, len(valores), frecuencia))
+        bordes = np.arange(len(valores) + 1, dtype=float)
+        etiqueta_x, etiqueta_valor = 'Año', 'Valor descontado por año'
+    else:
+        bordes = np.arange(len(valores) + 1) + 0.5
+        etiqueta_x, etiqueta_valor = 'Periodo', 'Valor descontado'
+
+    fig, ax = plt.subplots(figsize=(6, 3))
+    ax.stairs(valores, bordes, fill=True, color='#2b8cbe', alpha=0.8, label=etiqueta_valor)
+    ax.set_xlabel(etiqueta_x)
+    ax.set_ylabel('Valor descontado')
+    ax.set_xlim(bordes[0], bordes[-1])
+    ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x:,.0f}'))
+
+    ax_acumulado = ax.twinx()
+    ax_acumulado.plot(bordes, np.concatenate([[0.0], np.cumsum(valores)]), color='#C73E1D', linewidth=1.5, label='Valor presente acumulado')
+    ax_acumulado.set_ylabel('Acumulado')
+    ax_acumulado.set_ylim(bottom=0)
+    ax_acumulado.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x:,.0f}'))
+
+    ax.set_title('Valor presente de los flujos')
+    ax.legend(handles=ax.get_legend_handles_labels()[0] + ax_acumulado.get_legend_handles_labels()[0],
+              loc='upper left', fontsize=8)
+    plt.tight_layout()
+    return fig
+
+
+# PNG memoizado según los datos: la figura se crea (y se cierra) solo cuando cambian
+graficar_flujos_bono_png = grafico_cacheado(graficar_flujos_bono)
+
 
 def mostrar_moduloC():
     """
@@ -12,14 +114,15 @@ def mostrar_moduloC():
     """
     st.subheader("💰 Módulo C – Calculadora de Valor Presente de un Bono")
 
-    opciones_frecuencia = {
-        "Anual": 1,
-        "Semestral": 2,
-        "Cuatrimestral": 3,
-        "Trimestral": 4,
-        "Bimestral": 6,
-        "Mensual": 12
-    }
+    opciones_frecuencia = OPCIONES_FRECUENCIA
+
+    modo = st.radio(
+        "Modo de cálculo",
+        ["Valor presente (TEA → precio)", "Rendimiento (precio → TEA)"],
+        horizontal=True,
+        help="El modo rendimiento calcula la TEA implícita en un precio de mercado (rendimiento al vencimiento)."
+    )
+    modo_rendimiento = modo.startswith("Rendimiento")
 
     valor_nominal = st.number_input(
         "Valor nominal del bono", 
@@ -43,13 +146,22 @@ def mostrar_moduloC():
         help="Frecuencia con la que se pagan los cupones."
     )
 
-    tasa_tea = st.number_input(
-        "Tasa de retorno esperada (TEA %)", 
-        value=6.0, 
-        min_value=0.0,
-        step=0.5,
-        help="Tasa de retorno anual esperada por el inversionista."
-    )
+    if modo_rendimiento:
+        precio_mercado = st.number_input(
+            "Precio de mercado",
+            value=950.0,
+            min_value=0.0,
+            step=10.0,
+            help="Precio al que cotiza el bono hoy."
+        )
+    else:
+        tasa_tea = st.number_input(
+            "Tasa de retorno esperada (TEA %)", 
+            value=6.0, 
+            min_value=0.0,
+            step=0.5,
+            help="Tasa de retorno anual esperada por el inversionista."
+        )
     
     anios = st.number_input(
         "Años al vencimiento", 
@@ -61,47 +173,38 @@ def mostrar_moduloC():
 
     frecuencia = opciones_frecuencia[frecuencia_nombre]
 
+    # Entradas del bono valorado: si cambian sin volver a calcular, el reporte queda desactualizado
+    grafo = obtener_grafo()
+    if not modo_rendimiento:
+        parametros_bono = (valor_nominal, tasa_cupon, frecuencia, tasa_tea, anios)
+        grafo.observar("C", parametros_bono)
+
+    # ============ PRECIO → RENDIMIENTO ============
+    if modo_rendimiento:
+        if valor_nominal == 0 or precio_mercado == 0:
+            st.warning("⚠️ Debes ingresar todos los datos para realizar el cálculo.")
+        elif st.button("📈 Calcular rendimiento"):
+            resultado = calcular_rendimiento_cache(precio_mercado, valor_nominal, tasa_cupon, frecuencia, anios)
+            tea_implicita = float(resultado.tea[0])
+            if not resultado.convergido[0] or not np.isfinite(tea_implicita):
+                st.error("❌ No existe una TEA entre -99% y 10 000% que produzca ese precio.")
+            else:
+                st.markdown(f"### 📈 TEA implícita (rendimiento al vencimiento): **{tea_implicita:,.4f}%**")
+                metodo = "Newton + bisección" if resultado.biseccion[0] else "Newton"
+                st.caption(
+                    f"Método: {metodo} · {int(resultado.iteraciones[0])} iteraciones · "
+                    f"residuo de precio: {float(resultado.residuo[0]):.2e}"
+                )
+
     # ============ VALIDACIONES ============
-    if valor_nominal == 0 or tasa_cupon == 0 or tasa_tea == 0:
+    elif valor_nominal == 0 or tasa_cupon == 0 or tasa_tea == 0:
         st.warning("⚠️ Debes ingresar todos los datos para realizar el cálculo.")
     else:
         if st.button("📉 Calcular valor presente"):
-            # NUEVA FÓRMULA: tasa de cupón periódica efectiva
-            tasa_cupon_periodica = (1 + tasa_cupon / 100) ** (1 / frecuencia) - 1
-            tasa_periodica = (1 + tasa_tea / 100) ** (1 / frecuencia) - 1
-            n_periodos = int(anios * frecuencia)
-    
-            flujos = []
-            valores_descontados = []
-    
-            for i in range(1, n_periodos + 1):
-                flujo = valor_nominal * tasa_cupon_periodica
-                if i == n_periodos:
-                    flujo += valor_nominal
-                flujo = float(flujo)
-                if not math.isfinite(flujo):
-                    flujo = 0.0
-                flujos.append(flujo)
-
-                try:
-                    valor_presente = float(flujo) / ((1 + float(tasa_periodica)) ** i)
-                except Exception:
-                    valor_presente = 0.0
-                if not math.isfinite(valor_presente):
-                    valor_presente = 0.0
-                valores_descontados.append(valor_presente)
-    
-            df = pd.DataFrame({
-                "Periodo": range(1, n_periodos + 1),
-                "Flujo": flujos,
-                "Valor descontado": valores_descontados
-            })
-
-            df = df.replace([np.inf, -np.inf], np.nan)
-            df["Flujo"] = pd.to_numeric(df["Flujo"], errors='coerce').fillna(0.0)
-            df["Valor descontado"] = pd.to_numeric(df["Valor descontado"], errors='coerce').fillna(0.0)
-    
-            valor_presente_total = sum(valores_descontados)
+            # Tasa de cupón y de descuento periódicas efectivas: (1 + r)^(1/f) - 1
+            # (la tabla sale de la caché compartida; la sesión solo guarda los parámetros y el VP)
+            df, valor_presente_total = valorar_bono_cache(*parametros_bono)
+            grafo.actualizar("C", parametros_bono, partial(float, valor_presente_total))
 
             st.session_state['bono_vp'] = float(valor_presente_total)
             st.session_state['bono_params'] = {
@@ -111,7 +214,6 @@ def mostrar_moduloC():
                 'tasa_tea': float(tasa_tea),
                 'anios': int(anios)
             }
-            st.session_state['bono_df'] = df
 
             st.subheader("📊 Tabla de flujos descontados")
             st.dataframe(df.style.format({"Flujo": "{:,.2f}", "Valor descontado": "{:,.2f}"}))
@@ -119,14 +221,81 @@ def mostrar_moduloC():
             st.markdown(f"### 💵 Valor Presente Total (PV): **${valor_presente_total:,.2f}**")
 
             st.subheader("📈 Valor presente de cada flujo")
-            serie_vp = df.set_index("Periodo")["Valor descontado"].astype(float).replace([np.inf, -np.inf], np.nan).fillna(0.0)
-            fig, ax = plt.subplots(figsize=(6, 3))
-            ax.bar(serie_vp.index.astype(str), serie_vp.values, color='#2b8cbe')
-            ax.set_xlabel('Periodo')
-            ax.set_ylabel('Valor descontado')
-            ax.set_title('Valor presente de cada flujo')
-            plt.tight_layout()
-            st.pyplot(fig)
+            mostrar_grafico(graficar_flujos_bono_png(df["Valor descontado"].to_numpy(), frecuencia))
+            if len(df) > UMBRAL_FLUJOS_POR_PERIODO:
+                st.caption(f"Con más de {UMBRAL_FLUJOS_POR_PERIODO} periodos los flujos se suman por año.")
+
+            # ============ RIESGO DE TASA ============
+            riesgo = analizar_riesgo_bonos_cache(valor_nominal, tasa_cupon, frecuencia, tasa_tea, anios)
+            df_choques = tabla_choques(riesgo.choques_pb, riesgo.vp_choques[:, 0])
+            st.session_state['bono_riesgo'] = {
+                'duracion_macaulay': float(riesgo.duracion_macaulay[0]),
+                'duracion_modificada': float(riesgo.duracion_modificada[0]),
+                'convexidad': float(riesgo.convexidad[0])
+            }
+
+            st.subheader("⚖️ Riesgo de tasa de interés")
+            col_r1, col_r2, col_r3 = st.columns(3)
+            col_r1.metric("Duración Macaulay", f"{riesgo.duracion_macaulay[0]:,.3f} años")
+            col_r2.metric("Duración modificada", f"{riesgo.duracion_modificada[0]:,.3f}")
+            col_r3.metric("Convexidad", f"{riesgo.convexidad[0]:,.3f}")
+            st.dataframe(df_choques.style.format(FORMATO_CHOQUES), width="stretch")
+
+    # ============ CARTERA DE BONOS ============
+    st.divider()
+    st.markdown("### 📚 Valorar una cartera de bonos")
+    st.caption(
+        "Sube un CSV con las columnas `valor_nominal`, `tasa_cupon` (%), `frecuencia` "
+        "(nombre, p. ej. Semestral, o pagos por año), `tasa_tea` (%) y `anios`. "
+        "Si en lugar de `tasa_tea` incluye `precio`, se calcula la TEA implícita de cada bono."
+    )
+    archivo = st.file_uploader("Lista de bonos (CSV)", type=["csv"])
+    if archivo is not None:
+        import pandas as pd
+
+        try:
+            df_bonos = pd.read_csv(archivo)
+            if "tasa_tea" not in df_bonos.columns and "precio" in df_bonos.columns:
+                df_bonos["tasa_tea"] = calcular_rendimiento_cache(
+                    df_bonos["precio"].to_numpy(dtype=float),
+                    df_bonos["valor_nominal"].to_numpy(dtype=float),
+                    df_bonos["tasa_cupon"].to_numpy(dtype=float),
+                    df_bonos["frecuencia"].to_numpy(),
+                    df_bonos["anios"].to_numpy()
+                ).tea
+            faltantes = [c for c in COLUMNAS_CARTERA_BONOS if c not in df_bonos.columns]
+            if faltantes:
+                raise ValueError(f"Faltan columnas: {', '.join(faltantes)}")
+            riesgo = analizar_riesgo_bonos_cache(
+                df_bonos["valor_nominal"].to_numpy(dtype=float),
+                df_bonos["tasa_cupon"].to_numpy(dtype=float),
+                df_bonos["frecuencia"].to_numpy(),
+                df_bonos["tasa_tea"].to_numpy(dtype=float),
+                df_bonos["anios"].to_numpy()
+            )
+            df_bonos["Valor presente"] = riesgo.valor_presente
+            df_bonos["Duración Macaulay"] = riesgo.duracion_macaulay
+            df_bonos["Duración modificada"] = riesgo.duracion_modificada
+            df_bonos["Convexidad"] = riesgo.convexidad
+        except Exception as e:
+            st.error(f"❌ No se pudo valorar la cartera: {str(e)}")
+        else:
+            # Valor de la cartera completa bajo cada choque (suma de los bonos)
+            df_choques_cartera = tabla_choques(riesgo.choques_pb, np.nansum(riesgo.vp_choques, axis=1))
+
+            vp_cartera = df_bonos['Valor presente'].sum()
+            duracion_cartera = np.nansum(riesgo.valor_presente * riesgo.duracion_modificada) / vp_cartera
+            st.markdown(
+                f"**{len(df_bonos):,} bonos** — Valor presente total: **${vp_cartera:,.2f}** — "
+                f"Duración modificada de la cartera: **{duracion_cartera:,.3f}**"
+            )
+            formato_columnas = {c: "{:,.3f}" for c in ("Duración Macaulay", "Duración modificada", "Convexidad")}
+            formato_columnas["Valor presente"] = "{:,.2f}"
+            st.dataframe(df_bonos.head(1000).style.format(formato_columnas), width="stretch")
+            if len(df_bonos) > 1000:
+                st.caption("Se muestran los primeros 1,000 bonos.")
+            st.markdown("#### ⚖️ Valor de la cartera ante choques paralelos de tasa")
+            st.dataframe(df_choques_cartera.style.format(FORMATO_CHOQUES), width="stretch")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,31 @@
+"""
+Núcleo de cálculo del simulador, sin dependencias de interfaz.
+
+No importa streamlit ni matplotlib (y pandas solo al construir tablas), para que
+procesos por lotes, servicios y pruebas puedan usar las fórmulas directamente.
+Las páginas de `modules/` son envoltorios de estas funciones.
+"""
+from nucleo.cartera import (
+    FRECUENCIAS, ResumenCartera, SimulacionCartera, calcular_tasa_periodo,
+    calcular_resumen_cartera, calcular_tabla_cartera, simular_crecimiento_cartera,
+    simular_cartera_lote, simular_cartera_lote_df
+)
+from nucleo.impuestos import TASAS_IMPUESTO, ResultadoImpuesto, obtener_tasa_impuesto, calcular_saldo_neto
+from nucleo.pension import (
+    ResultadoPension, ResultadoEscenario, factor_anualidad, calcular_pension_mensual,
+    calcular_pension, proyectar_escenario, comparar_escenarios, calcular_tabla_retiro, simular_retiro
+)
+from nucleo.bonos import (
+    OPCIONES_FRECUENCIA, ResultadoBono, tasa_periodica, calcular_flujos_bono, valorar_bono,
+    frecuencias_a_numero, construir_flujos_cartera, valorar_cartera_bonos, ResultadoRendimiento,
+    precio_bono, calcular_rendimiento, CHOQUES_PB, RiesgoBonos, analizar_riesgo_bonos
+)
+from nucleo.montecarlo import PERCENTILES, simular_montecarlo_cartera, simular_montecarlo_retiro
+from nucleo.objetivo import (
+    periodos_por_año, coeficientes_pension, proyectar_pension, resolver_aporte, resolver_monto_inicial, resolver_tea, resolver_edad_jubilacion
+)
+from nucleo.sensibilidad import PARAMETROS_MALLA, MallaSensibilidad, calcular_malla_sensibilidad
+from nucleo.mortalidad import (
+    RUTA_TABLA_MORTALIDAD, TablaMortalidad, leer_tabla_mortalidad, anualidad_vitalicia,
+    factor_anualidad_vitalicia, esperanza_vida, calcular_pension_vitalicia
+)
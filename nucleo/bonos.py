@@ -0,0 +1,436 @@
+from typing import TYPE_CHECKING, NamedTuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd  # Solo para las anotaciones: el núcleo se importa sin cargar pandas
+
+
+# Pagos por año de cada frecuencia de cupón
+OPCIONES_FRECUENCIA = {
+    "Anual": 1,
+    "Semestral": 2,
+    "Cuatrimestral": 3,
+    "Trimestral": 4,
+    "Bimestral": 6,
+    "Mensual": 12
+}
+
+
+class ResultadoBono(NamedTuple):
+    """Valoración de un bono: tabla de flujos y valor presente total."""
+    df: "pd.DataFrame"
+    valor_presente: float
+
+
+def tasa_periodica(tasa_anual, frecuencia):
+    """
+    Tasa efectiva por periodo equivalente a una tasa anual en porcentaje:
+    (1 + r)^(1/f) - 1. Acepta arreglos.
+    """
+    return (1 + np.asarray(tasa_anual, dtype=float) / 100) ** (1 / np.asarray(frecuencia, dtype=float)) - 1
+
+
+def _numero_periodos(anios, frecuencia):
+    """
+    Pagos de cupón de cada bono: anios · frecuencia truncado a entero, como en
+    `calcular_flujos_bono`. Todas las valoraciones y el solver usan este calendario.
+    """
+    return (np.asarray(anios) * frecuencia).astype(np.int64)
+
+
+def calcular_flujos_bono(valor_nominal, tasa_cupon, frecuencia, tasa_tea, anios):
+    """
+    Flujos del bono y su valor descontado, periodo por periodo, como arreglos.
+    
+    Parámetros:
+    -----------
+    valor_nominal : float
+        Valor nominal del bono
+    tasa_cupon : float
+        Tasa de cupón anual en porcentaje (se convierte a tasa periódica efectiva)
+    frecuencia : int
+        Pagos por año
+    tasa_tea : float
+        Tasa de retorno esperada (TEA) en porcentaje
+    anios : int
+        Años al vencimiento
+    
+    Retorna:
+    --------
+    flujos : dict[str, numpy.ndarray]
+        'periodo' (1..n), 'flujo' y 'valor_descontado'. Los valores no finitos se reemplazan por 0.
+    """
+    n_periodos = int(anios * frecuencia)
+    periodo = np.arange(1, n_periodos + 1)
+    
+    flujo = np.full(n_periodos, valor_nominal * tasa_periodica(tasa_cupon, frecuencia))
+    if n_periodos:
+        flujo[-1] += valor_nominal  # Se devuelve el nominal al vencimiento
+    
+    with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+        valor_descontado = flujo / (1 + tasa_periodica(tasa_tea, frecuencia)) ** periodo
+    
+    return {
+        'periodo': periodo,
+        'flujo': np.nan_to_num(flujo, nan=0.0, posinf=0.0, neginf=0.0),
+        'valor_descontado': np.nan_to_num(valor_descontado, nan=0.0, posinf=0.0, neginf=0.0),
+    }
+
+
+def valorar_bono(valor_nominal, tasa_cupon, frecuencia, tasa_tea, anios):
+    """
+    Calcula el valor presente de un bono con cupones periódicos.
+    
+    Parámetros:
+    -----------
+    Los mismos que `calcular_flujos_bono`.
+    
+    Retorna:
+    --------
+    resultado : ResultadoBono
+        df con las columnas "Periodo", "Flujo" y "Valor descontado", y el valor presente total
+    """
+    import pandas as pd  # Import diferido: el núcleo se importa sin cargar pandas
+    
+    flujos = calcular_flujos_bono(valor_nominal, tasa_cupon, frecuencia, tasa_tea, anios)
+    df = pd.DataFrame({
+        "Periodo": flujos['periodo'],
+        "Flujo": flujos['flujo'],
+        "Valor descontado": flujos['valor_descontado']
+    })
+    return ResultadoBono(df, float(flujos['valor_descontado'].sum()))
+
+
+# Celdas (bonos × periodos) por bloque de la matriz de flujos: acota la memoria
+CELDAS_POR_BLOQUE = 4_000_000
+
+
+def frecuencias_a_numero(frecuencia):
+    """
+    Convierte frecuencias dadas por nombre ("Semestral") o por número (2) a pagos por año.
+    Acepta un escalar o un arreglo.
+    """
+    frecuencia = np.asarray(frecuencia)
+    if frecuencia.dtype.kind in "iuf":
+        return frecuencia.astype(np.int64)
+    nombres, inverso = np.unique(frecuencia.astype(str), return_inverse=True)
+    numeros = []
+    for nombre in nombres:
+        if nombre in OPCIONES_FRECUENCIA:
+            numeros.append(OPCIONES_FRECUENCIA[nombre])
+        elif nombre.isdigit():
+            numeros.append(int(nombre))
+        else:
+            raise ValueError(f"Frecuencia no válida: {nombre}")
+    return np.array(numeros, dtype=np.int64)[inverso].reshape(frecuencia.shape)
+
+
+def construir_flujos_cartera(valor_nominal, tasa_cupon, frecuencia, tasa_tea, anios):
+    """
+    Matriz de flujos y factores de descuento de un conjunto de bonos.
+    
+    Cada fila es un bono y cada columna un periodo 1..max(n). Los bonos con menos
+    periodos se rellenan con flujos 0 a partir de su vencimiento (la máscara
+    `vigente` indica las celdas reales).
+    
+    Parámetros:
+    -----------
+    Los mismos que `calcular_flujos_bono`, como arreglos de igual longitud;
+    `frecuencia` en pagos por año.
+    
+    Retorna:
+    --------
+    flujos : dict[str, numpy.ndarray]
+        'periodo' (1..max), 'n_periodos' (por bono), 'vigente', 'flujo',
+        'tasa_periodica' (por bono) y 'descuento' (factores (1 + r)^-k)
+    """
+    valor_nominal = np.asarray(valor_nominal, dtype=float)
+    frecuencia = np.asarray(frecuencia, dtype=np.int64)
+    n_periodos = _numero_periodos(anios, frecuencia)
+    periodo = np.arange(1, (n_periodos.max() if n_periodos.size else 0) + 1)
+    
+    vigente = periodo <= n_periodos[:, None]
+    cupon = valor_nominal * tasa_periodica(tasa_cupon, frecuencia)
+    flujo = np.where(vigente, cupon[:, None], 0.0)
+    flujo[np.flatnonzero(n_periodos > 0), n_periodos[n_periodos > 0] - 1] += valor_nominal[n_periodos > 0]
+    
+    tasa = tasa_periodica(tasa_tea, frecuencia)
+    with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+        descuento = np.exp(-np.log1p(tasa)[:, None] * periodo)
+    
+    return {
+        'periodo': periodo,
+        'n_periodos': n_periodos,
+        'vigente': vigente,
+        'flujo': np.nan_to_num(flujo, nan=0.0, posinf=0.0, neginf=0.0),
+        'tasa_periodica': tasa,
+        'descuento': descuento,
+    }
+
+
+def valorar_cartera_bonos(valor_nominal, tasa_cupon, frecuencia, tasa_tea, anios):
+    """
+    Valor presente de muchos bonos a la vez.
+    
+    Usa la misma convención que `valorar_bono` (tasas periódicas efectivas
+    (1 + r)^(1/f) - 1 y nominal al vencimiento). Los bonos se procesan en
+    bloques de filas para que la matriz de flujos no supere `CELDAS_POR_BLOQUE`.
+    
+    Parámetros:
+    -----------
+    valor_nominal, tasa_cupon, tasa_tea, anios : array_like
+        Igual que en `calcular_flujos_bono`, uno por bono
+    frecuencia : array_like
+        Pagos por año o nombres de `OPCIONES_FRECUENCIA`
+    
+    Retorna:
+    --------
+    valor_presente : numpy.ndarray
+        Valor presente de cada bono
+    """
+    valor_nominal, tasa_cupon, frecuencia, tasa_tea, anios = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(valor_nominal, dtype=float)),
+        np.atleast_1d(np.asarray(tasa_cupon, dtype=float)),
+        np.atleast_1d(frecuencias_a_numero(frecuencia)),
+        np.atleast_1d(np.asarray(tasa_tea, dtype=float)),
+        np.atleast_1d(np.asarray(anios)),
+    )
+    n_bonos = valor_nominal.size
+    valor_presente = np.empty(n_bonos)
+    if n_bonos == 0:
+        return valor_presente
+    
+    max_periodos = max(int(_numero_periodos(anios, frecuencia).max()), 1)
+    filas = max(1, CELDAS_POR_BLOQUE // max_periodos)
+    for inicio in range(0, n_bonos, filas):
+        bloque = slice(inicio, inicio + filas)
+        flujos = construir_flujos_cartera(valor_nominal[bloque], tasa_cupon[bloque], frecuencia[bloque],
+                                          tasa_tea[bloque], anios[bloque])
+        with np.errstate(over='ignore', invalid='ignore'):
+            descontado = np.nan_to_num(flujos['flujo'] * flujos['descuento'], nan=0.0, posinf=0.0, neginf=0.0)
+        valor_presente[bloque] = descontado.sum(axis=1)
+    
+    return valor_presente
+
+
+class ResultadoRendimiento(NamedTuple):
+    """Rendimiento al vencimiento implícito en un precio, con diagnósticos del solver."""
+    tea: np.ndarray           # TEA implícita en porcentaje (NaN si no hay solución)
+    iteraciones: np.ndarray   # Iteraciones usadas por bono
+    convergido: np.ndarray    # True si se alcanzó la tolerancia
+    biseccion: np.ndarray     # True si hizo falta el respaldo por bisección
+    residuo: np.ndarray       # Precio calculado menos precio objetivo
+
+
+# Intervalo de búsqueda de la TEA (en decimal): de -99% a 10 000%
+TEA_MINIMA, TEA_MAXIMA = -0.99, 100.0
+
+
+def _precio_y_derivada(cupon, valor_nominal, n_periodos, x):
+    """
+    Precio de bonos con cupón constante en función de x = log(1 + r_periodo),
+    con la fórmula cerrada de la anualidad, y su derivada dP/dx.
+    
+    P(x) = C · Σ e^(-kx) + N · e^(-nx),   dP/dx = -(C · Σ k e^(-kx) + N · n e^(-nx))
+    """
+    v_n = np.exp(-n_periodos * x)
+    cero = x == 0
+    casi_cero = np.abs(x) < 1e-5
+    x_seguro = np.where(cero, 1.0, x)
+    with np.errstate(over='ignore', invalid='ignore'):
+        # Σ_{k=1..n} e^(-kx) con expm1, exacto salvo en x = 0 (donde vale n)
+        suma = np.where(cero, n_periodos, np.exp(-x_seguro) * np.expm1(-n_periodos * x_seguro) / np.expm1(-x_seguro))
+        # Σ_{k=1..n} k e^(-kx) = (S - n e^(-(n+1)x)) / (1 - e^(-x)); cerca de 0 se usa
+        # la serie Σk - x Σk² + x²/2 Σk³ para evitar la cancelación
+        s1 = n_periodos * (n_periodos + 1) / 2
+        serie = s1 - x * s1 * (2 * n_periodos + 1) / 3 + x ** 2 / 2 * s1 ** 2
+        suma_k = np.where(casi_cero, serie,
+                          (suma - n_periodos * v_n * np.exp(-x_seguro)) / -np.expm1(-x_seguro))
+    precio = cupon * suma + valor_nominal * v_n
+    derivada = -(cupon * suma_k + valor_nominal * n_periodos * v_n)
+    return precio, derivada
+
+
+def precio_bono(valor_nominal, tasa_cupon, frecuencia, tasa_tea, anios):
+    """
+    Valor presente con la fórmula cerrada: el mismo calendario de `calcular_flujos_bono`
+    (cupón periódico efectivo y nominal al vencimiento) sin construir los flujos.
+    Todos los parámetros aceptan arreglos.
+    """
+    frecuencia = frecuencias_a_numero(frecuencia)
+    valor_nominal = np.asarray(valor_nominal, dtype=float)
+    cupon = valor_nominal * tasa_periodica(tasa_cupon, frecuencia)
+    n_periodos = _numero_periodos(anios, frecuencia)
+    x = np.log1p(np.asarray(tasa_tea, dtype=float) / 100) / frecuencia
+    precio, _ = _precio_y_derivada(cupon, valor_nominal, n_periodos, x)
+    return precio
+
+
+def calcular_rendimiento(precio, valor_nominal, tasa_cupon, frecuencia, anios,
+                         tolerancia=1e-10, max_iteraciones=50):
+    """
+    TEA implícita en el precio de mercado (rendimiento al vencimiento) de uno o muchos bonos.
+    
+    Resuelve P(TEA) = precio con Newton y derivada analítica, partiendo de la
+    aproximación clásica del rendimiento. Los bonos que no convergen (o salen
+    del intervalo [-99%, 10 000%]) se resuelven por bisección dentro de ese
+    intervalo, que siempre contiene la solución si existe porque P es decreciente.
+    
+    Parámetros:
+    -----------
+    precio : array_like
+        Precio de mercado de cada bono
+    valor_nominal, tasa_cupon, frecuencia, anios : array_like
+        Igual que en `valorar_cartera_bonos`
+    tolerancia : float
+        Error relativo máximo en el precio
+    max_iteraciones : int
+        Iteraciones de Newton antes de recurrir a la bisección
+    
+    Retorna:
+    --------
+    resultado : ResultadoRendimiento
+        TEA en porcentaje y diagnósticos de convergencia por bono
+    """
+    precio, valor_nominal, tasa_cupon, frecuencia, anios = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(precio, dtype=float)),
+        np.atleast_1d(np.asarray(valor_nominal, dtype=float)),
+        np.atleast_1d(np.asarray(tasa_cupon, dtype=float)),
+        np.atleast_1d(frecuencias_a_numero(frecuencia)),
+        np.atleast_1d(np.asarray(anios)),
+    )
+    if np.any(precio <= 0):
+        raise ValueError("El precio debe ser mayor que 0")
+    cupon = valor_nominal * tasa_periodica(tasa_cupon, frecuencia)
+    n_periodos = _numero_periodos(anios, frecuencia)
+    x_min = np.log1p(TEA_MINIMA) / frecuencia
+    x_max = np.log1p(TEA_MAXIMA) / frecuencia
+    
+    # Punto de partida: rendimiento aproximado por periodo
+    aproximado = (cupon + (valor_nominal - precio) / n_periodos) / ((valor_nominal + precio) / 2)
+    x = np.clip(np.log1p(np.maximum(aproximado, -0.5)), x_min, x_max)
+    
+    iteraciones = np.zeros(precio.shape, dtype=np.int64)
+    convergido = np.zeros(precio.shape, dtype=bool)
+    activos = np.arange(precio.size)
+    for _ in range(max_iteraciones):
+        p, dp = _precio_y_derivada(cupon[activos], valor_nominal[activos], n_periodos[activos], x[activos])
+        error = p - precio[activos]
+        listo = np.abs(error) <= tolerancia * precio[activos]
+        convergido[activos[listo]] = True
+        activos, error, dp = activos[~listo], error[~listo], dp[~listo]
+        if activos.size == 0:
+            break
+        iteraciones[activos] += 1
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_nuevo = x[activos] - error / dp
+        # Los pasos no finitos o fuera del intervalo se dejan para la bisección
+        fuera = ~np.isfinite(x_nuevo) | (x_nuevo < x_min[activos]) | (x_nuevo > x_max[activos])
+        x[activos] = np.where(fuera, x[activos], x_nuevo)
+        activos = activos[~fuera]
+        if activos.size == 0:
+            break
+    
+    # Respaldo: bisección vectorizada para los que no convergieron
+    biseccion = ~convergido
+    pendientes = np.flatnonzero(biseccion)
+    if pendientes.size:
+        bajo, alto = x_min[pendientes], x_max[pendientes]
+        argumentos = (cupon[pendientes], valor_nominal[pendientes], n_periodos[pendientes])
+        objetivo = precio[pendientes]
+        con_solucion = ((_precio_y_derivada(*argumentos, bajo)[0] >= objetivo)
+                        & (_precio_y_derivada(*argumentos, alto)[0] <= objetivo))
+        for _ in range(200):
+            medio = (bajo + alto) / 2
+            mayor = _precio_y_derivada(*argumentos, medio)[0] > objetivo
+            bajo = np.where(mayor, medio, bajo)
+            alto = np.where(mayor, alto, medio)
+            iteraciones[pendientes] += 1
+            if np.all((alto - bajo) <= 1e-15 * np.maximum(1.0, np.abs(bajo))):
+                break
+        medio = (bajo + alto) / 2
+        x[pendientes] = np.where(con_solucion, medio, np.nan)
+        residuo_final = _precio_y_derivada(*argumentos, medio)[0] - objetivo
+        convergido[pendientes] = con_solucion & (np.abs(residuo_final) <= max(tolerancia, 1e-9) * objetivo)
+    
+    precio_final, _ = _precio_y_derivada(cupon, valor_nominal, n_periodos, x)
+    tea = np.expm1(x * frecuencia) * 100
+    return ResultadoRendimiento(tea, iteraciones, convergido, biseccion, precio_final - precio)
+
+
+class RiesgoBonos(NamedTuple):
+    """Medidas de riesgo de tasa de un conjunto de bonos (un valor por bono)."""
+    valor_presente: np.ndarray
+    duracion_macaulay: np.ndarray    # En años
+    duracion_modificada: np.ndarray  # En años, respecto de la TEA
+    convexidad: np.ndarray           # En años²
+    choques_pb: np.ndarray           # Desplazamientos paralelos de la TEA en puntos básicos
+    vp_choques: np.ndarray           # Matriz (choques × bonos) de valores presentes
+
+
+# Escalera de choques por defecto: de -300 a +300 pb cada 25 pb
+CHOQUES_PB = np.arange(-300, 301, 25)
+
+
+def analizar_riesgo_bonos(valor_nominal, tasa_cupon, frecuencia, tasa_tea, anios, choques_pb=CHOQUES_PB):
+    """
+    Duración, convexidad y valor presente bajo choques paralelos de tasa, en una sola pasada.
+    
+    Parte de la matriz de flujos de `construir_flujos_cartera` y usa el tiempo en
+    años t = k / f de cada flujo, con descuento (1 + TEA)^-t (equivalente a la tasa
+    periódica efectiva del Módulo C). Los choques se evalúan con broadcasting
+    choques × bonos × periodos, por bloques de bonos para acotar la memoria.
+    
+    Parámetros:
+    -----------
+    valor_nominal, tasa_cupon, frecuencia, tasa_tea, anios : array_like
+        Igual que en `valorar_cartera_bonos`
+    choques_pb : array_like
+        Desplazamientos de la TEA en puntos básicos (100 pb = 1 punto porcentual)
+    
+    Retorna:
+    --------
+    riesgo : RiesgoBonos
+        Los choques que llevan la TEA a -100% o menos dan NaN
+    """
+    valor_nominal, tasa_cupon, frecuencia, tasa_tea, anios = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(valor_nominal, dtype=float)),
+        np.atleast_1d(np.asarray(tasa_cupon, dtype=float)),
+        np.atleast_1d(frecuencias_a_numero(frecuencia)),
+        np.atleast_1d(np.asarray(tasa_tea, dtype=float)),
+        np.atleast_1d(np.asarray(anios)),
+    )
+    choques_pb = np.atleast_1d(np.asarray(choques_pb, dtype=float))
+    n_bonos = valor_nominal.size
+    valor_presente = np.empty(n_bonos)
+    suma_t = np.empty(n_bonos)
+    suma_t2 = np.empty(n_bonos)
+    vp_choques = np.empty((choques_pb.size, n_bonos))
+    
+    max_periodos = max(int(_numero_periodos(anios, frecuencia).max()), 1) if n_bonos else 1
+    filas = max(1, CELDAS_POR_BLOQUE // (max_periodos * max(choques_pb.size, 1)))
+    for inicio in range(0, n_bonos, filas):
+        bloque = slice(inicio, inicio + filas)
+        flujos = construir_flujos_cartera(valor_nominal[bloque], tasa_cupon[bloque], frecuencia[bloque],
+                                          tasa_tea[bloque], anios[bloque])
+        tiempo = flujos['periodo'] / frecuencia[bloque][:, None]           # bonos × periodos, en años
+        log_base = np.log1p(tasa_tea[bloque] / 100)[:, None]
+        descontado = flujos['flujo'] * np.exp(-log_base * tiempo)          # Valor presente de cada flujo
+        valor_presente[bloque] = descontado.sum(axis=1)
+        suma_t[bloque] = (descontado * tiempo).sum(axis=1)
+        suma_t2[bloque] = (descontado * tiempo * (tiempo + 1)).sum(axis=1)
+        
+        # choques × bonos × periodos
+        tea_choque = tasa_tea[bloque][None, :] / 100 + choques_pb[:, None] / 10000
+        with np.errstate(invalid='ignore'):
+            log_choque = np.where(tea_choque > -1, np.log1p(np.maximum(tea_choque, -1 + 1e-12)), np.nan)
+        vp_choques[:, bloque] = (flujos['flujo'][None] * np.exp(-log_choque[:, :, None] * tiempo[None])).sum(axis=2)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        duracion_macaulay = suma_t / valor_presente
+        base = 1 + tasa_tea / 100
+        duracion_modificada = duracion_macaulay / base
+        convexidad = suma_t2 / (valor_presente * base ** 2)
+    
+    return RiesgoBonos(valor_presente, duracion_macaulay, duracion_modificada, convexidad, choques_pb, vp_choques)
@@ -0,0 +1,383 @@
+"""
+Memoización de las funciones de cálculo, compartida por todas las sesiones.
+
+Streamlit vuelve a ejecutar todo `app.py` con cada interacción; con `memoizar`
+las llamadas con las mismas entradas devuelven el resultado guardado en lugar
+de recalcularlo. Las entradas se normalizan antes de calcular la llave
+(5 y 5.0 o un escalar de NumPy y un float dan la misma llave).
+
+Las cachés viven a nivel de proceso, así que en un servidor con muchos usuarios
+el segundo que pide el mismo plan lo recibe sin recalcular. La memoria está
+acotada por número de entradas de cada función y por un presupuesto global de
+bytes (SIMULADOR_CACHE_MB), con desalojo LRU; las entradas caducan tras
+SIMULADOR_CACHE_TTL segundos. Cada caché lleva contadores de aciertos y fallos.
+
+Si la variable de entorno SIMULADOR_CACHE_DB apunta a un archivo SQLite, los
+resultados también se guardan ahí (con pickle) y sobreviven a reinicios y se
+comparten entre procesos. Solo debe apuntar a un archivo local de confianza.
+
+Los resultados se comparten entre llamadas: quien los reciba no debe modificarlos.
+"""
+import hashlib
+import os
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+import numpy as np
+
+
+# Entradas por función que se guardan en memoria por defecto
+MAX_ENTRADAS = 128
+
+# Memoria total para resultados en el proceso (todas las funciones), en MB
+MEMORIA_MAXIMA_MB = float(os.environ.get("SIMULADOR_CACHE_MB", 256))
+
+# Segundos que vive un resultado (en memoria y en SQLite)
+TTL_SEGUNDOS = float(os.environ.get("SIMULADOR_CACHE_TTL", 6 * 3600))
+
+# Tamaño máximo del archivo SQLite (suma de los resultados guardados), en MB
+DISCO_MAXIMO_MB = float(os.environ.get("SIMULADOR_CACHE_DISCO_MB", 1024))
+
+# Registro de todas las cachés creadas con `memoizar`, para las estadísticas
+CACHES = {}
+
+
+def normalizar(valor):
+    """
+    Convierte un valor en una estructura estable para calcular la llave.
+
+    Los números se pasan a float (los bool se conservan), los escalares y arreglos
+    de NumPy a tipos de Python o a (dtype, forma, bytes), los DataFrame a sus
+    columnas y valores, y los dict se ordenan por llave.
+    """
+    if isinstance(valor, (bool, np.bool_)):
+        return bool(valor)
+    if isinstance(valor, (int, float, np.integer, np.floating)):
+        return float(valor)
+    if isinstance(valor, (str, bytes)) or valor is None:
+        return valor
+    if isinstance(valor, np.ndarray):
+        if valor.dtype.kind in "iuf":
+            valor = valor.astype(float)
+        elif valor.dtype.kind in "OU":
+            return ("ndarray", valor.shape, tuple(normalizar(v) for v in valor.ravel().tolist()))
+        return ("ndarray", valor.dtype.str, valor.shape, np.ascontiguousarray(valor).tobytes())
+    if isinstance(valor, dict):
+        return ("dict", tuple(sorted((str(k), normalizar(v)) for k, v in valor.items())))
+    if isinstance(valor, (list, tuple)):
+        return ("seq", tuple(normalizar(v) for v in valor))
+    if hasattr(valor, "to_numpy") and hasattr(valor, "columns"):  # pandas.DataFrame
+        return ("df", tuple(map(str, valor.columns)),
+                tuple(normalizar(valor[c].to_numpy()) for c in valor.columns))
+    if hasattr(valor, "to_numpy"):  # pandas.Series
+        return ("serie", normalizar(valor.to_numpy()))
+    raise TypeError(f"No se puede usar como llave de caché un valor de tipo {type(valor).__name__}")
+
+
+def estimar_tamaño(valor):
+    """Bytes aproximados que ocupa un resultado (arreglos, DataFrames y contenedores incluidos)."""
+    if isinstance(valor, np.ndarray):
+        return valor.nbytes
+    if hasattr(valor, "memory_usage") and hasattr(valor, "columns"):  # pandas.DataFrame
+        return int(valor.memory_usage(deep=True).sum())
+    if isinstance(valor, (bytes, str)):
+        return sys.getsizeof(valor)
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(estimar_tamaño(k) + estimar_tamaño(v) for k, v in valor.items())
+    if isinstance(valor, (list, tuple)):
+        return sys.getsizeof(valor) + sum(estimar_tamaño(v) for v in valor)
+    if hasattr(valor, "__dict__") and not callable(valor):  # Objetos con atributos (p. ej. el grafo de resultados)
+        return sys.getsizeof(valor) + estimar_tamaño(vars(valor))
+    return sys.getsizeof(valor)
+
+
+def calcular_llave(nombre, args, kwargs):
+    """Llave SHA-256 de una llamada: nombre de la función más sus entradas normalizadas."""
+    contenido = (nombre, normalizar(args), normalizar(kwargs))
+    return hashlib.sha256(pickle.dumps(contenido, protocol=4)).hexdigest()
+
+
+class AlmacenSQLite:
+    """
+    Resultados en un archivo SQLite compartido entre procesos, con caducidad y
+    tamaño máximo (se desalojan los de uso más antiguo).
+    """
+
+    def __init__(self, ruta, ttl=TTL_SEGUNDOS, max_bytes=DISCO_MAXIMO_MB * 2**20):
+        self.ruta = ruta
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._candado = threading.Lock()
+        self._conexion = sqlite3.connect(ruta, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.execute(
+            "CREATE TABLE IF NOT EXISTS resultados ("
+            " llave TEXT PRIMARY KEY, funcion TEXT NOT NULL, valor BLOB NOT NULL,"
+            " tamaño INTEGER NOT NULL, creado REAL NOT NULL, usado REAL NOT NULL)"
+        )
+        self._conexion.execute("CREATE INDEX IF NOT EXISTS resultados_usado ON resultados (usado)")
+
+    def obtener(self, llave, ttl=None):
+        """Resultado guardado con `llave` y con menos de `ttl` segundos (o None)."""
+        ahora = time.time()
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        with self._candado:
+            fila = self._conexion.execute(
+                "SELECT valor FROM resultados WHERE llave = ? AND creado > ?", (llave, ahora - ttl)
+            ).fetchone()
+            if fila is not None:
+                self._conexion.execute("UPDATE resultados SET usado = ? WHERE llave = ?", (ahora, llave))
+        return None if fila is None else pickle.loads(fila[0])
+
+    def guardar(self, llave, funcion, valor):
+        try:
+            datos = pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return
+        ahora = time.time()
+        with self._candado:
+            self._conexion.execute(
+                "INSERT OR REPLACE INTO resultados VALUES (?, ?, ?, ?, ?, ?)",
+                (llave, funcion, datos, len(datos), ahora, ahora)
+            )
+            self._desalojar(ahora)
+
+    def _desalojar(self, ahora):
+        self._conexion.execute("DELETE FROM resultados WHERE creado <= ?", (ahora - self.ttl,))
+        total = self._conexion.execute("SELECT COALESCE(SUM(tamaño), 0) FROM resultados").fetchone()[0]
+        if total > self.max_bytes:
+            # Borra los de uso más antiguo hasta volver al límite
+            self._conexion.execute(
+                "DELETE FROM resultados WHERE llave IN ("
+                " SELECT llave FROM (SELECT llave, SUM(tamaño) OVER (ORDER BY usado DESC) AS acumulado"
+                " FROM resultados) WHERE acumulado > ?)",
+                (self.max_bytes,)
+            )
+
+    def limpiar(self, funcion=None):
+        with self._candado:
+            if funcion is None:
+                self._conexion.execute("DELETE FROM resultados")
+            else:
+                self._conexion.execute("DELETE FROM resultados WHERE funcion = ?", (funcion,))
+
+    def estadisticas(self):
+        """Entradas y bytes guardados en el archivo, por función."""
+        with self._candado:
+            filas = self._conexion.execute(
+                "SELECT funcion, COUNT(*), SUM(tamaño) FROM resultados GROUP BY funcion"
+            ).fetchall()
+        return {funcion: {"entradas": n, "bytes": int(b)} for funcion, n, b in filas}
+
+
+class CacheResultados:
+    """Caché LRU de una función, segura entre hilos, con caducidad y copia opcional en SQLite."""
+
+    def __init__(self, nombre, max_entradas=MAX_ENTRADAS, ttl=TTL_SEGUNDOS, almacen=None):
+        self.nombre = nombre
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self.almacen = almacen
+        self.aciertos = 0
+        self.aciertos_disco = 0
+        self.fallos = 0
+        self.bytes = 0
+        # llave → (valor, creado, tamaño), en orden de uso (el primero es el menos reciente)
+        self._entradas = OrderedDict()
+        self._usos = {}
+        self._candado = threading.Lock()
+
+    def obtener(self, llave):
+        """Devuelve (encontrado, valor), primero en memoria y luego en SQLite."""
+        ahora = time.monotonic()
+        with self._candado:
+            entrada = self._entradas.get(llave)
+            if entrada is not None:
+                if ahora - entrada[1] <= self.ttl:
+                    self._entradas.move_to_end(llave)
+                    self._usos[llave] = ahora
+                    self.aciertos += 1
+                    return True, entrada[0]
+                self._quitar(llave)
+        if self.almacen is not None:
+            try:
+                valor = self.almacen.obtener(llave, self.ttl)
+            except (sqlite3.Error, pickle.UnpicklingError, EOFError):
+                valor = None
+            if valor is not None:
+                with self._candado:
+                    self.aciertos_disco += 1
+                self._guardar_memoria(llave, valor)
+                return True, valor
+        with self._candado:
+            self.fallos += 1
+        return False, None
+
+    def _quitar(self, llave):
+        """Saca una entrada de la memoria (el candado debe estar tomado)."""
+        _, _, tamaño = self._entradas.pop(llave)
+        self._usos.pop(llave, None)
+        self.bytes -= tamaño
+        _contabilizar(-tamaño)
+
+    def _guardar_memoria(self, llave, valor):
+        tamaño = estimar_tamaño(valor)
+        ahora = time.monotonic()
+        with self._candado:
+            if llave in self._entradas:
+                self._quitar(llave)
+            self._entradas[llave] = (valor, ahora, tamaño)
+            self._usos[llave] = ahora
+            self.bytes += tamaño
+            _contabilizar(tamaño)
+            while len(self._entradas) > self.max_entradas:
+                self._quitar(next(iter(self._entradas)))
+        _respetar_memoria_maxima()
+
+    def guardar(self, llave, valor):
+        self._guardar_memoria(llave, valor)
+        if self.almacen is not None:
+            try:
+                self.almacen.guardar(llave, self.nombre, valor)
+            except sqlite3.Error:
+                pass
+
+    def desalojar_mas_antigua(self):
+        """Quita la entrada menos usada; devuelve False si la caché está vacía."""
+        with self._candado:
+            if not self._entradas:
+                return False
+            self._quitar(next(iter(self._entradas)))
+            return True
+
+    def uso_mas_antiguo(self):
+        """Momento del último uso de la entrada menos reciente (None si está vacía)."""
+        with self._candado:
+            if not self._entradas:
+                return None
+            return self._usos[next(iter(self._entradas))]
+
+    def limpiar(self):
+        """Vacía la memoria (no SQLite) y reinicia los contadores."""
+        with self._candado:
+            for llave in list(self._entradas):
+                self._quitar(llave)
+            self.aciertos = self.aciertos_disco = self.fallos = 0
+
+    def estadisticas(self):
+        with self._candado:
+            llamadas = self.aciertos + self.aciertos_disco + self.fallos
+            return {
+                "funcion": self.nombre,
+                "entradas": len(self._entradas),
+                "max_entradas": self.max_entradas,
+                "bytes": self.bytes,
+                "aciertos": self.aciertos,
+                "aciertos_disco": self.aciertos_disco,
+                "fallos": self.fallos,
+                "tasa_aciertos": (self.aciertos + self.aciertos_disco) / llamadas if llamadas else 0.0,
+            }
+
+
+# Bytes en memoria de todas las cachés del proceso
+_memoria = {"bytes": 0}
+_candado_memoria = threading.Lock()
+
+
+def _contabilizar(delta):
+    with _candado_memoria:
+        _memoria["bytes"] += delta
+
+
+def _respetar_memoria_maxima():
+    """Desaloja la entrada menos usada de todo el proceso hasta quedar bajo MEMORIA_MAXIMA_MB."""
+    limite = MEMORIA_MAXIMA_MB * 2**20
+    while _memoria["bytes"] > limite:
+        candidatas = [(uso, cache) for cache in CACHES.values() if (uso := cache.uso_mas_antiguo()) is not None]
+        if not candidatas:
+            break
+        min(candidatas, key=lambda c: c[0])[1].desalojar_mas_antigua()
+
+
+# Almacén SQLite del proceso (se abre la primera vez que se necesita)
+_almacen = {}
+
+
+def obtener_almacen():
+    """Almacén SQLite indicado por SIMULADOR_CACHE_DB, o None si no está configurado."""
+    ruta = os.environ.get("SIMULADOR_CACHE_DB")
+    if not ruta:
+        return None
+    if ruta not in _almacen:
+        _almacen[ruta] = AlmacenSQLite(ruta)
+    return _almacen[ruta]
+
+
+def memoizar(funcion=None, *, max_entradas=MAX_ENTRADAS, ttl=TTL_SEGUNDOS):
+    """
+    Decorador que guarda los resultados de una función pura según sus entradas.
+
+    Parámetros:
+    -----------
+    funcion : callable
+        Función a memoizar (se puede usar como `@memoizar` o `@memoizar(max_entradas=...)`)
+    max_entradas : int
+        Resultados guardados en memoria; al superarlo se desaloja el menos usado
+    ttl : float
+        Segundos que vive cada resultado
+
+    Retorna:
+    --------
+    envoltura : callable
+        Misma firma que `funcion`, con el atributo `cache` (CacheResultados)
+    """
+    def decorar(funcion):
+        nombre = f"{funcion.__module__}.{funcion.__qualname__}"
+        cache = CacheResultados(nombre, max_entradas, ttl, obtener_almacen())
+        CACHES[nombre] = cache
+
+        @wraps(funcion)
+        def envoltura(*args, **kwargs):
+            try:
+                llave = calcular_llave(nombre, args, kwargs)
+            except TypeError:
+                return funcion(*args, **kwargs)  # Entradas que no se pueden normalizar: sin caché
+            encontrado, valor = cache.obtener(llave)
+            if not encontrado:
+                valor = funcion(*args, **kwargs)
+                cache.guardar(llave, valor)
+            return valor
+
+        envoltura.cache = cache
+        return envoltura
+
+    return decorar(funcion) if funcion is not None else decorar
+
+
+def estadisticas_cache():
+    """Lista con las estadísticas de cada función memoizada (y lo guardado en SQLite, si hay)."""
+    estadisticas = [cache.estadisticas() for cache in CACHES.values()]
+    almacen = obtener_almacen()
+    disco = almacen.estadisticas() if almacen is not None else {}
+    for e in estadisticas:
+        e["disco"] = disco.get(e["funcion"], {"entradas": 0, "bytes": 0})
+    return estadisticas
+
+
+def memoria_cache():
+    """Bytes en memoria de todas las cachés y límite configurado."""
+    return {"bytes": _memoria["bytes"], "max_bytes": MEMORIA_MAXIMA_MB * 2**20}
+
+
+def limpiar_caches(disco=False):
+    """Vacía todas las cachés en memoria y, si `disco` es True, también el archivo SQLite."""
+    for cache in CACHES.values():
+        cache.limpiar()
+    almacen = obtener_almacen()
+    if disco and almacen is not None:
+        almacen.limpiar()
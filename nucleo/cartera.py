@@ -0,0 +1,386 @@
+from typing import TYPE_CHECKING, NamedTuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd  # Solo para las anotaciones: el núcleo se importa sin cargar pandas
+
+
+class ResumenCartera(NamedTuple):
+    """Métricas finales de una simulación de cartera (escalares o arreglos en lote)."""
+    saldo_final: float
+    total_aportado: float
+    interes_total_ganado: float
+
+
+class SimulacionCartera(NamedTuple):
+    """Resultado completo de `simular_crecimiento_cartera`: la tabla y las métricas finales."""
+    df_resultados: "pd.DataFrame"
+    saldo_final: float
+    total_aportado: float
+    interes_total_ganado: float
+
+
+# Columnas de la tabla del Módulo A y el arreglo de `calcular_tabla_cartera` del que sale cada una
+COLUMNAS_TABLA_CARTERA = {
+    'Periodo': 'periodo',
+    'Saldo Inicial (USD)': 'saldo_inicial',
+    'Aporte (USD)': 'aporte',
+    'Interés Ganado (USD)': 'interes',
+    'Saldo Final (USD)': 'saldo_final',
+}
+
+# Periodos por año de cada frecuencia de aportes
+FRECUENCIAS = {
+    "Mensual": 12,
+    "Trimestral": 4,
+    "Semestral": 2,
+    "Anual": 1
+}
+
+
+def calcular_tasa_periodo(tea, frecuencia):
+    """
+    Convierte la TEA a tasa por periodo según la frecuencia de aportes.
+    
+    Parámetros:
+    -----------
+    tea : float
+        Tasa Efectiva Anual (en decimal, ej: 0.08 para 8%)
+    frecuencia : str
+        "Mensual", "Trimestral", "Semestral", "Anual"
+    
+    Retorna:
+    --------
+    tasa_periodo : float
+        Tasa equivalente por periodo
+    periodos_por_año : int
+        Número de periodos en un año
+    """
+    periodos_por_año = FRECUENCIAS[frecuencia]
+    
+    # Fórmula de tasa equivalente: (1 + TEA)^(1/n) - 1
+    tasa_periodo = (1 + tea) ** (1 / periodos_por_año) - 1
+    
+    return tasa_periodo, periodos_por_año
+
+
+def _validar_parametros_cartera(monto_inicial, aporte_periodico, tea, edad_actual, edad_jubilacion):
+    """
+    Aplica las validaciones básicas de la simulación de cartera.
+    Lanza ValueError con el mismo mensaje que muestra la interfaz.
+    Acepta escalares o arreglos (en ese caso se indican las filas inválidas).
+    """
+    reglas = [
+        (np.asarray(edad_jubilacion) <= np.asarray(edad_actual),
+         "La edad de jubilación debe ser mayor a la edad actual"),
+        ((np.asarray(tea) < 0) | (np.asarray(tea) > 50),
+         "La TEA debe estar entre 0% y 50%"),
+        ((np.asarray(monto_inicial) < 0) | (np.asarray(aporte_periodico) < 0),
+         "Los montos no pueden ser negativos"),
+    ]
+    for invalidos, mensaje in reglas:
+        if np.ndim(invalidos) == 0:
+            if invalidos:
+                raise ValueError(mensaje)
+        elif invalidos.any():
+            filas = np.flatnonzero(invalidos)
+            raise ValueError(f"{mensaje} (filas: {filas[:10].tolist()}{'...' if filas.size > 10 else ''})")
+
+
+def _factor_acumulacion(tasa_periodo, periodos):
+    """
+    Factor de valor futuro de una serie de aportes unitarios al final de cada periodo:
+    ((1 + i)^k - 1) / i, o simplemente k cuando la tasa es 0.
+    Acepta escalares o arreglos de NumPy (se aplica broadcasting).
+    """
+    periodos = np.asarray(periodos, dtype=float)
+    if np.ndim(tasa_periodo) == 0:
+        if tasa_periodo == 0:
+            return periodos
+        return np.expm1(np.log1p(tasa_periodo) * periodos) / tasa_periodo
+    tasa_periodo = np.asarray(tasa_periodo, dtype=float)
+    sin_tasa = tasa_periodo == 0
+    factor = np.expm1(np.log1p(tasa_periodo) * periodos) / np.where(sin_tasa, 1.0, tasa_periodo)
+    return np.where(sin_tasa, periodos, factor)
+
+
+def calcular_resumen_cartera(monto_inicial, aporte_periodico, frecuencia, tea, edad_actual, edad_jubilacion):
+    """
+    Calcula solo las métricas finales de la cartera en O(1), sin construir la tabla.
+    
+    Usa la fórmula cerrada del valor futuro con aportes al FINAL del periodo:
+    saldo_n = monto_inicial * (1 + i)^n + aporte * ((1 + i)^n - 1) / i
+    
+    Parámetros:
+    -----------
+    Los mismos que `simular_crecimiento_cartera`.
+    
+    Retorna:
+    --------
+    resumen : ResumenCartera
+        saldo_final, total_aportado e interes_total_ganado
+    """
+    _validar_parametros_cartera(monto_inicial, aporte_periodico, tea, edad_actual, edad_jubilacion)
+    
+    plazo_años = edad_jubilacion - edad_actual
+    tasa_periodo, periodos_por_año = calcular_tasa_periodo(tea / 100, frecuencia)
+    total_periodos = plazo_años * periodos_por_año
+    
+    crecimiento = (1 + tasa_periodo) ** total_periodos
+    saldo_final = float(monto_inicial * crecimiento
+                        + aporte_periodico * _factor_acumulacion(tasa_periodo, total_periodos))
+    total_aportado = monto_inicial + (aporte_periodico * total_periodos)
+    interes_total_ganado = saldo_final - total_aportado
+    
+    return ResumenCartera(saldo_final, total_aportado, interes_total_ganado)
+
+
+def calcular_tabla_cartera(monto_inicial, aporte_periodico, tasa_periodo, total_periodos):
+    """
+    Genera el calendario periodo por periodo como arreglos de NumPy, sin bucles.
+    
+    Parámetros:
+    -----------
+    monto_inicial : float
+        Depósito inicial en USD
+    aporte_periodico : float
+        Aporte al final de cada periodo en USD
+    tasa_periodo : float
+        Tasa por periodo (en decimal)
+    total_periodos : int
+        Número de periodos a simular
+    
+    Retorna:
+    --------
+    columnas : dict[str, numpy.ndarray]
+        Arreglos 'periodo', 'saldo_inicial', 'aporte', 'interes' y 'saldo_final'
+        de longitud total_periodos + 1 (el periodo 0 solo contiene el monto inicial)
+    """
+    periodo = np.arange(total_periodos + 1)
+    
+    # Saldo al final de cada periodo con la fórmula cerrada
+    crecimiento = (1 + tasa_periodo) ** periodo.astype(float)
+    saldo_final = monto_inicial * crecimiento + aporte_periodico * _factor_acumulacion(tasa_periodo, periodo)
+    
+    # El saldo inicial de cada periodo es el saldo final del anterior
+    saldo_inicial = np.empty_like(saldo_final)
+    saldo_inicial[0] = monto_inicial
+    saldo_inicial[1:] = saldo_final[:-1]
+    
+    aporte = np.full(total_periodos + 1, float(aporte_periodico))
+    aporte[0] = 0.0  # En el periodo 0 no hay aporte
+    interes = saldo_inicial * tasa_periodo
+    interes[0] = 0.0  # Ni intereses
+    
+    return {
+        'periodo': periodo,
+        'saldo_inicial': saldo_inicial,
+        'aporte': aporte,
+        'interes': interes,
+        'saldo_final': saldo_final,
+    }
+
+
+def simular_crecimiento_cartera(monto_inicial, aporte_periodico, frecuencia, tea, edad_actual, edad_jubilacion):
+    """
+    Simula el crecimiento de una cartera con interés compuesto.
+    Ahora los aportes se consideran al FINAL del periodo.
+    El calendario se calcula con fórmulas cerradas (ver `calcular_tabla_cartera`).
+    
+    Parámetros:
+    -----------
+    monto_inicial : float
+        Depósito inicial en USD
+    aporte_periodico : float
+        Aporte regular en USD (0 si no hay aportes)
+    frecuencia : str
+        "Mensual", "Trimestral", "Semestral", "Anual"
+    tea : float
+        Tasa Efectiva Anual en porcentaje (ej: 8 para 8%)
+    edad_actual : int
+        Edad actual del usuario
+    edad_jubilacion : int
+        Edad planeada de jubilación
+    
+    Retorna:
+    --------
+    simulacion : SimulacionCartera
+        Se puede desempaquetar como antes:
+        df_resultados (tabla periodo por periodo), saldo_final,
+        total_aportado (inicial + aportes) e interes_total_ganado
+    """
+    # Validaciones básicas
+    _validar_parametros_cartera(monto_inicial, aporte_periodico, tea, edad_actual, edad_jubilacion)
+    
+    # Cálculos iniciales
+    plazo_años = edad_jubilacion - edad_actual
+    tea_decimal = tea / 100  # Convertir porcentaje a decimal
+    tasa_periodo, periodos_por_año = calcular_tasa_periodo(tea_decimal, frecuencia)
+    total_periodos = plazo_años * periodos_por_año
+    
+    columnas = calcular_tabla_cartera(monto_inicial, aporte_periodico, tasa_periodo, total_periodos)
+
+    # Crear DataFrame con resultados (redondeado a 2 decimales directamente sobre los arreglos)
+    df_resultados = pagina_tabla_cartera(columnas)
+    
+    # Calcular métricas finales
+    saldo_final = float(columnas['saldo_final'][-1])
+    total_aportado = monto_inicial + (aporte_periodico * total_periodos)  # Incluye el monto inicial
+    interes_total_ganado = saldo_final - total_aportado
+    
+    return SimulacionCartera(df_resultados, saldo_final, total_aportado, interes_total_ganado)
+
+
+def calcular_calendario_cartera(monto_inicial, aporte_periodico, frecuencia, tea, edad_actual, edad_jubilacion):
+    """
+    Calendario de `simular_crecimiento_cartera` solo como arreglos, sin construir
+    el DataFrame: la interfaz formatea únicamente la parte que muestra.
+
+    Parámetros:
+    -----------
+    Los mismos que `simular_crecimiento_cartera`.
+
+    Retorna:
+    --------
+    columnas : dict[str, numpy.ndarray]
+        Los arreglos de `calcular_tabla_cartera`
+    """
+    _validar_parametros_cartera(monto_inicial, aporte_periodico, tea, edad_actual, edad_jubilacion)
+    tasa_periodo, periodos_por_año = calcular_tasa_periodo(tea / 100, frecuencia)
+    total_periodos = (edad_jubilacion - edad_actual) * periodos_por_año
+    return calcular_tabla_cartera(monto_inicial, aporte_periodico, tasa_periodo, total_periodos)
+
+
+def pagina_tabla_cartera(columnas, inicio=0, fin=None):
+    """
+    Filas [inicio, fin) del calendario como DataFrame, con las columnas y el
+    redondeo de la tabla de `simular_crecimiento_cartera`.
+
+    Parámetros:
+    -----------
+    columnas : dict[str, numpy.ndarray]
+        Resultado de `calcular_tabla_cartera` o `calcular_calendario_cartera`
+    inicio, fin : int
+        Rango de filas (la fila i es el periodo i); por defecto la tabla completa
+
+    Retorna:
+    --------
+    df : pandas.DataFrame
+    """
+    import pandas as pd  # Import diferido: el núcleo se importa sin cargar pandas
+
+    tramo = slice(inicio, fin)
+    return pd.DataFrame({
+        nombre: columnas[clave][tramo] if clave == 'periodo' else np.round(columnas[clave][tramo], 2)
+        for nombre, clave in COLUMNAS_TABLA_CARTERA.items()
+    })
+
+
+def resumir_tabla_cartera_por_año(columnas, periodos_por_año):
+    """
+    Una fila por año del calendario: saldo al inicio y al final, aportes e intereses del año.
+
+    Parámetros:
+    -----------
+    columnas : dict[str, numpy.ndarray]
+        Resultado de `calcular_tabla_cartera` o `calcular_calendario_cartera`
+    periodos_por_año : int
+        Periodos de cada año (ver `FRECUENCIAS`)
+
+    Retorna:
+    --------
+    df : pandas.DataFrame
+        Columnas "Año", "Periodos", "Saldo Inicial (USD)", "Aportes (USD)",
+        "Intereses (USD)" y "Saldo Final (USD)"
+    """
+    import pandas as pd  # Import diferido: el núcleo se importa sin cargar pandas
+
+    # El periodo 0 solo tiene el monto inicial: los años empiezan en el periodo 1
+    n_periodos = len(columnas['periodo']) - 1
+    inicios = np.arange(1, n_periodos + 1, periodos_por_año)
+    fines = np.minimum(inicios + periodos_por_año - 1, n_periodos)
+    return pd.DataFrame({
+        'Año': np.arange(1, len(inicios) + 1),
+        'Periodos': [f"{a}–{b}" for a, b in zip(inicios.tolist(), fines.tolist())],
+        'Saldo Inicial (USD)': np.round(columnas['saldo_inicial'][inicios], 2),
+        'Aportes (USD)': np.round(np.add.reduceat(columnas['aporte'], inicios), 2),
+        'Intereses (USD)': np.round(np.add.reduceat(columnas['interes'], inicios), 2),
+        'Saldo Final (USD)': np.round(columnas['saldo_final'][fines], 2),
+    })
+
+
+def simular_cartera_lote(monto_inicial, aporte_periodico, frecuencia, tea, edad_actual, edad_jubilacion):
+    """
+    Calcula las métricas finales de muchas carteras en una sola llamada.
+    
+    Equivale a llamar `calcular_resumen_cartera` fila por fila, pero con
+    broadcasting de NumPy: las filas se agrupan por frecuencia para obtener
+    la tasa por periodo y cada fila usa su propio horizonte.
+    
+    Parámetros:
+    -----------
+    Los mismos que `simular_crecimiento_cartera`, como arreglos de igual
+    longitud (o escalares, que se aplican a todas las filas).
+    
+    Retorna:
+    --------
+    resumen : ResumenCartera
+        Con arreglos por fila en saldo_final, total_aportado e interes_total_ganado
+    """
+    monto_inicial, aporte_periodico, frecuencia, tea, edad_actual, edad_jubilacion = np.broadcast_arrays(
+        np.asarray(monto_inicial, dtype=float),
+        np.asarray(aporte_periodico, dtype=float),
+        np.asarray(frecuencia),
+        np.asarray(tea, dtype=float),
+        np.asarray(edad_actual),
+        np.asarray(edad_jubilacion),
+    )
+    _validar_parametros_cartera(monto_inicial, aporte_periodico, tea, edad_actual, edad_jubilacion)
+    
+    # Tasa por periodo y periodos por año, una vez por cada frecuencia distinta
+    tasa_periodo = np.empty(tea.shape)
+    periodos_por_año = np.empty(tea.shape, dtype=np.int64)
+    nombres, grupo = np.unique(frecuencia, return_inverse=True)
+    grupo = grupo.reshape(tea.shape)
+    for codigo, nombre in enumerate(nombres):
+        if nombre not in FRECUENCIAS:
+            raise ValueError(f"Frecuencia no válida: {nombre}")
+        filas = grupo == codigo
+        tasa_periodo[filas], periodos_por_año[filas] = calcular_tasa_periodo(tea[filas] / 100, str(nombre))
+    
+    total_periodos = (edad_jubilacion - edad_actual).astype(np.int64) * periodos_por_año
+    
+    crecimiento = np.exp(np.log1p(tasa_periodo) * total_periodos)
+    saldo_final = monto_inicial * crecimiento + aporte_periodico * _factor_acumulacion(tasa_periodo, total_periodos)
+    total_aportado = monto_inicial + aporte_periodico * total_periodos
+    interes_total_ganado = saldo_final - total_aportado
+    
+    return ResumenCartera(saldo_final, total_aportado, interes_total_ganado)
+
+
+def simular_cartera_lote_df(df_entrada):
+    """
+    Versión de `simular_cartera_lote` para un DataFrame con las columnas
+    'monto_inicial', 'aporte_periodico', 'frecuencia', 'tea', 'edad_actual'
+    y 'edad_jubilacion'.
+    
+    Retorna:
+    --------
+    df_salida : pandas.DataFrame
+        Copia de la entrada con las columnas 'saldo_final', 'total_aportado'
+        e 'interes_total_ganado' añadidas
+    """
+    saldo_final, total_aportado, interes_total_ganado = simular_cartera_lote(
+        monto_inicial=df_entrada['monto_inicial'].to_numpy(),
+        aporte_periodico=df_entrada['aporte_periodico'].to_numpy(),
+        frecuencia=df_entrada['frecuencia'].to_numpy(dtype=str),
+        tea=df_entrada['tea'].to_numpy(),
+        edad_actual=df_entrada['edad_actual'].to_numpy(),
+        edad_jubilacion=df_entrada['edad_jubilacion'].to_numpy()
+    )
+    df_salida = df_entrada.copy()
+    df_salida['saldo_final'] = saldo_final
+    df_salida['total_aportado'] = total_aportado
+    df_salida['interes_total_ganado'] = interes_total_ganado
+    return df_salida
@@ -0,0 +1,113 @@
+"""
+Grafo de resultados versionados de los módulos.
+
+Cada nodo guarda su último resultado, la llave de las entradas con que se
+calculó y la versión de cada nodo del que depende en ese momento. Así un
+nodo solo se recalcula cuando cambian sus entradas o sube la versión de
+algún nodo anterior, y se puede distinguir un resultado que falta de uno
+calculado con datos que ya cambiaron.
+"""
+from nucleo.cache import calcular_llave
+
+
+# Nodos del simulador y de qué nodos depende cada uno: A → B1 → B2 → Reporte y C → Reporte
+DEPENDENCIAS_RESULTADOS = {
+    "A": (),
+    "B1": ("A",),
+    "B2": ("B1",),
+    "C": (),
+    "Reporte": ("B2", "C"),
+}
+
+ESTADO_FALTANTE = "faltante"
+ESTADO_DESACTUALIZADO = "desactualizado"
+ESTADO_VIGENTE = "vigente"
+
+
+class GrafoResultados:
+    """Resultados de los módulos con la versión de las entradas de que provienen."""
+
+    def __init__(self, dependencias=DEPENDENCIAS_RESULTADOS):
+        self.dependencias = dict(dependencias)
+        # nombre → {"version", "llave", "versiones_padres", "valor", "llave_actual"}
+        self._nodos = {}
+
+    def _llave(self, nombre, entradas):
+        """Llave de las entradas propias más las versiones actuales de los nodos anteriores."""
+        versiones = tuple(self.version(padre) for padre in self.dependencias[nombre])
+        return calcular_llave(nombre, (entradas, versiones), {})
+
+    def version(self, nombre):
+        """Versión del resultado de un nodo (0 si nunca se calculó)."""
+        nodo = self._nodos.get(nombre)
+        return 0 if nodo is None else nodo["version"]
+
+    def valor(self, nombre, defecto=None):
+        nodo = self._nodos.get(nombre)
+        return defecto if nodo is None else nodo["valor"]
+
+    def observar(self, nombre, entradas):
+        """
+        Registra las entradas que muestra ahora la interfaz sin recalcular el nodo
+        (para los módulos que solo calculan al pulsar un botón).
+        """
+        nodo = self._nodos.setdefault(nombre, {"version": 0, "llave": None, "versiones_padres": {},
+                                               "valor": None, "llave_actual": None})
+        nodo["llave_actual"] = self._llave(nombre, entradas)
+
+    def actualizar(self, nombre, entradas, calcular):
+        """
+        Devuelve el resultado del nodo, recalculándolo solo si cambiaron sus
+        entradas o la versión de algún nodo anterior.
+
+        Parámetros:
+        -----------
+        nombre : str
+            Nodo de `dependencias`
+        entradas : object
+            Entradas propias del nodo (cualquier valor que acepte `calcular_llave`)
+        calcular : callable
+            Función sin argumentos que produce el resultado
+
+        Retorna:
+        --------
+        valor : object
+            Resultado del nodo
+        recalculado : bool
+            True si se llamó a `calcular` (y subió la versión del nodo)
+        """
+        llave = self._llave(nombre, entradas)
+        nodo = self._nodos.get(nombre)
+        if nodo is not None and nodo["llave"] == llave:
+            nodo["llave_actual"] = llave
+            return nodo["valor"], False
+
+        valor = calcular()
+        self._nodos[nombre] = {
+            "version": self.version(nombre) + 1,
+            "llave": llave,
+            "versiones_padres": {padre: self.version(padre) for padre in self.dependencias[nombre]},
+            "valor": valor,
+            "llave_actual": llave,
+        }
+        return valor, True
+
+    def estado(self, nombre):
+        """
+        ESTADO_FALTANTE si el nodo nunca se calculó; ESTADO_DESACTUALIZADO si sus
+        entradas o algún nodo anterior cambiaron desde entonces (o están desactualizados);
+        ESTADO_VIGENTE en otro caso.
+        """
+        nodo = self._nodos.get(nombre)
+        if nodo is None or nodo["llave"] is None:
+            return ESTADO_FALTANTE
+        if nodo["llave_actual"] != nodo["llave"]:
+            return ESTADO_DESACTUALIZADO
+        for padre in self.dependencias[nombre]:
+            if self.version(padre) != nodo["versiones_padres"][padre] or self.estado(padre) != ESTADO_VIGENTE:
+                return ESTADO_DESACTUALIZADO
+        return ESTADO_VIGENTE
+
+    def estados(self):
+        """Estado de cada nodo, en el orden de `dependencias`."""
+        return {nombre: self.estado(nombre) for nombre in self.dependencias}
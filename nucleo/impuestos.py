@@ -0,0 +1,64 @@
+from typing import NamedTuple
+
+import numpy as np
+
+
+# Tasa de impuesto sobre las ganancias según el origen de la inversión
+TASAS_IMPUESTO = {
+    "BVL": 0.05,   # Bolsa de Valores de Lima (fuente local)
+    "BEX": 0.295,  # Fuente extranjera
+}
+
+
+class ResultadoImpuesto(NamedTuple):
+    """Resultado del Módulo B1 (escalares o arreglos en lote)."""
+    ganancia: float
+    monto_impuesto: float
+    saldo_neto: float
+
+
+def obtener_tasa_impuesto(tipo_inversion):
+    """
+    Devuelve la tasa de impuesto para una opción de tipo de inversión.
+    
+    Parámetros:
+    -----------
+    tipo_inversion : str
+        Texto de la opción elegida; basta con que contenga "BVL" o "BEX".
+        Cualquier otro valor (p. ej. "Sin impuesto") no paga impuesto.
+    
+    Retorna:
+    --------
+    tasa_impuesto : float
+        Tasa en decimal
+    """
+    for clave, tasa in TASAS_IMPUESTO.items():
+        if clave in tipo_inversion:
+            return tasa
+    return 0.0
+
+
+def calcular_saldo_neto(saldo_bruto, aportes_totales, tasa_impuesto):
+    """
+    Aplica el impuesto sobre las ganancias al saldo acumulado.
+    
+    Parámetros:
+    -----------
+    saldo_bruto : float or numpy.ndarray
+        Fondo acumulado al jubilarse (Módulo A)
+    aportes_totales : float or numpy.ndarray
+        Total aportado, incluido el monto inicial
+    tasa_impuesto : float or numpy.ndarray
+        Tasa en decimal
+    
+    Retorna:
+    --------
+    resultado : ResultadoImpuesto
+        ganancia (nunca negativa), monto_impuesto y saldo_neto
+    """
+    ganancia = np.maximum(0.0, np.subtract(saldo_bruto, aportes_totales))
+    monto_impuesto = ganancia * tasa_impuesto
+    saldo_neto = saldo_bruto - monto_impuesto
+    if np.ndim(saldo_neto) == 0:
+        return ResultadoImpuesto(float(ganancia), float(monto_impuesto), float(saldo_neto))
+    return ResultadoImpuesto(ganancia, monto_impuesto, saldo_neto)
@@ -0,0 +1,229 @@
+"""
+Proyección por lotes A → B1 → B2 para archivos de afiliados.
+
+Uso:
+    python -m nucleo.lote afiliados.csv resultados.parquet --filas-por-bloque 100000
+
+El archivo de entrada (CSV o Parquet) se lee por bloques, cada bloque se procesa
+con operaciones vectorizadas y se escribe de inmediato, así que la memoria no
+depende del tamaño del archivo.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+from nucleo.cartera import simular_cartera_lote
+from nucleo.impuestos import calcular_saldo_neto, obtener_tasa_impuesto
+from nucleo.mortalidad import factor_anualidad_vitalicia, leer_tabla_mortalidad
+from nucleo.objetivo import resolver_aporte
+from nucleo.pension import calcular_pension
+
+
+# Columnas obligatorias (mismas unidades que los controles del Módulo A)
+COLUMNAS_REQUERIDAS = ("monto_inicial", "aporte_periodico", "frecuencia", "tea", "edad_actual", "edad_jubilacion")
+
+# Columnas opcionales y su valor por defecto (los mismos que la interfaz)
+COLUMNAS_OPCIONALES = {
+    "tipo_inversion": "BVL",            # Impuesto del Módulo B1
+    "tipo_inversion_retiro": "BVL",     # Impuesto sobre la rentabilidad en B2
+    "tasa_retorno": 5.0,                # Tasa anual durante el retiro, en %
+    "años_retiro": 20,
+}
+
+FILAS_POR_BLOQUE = 100_000
+
+
+def _tasas_por_tipo(tipos):
+    """Tasa de impuesto de cada fila, buscando cada tipo de inversión distinto una sola vez."""
+    valores, inverso = np.unique(np.asarray(tipos, dtype=str), return_inverse=True)
+    tasas = np.array([obtener_tasa_impuesto(v) for v in valores])
+    return tasas[inverso]
+
+
+def proyectar_lote(df):
+    """
+    Aplica los Módulos A, B1 y B2 a todas las filas de un DataFrame.
+
+    Parámetros:
+    -----------
+    df : pandas.DataFrame
+        Debe tener `COLUMNAS_REQUERIDAS`; las de `COLUMNAS_OPCIONALES` que
+        falten toman su valor por defecto
+
+    Retorna:
+    --------
+    df_salida : pandas.DataFrame
+        La entrada con las columnas saldo_bruto, total_aportado, ganancia,
+        monto_impuesto, saldo_neto, pension_mensual, impuesto_final y total_neto añadidas.
+        Si la entrada trae `pension_objetivo`, añade también `aporte_requerido`, y si
+        trae `sexo`, la `pension_vitalicia` según la tabla de mortalidad incluida
+    """
+    faltantes = [c for c in COLUMNAS_REQUERIDAS if c not in df.columns]
+    if faltantes:
+        raise ValueError(f"Faltan columnas obligatorias: {', '.join(faltantes)}")
+    df = df.copy()
+    for columna, defecto in COLUMNAS_OPCIONALES.items():
+        if columna not in df.columns:
+            df[columna] = defecto
+
+    # Módulo A: crecimiento de la cartera
+    saldo_bruto, total_aportado, _ = simular_cartera_lote(
+        monto_inicial=df["monto_inicial"].to_numpy(dtype=float),
+        aporte_periodico=df["aporte_periodico"].to_numpy(dtype=float),
+        frecuencia=df["frecuencia"].to_numpy(dtype=str),
+        tea=df["tea"].to_numpy(dtype=float),
+        edad_actual=df["edad_actual"].to_numpy(),
+        edad_jubilacion=df["edad_jubilacion"].to_numpy()
+    )
+
+    # Módulo B1: impuesto sobre la ganancia acumulada
+    ganancia, monto_impuesto, saldo_neto = calcular_saldo_neto(
+        saldo_bruto, total_aportado, _tasas_por_tipo(df["tipo_inversion"])
+    )
+
+    # Módulo B2: pensión mensual e impuesto sobre la rentabilidad del retiro
+    pension = calcular_pension(
+        saldo_neto,
+        df["tasa_retorno"].to_numpy(dtype=float) / 100,
+        df["años_retiro"].to_numpy(),
+        _tasas_por_tipo(df["tipo_inversion_retiro"])
+    )
+
+    df["saldo_bruto"] = saldo_bruto
+    df["total_aportado"] = total_aportado
+    df["ganancia"] = ganancia
+    df["monto_impuesto"] = monto_impuesto
+    df["saldo_neto"] = saldo_neto
+    df["pension_mensual"] = pension.pension_mensual
+    df["impuesto_final"] = pension.impuesto_final
+    df["total_neto"] = pension.total_neto
+
+    # Renta vitalicia con la tabla de mortalidad (la tabla se lee una sola vez por proceso)
+    if "sexo" in df.columns:
+        df["pension_vitalicia"] = saldo_neto * factor_anualidad_vitalicia(
+            df["tasa_retorno"].to_numpy(dtype=float) / 100,
+            df["edad_jubilacion"].to_numpy(),
+            df["sexo"].to_numpy(dtype=str),
+            leer_tabla_mortalidad()
+        )
+
+    # Aporte periódico que haría falta para llegar a la pensión objetivo de cada afiliado
+    if "pension_objetivo" in df.columns:
+        df["aporte_requerido"] = resolver_aporte(
+            df["pension_objetivo"].to_numpy(dtype=float),
+            df["monto_inicial"].to_numpy(dtype=float),
+            df["frecuencia"].to_numpy(dtype=str),
+            df["tea"].to_numpy(dtype=float),
+            df["edad_actual"].to_numpy(),
+            df["edad_jubilacion"].to_numpy(),
+            _tasas_por_tipo(df["tipo_inversion"]),
+            df["tasa_retorno"].to_numpy(dtype=float) / 100,
+            df["años_retiro"].to_numpy()
+        )
+    return df
+
+
+def _importar_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise SystemExit("Para leer o escribir Parquet instala pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+def _es_parquet(ruta):
+    return os.path.splitext(ruta)[1].lower() in (".parquet", ".pq")
+
+
+def leer_bloques(ruta, filas_por_bloque=FILAS_POR_BLOQUE):
+    """Genera DataFrames de a lo más `filas_por_bloque` filas a partir de un CSV o Parquet."""
+    if _es_parquet(ruta):
+        pa = _importar_pyarrow()
+        archivo = pa.parquet.ParquetFile(ruta)
+        for lote in archivo.iter_batches(batch_size=filas_por_bloque):
+            yield lote.to_pandas()
+    else:
+        import pandas as pd
+        yield from pd.read_csv(ruta, chunksize=filas_por_bloque)
+
+
+class EscritorIncremental:
+    """Escribe bloques de resultados a CSV o Parquet a medida que se generan."""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.parquet = _es_parquet(ruta)
+        self._escritor = None
+        self._primero = True
+
+    def escribir(self, df):
+        if self.parquet:
+            pa = _importar_pyarrow()
+            tabla = pa.Table.from_pandas(df, preserve_index=False)
+            if self._escritor is None:
+                self._escritor = pa.parquet.ParquetWriter(self.ruta, tabla.schema)
+            self._escritor.write_table(tabla)
+        else:
+            df.to_csv(self.ruta, mode="w" if self._primero else "a", header=self._primero, index=False)
+        self._primero = False
+
+    def cerrar(self):
+        if self._escritor is not None:
+            self._escritor.close()
+            self._escritor = None
+
+
+def procesar_archivo(entrada, salida, filas_por_bloque=FILAS_POR_BLOQUE):
+    """
+    Procesa un archivo completo bloque a bloque.
+
+    Retorna:
+    --------
+    filas : int
+        Filas procesadas
+    segundos : float
+        Tiempo total transcurrido
+    """
+    inicio = time.perf_counter()
+    filas = 0
+    escritor = EscritorIncremental(salida)
+    try:
+        for bloque in leer_bloques(entrada, filas_por_bloque):
+            escritor.escribir(proyectar_lote(bloque))
+            filas += len(bloque)
+    finally:
+        escritor.cerrar()
+    return filas, time.perf_counter() - inicio
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m nucleo.lote",
+        description="Proyecta la pensión (Módulos A → B1 → B2) de cada afiliado de un archivo CSV o Parquet."
+    )
+    parser.add_argument("entrada", help="Archivo de afiliados (.csv o .parquet)")
+    parser.add_argument("salida", help="Archivo de resultados (.csv o .parquet)")
+    parser.add_argument("--filas-por-bloque", type=int, default=FILAS_POR_BLOQUE,
+                        help=f"Filas leídas y procesadas a la vez (por defecto {FILAS_POR_BLOQUE:,})")
+    args = parser.parse_args(argv)
+    if args.filas_por_bloque < 1:
+        parser.error("--filas-por-bloque debe ser al menos 1")
+
+    try:
+        filas, segundos = procesar_archivo(args.entrada, args.salida, args.filas_por_bloque)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    velocidad = filas / segundos if segundos > 0 else float("inf")
+    print(f"{filas:,} filas procesadas en {segundos:.2f} s ({velocidad:,.0f} filas/s) → {args.salida}",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
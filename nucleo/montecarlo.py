@@ -0,0 +1,360 @@
+import numpy as np
+
+from nucleo.cartera import FRECUENCIAS, _validar_parametros_cartera
+
+
+# Percentiles que se reportan por defecto
+PERCENTILES = (5, 25, 50, 75, 95)
+
+# Trayectorias por bloque: acota la memoria a tamaño_bloque × total_periodos
+TAMAÑO_BLOQUE = 2048
+
+# Trayectorias que se conservan para los percentiles (son exactos hasta este número)
+MAX_MUESTRA = 20000
+
+
+def _generar_rendimientos(rng, n_periodos, n_trayectorias, media_periodo, volatilidad_periodo, distribucion):
+    """
+    Genera la matriz (periodos × trayectorias) de factores de crecimiento 1 + r.
+
+    Con distribución "normal", r ~ N(media, volatilidad) y el factor se limita a 0
+    (no se puede perder más del 100%). Con "lognormal", log(1 + r) ~ N(m, volatilidad)
+    con m elegido para que E[1 + r] = 1 + media.
+    """
+    z = rng.standard_normal((n_periodos, n_trayectorias))
+    if distribucion == "normal":
+        z *= volatilidad_periodo
+        z += 1 + media_periodo
+        np.maximum(z, 0.0, out=z)
+    elif distribucion == "lognormal":
+        z *= volatilidad_periodo
+        z += np.log1p(media_periodo) - volatilidad_periodo ** 2 / 2
+        np.exp(z, out=z)
+    else:
+        raise ValueError(f"Distribución no válida: {distribucion}")
+    return z
+
+
+def _simular_bloque(semilla, n_trayectorias, monto_inicial, aporte_periodico, media_periodo,
+                    volatilidad_periodo, total_periodos, puntos, distribucion):
+    """
+    Simula un bloque de trayectorias y devuelve los saldos en los periodos de `puntos`.
+
+    Retorna:
+    --------
+    saldos : numpy.ndarray
+        Matriz (len(puntos) × n_trayectorias) con el saldo final de cada periodo reportado
+    """
+    rng = np.random.default_rng(semilla)
+    factores = _generar_rendimientos(rng, total_periodos, n_trayectorias,
+                                     media_periodo, volatilidad_periodo, distribucion)
+
+    saldos = np.empty((len(puntos), n_trayectorias))
+    saldo = np.full(n_trayectorias, float(monto_inicial))
+    fila = 0
+    if puntos[0] == 0:
+        saldos[0] = saldo
+        fila = 1
+
+    # Cada fila de `factores` es un periodo: el bucle recorre periodos, no trayectorias
+    for periodo in range(1, total_periodos + 1):
+        saldo *= factores[periodo - 1]
+        saldo += aporte_periodico  # Aporte al FINAL del periodo, como en el modo determinista
+        if fila < len(puntos) and puntos[fila] == periodo:
+            saldos[fila] = saldo
+            fila += 1
+
+    return saldos
+
+
+def preparar_montecarlo(monto_inicial, aporte_periodico, frecuencia, tea, volatilidad,
+                        edad_actual, edad_jubilacion, n_trayectorias, semilla, tamaño_bloque):
+    """
+    Valida los parámetros y calcula todo lo que comparten los bloques de la simulación.
+
+    Retorna:
+    --------
+    plan : dict
+        Parámetros por periodo, periodos reportados (uno por año) y la lista de
+        bloques como tuplas (semilla del bloque, trayectorias del bloque)
+    """
+    _validar_parametros_cartera(monto_inicial, aporte_periodico, tea, edad_actual, edad_jubilacion)
+    if volatilidad < 0:
+        raise ValueError("La volatilidad no puede ser negativa")
+    if n_trayectorias < 1:
+        raise ValueError("Debe simularse al menos una trayectoria")
+
+    periodos_por_año = FRECUENCIAS[frecuencia]
+    total_periodos = (edad_jubilacion - edad_actual) * periodos_por_año
+
+    # Una semilla independiente por bloque: el resultado no depende del orden
+    # en que se procesen los bloques (ni de cuántos procesos los ejecuten)
+    n_bloques = -(-n_trayectorias // tamaño_bloque)
+    semillas = np.random.SeedSequence(semilla).spawn(n_bloques + 1)
+    tamaños = [tamaño_bloque] * (n_bloques - 1) + [n_trayectorias - tamaño_bloque * (n_bloques - 1)]
+
+    return {
+        'monto_inicial': float(monto_inicial),
+        'aporte_periodico': float(aporte_periodico),
+        'media_periodo': (1 + tea / 100) ** (1 / periodos_por_año) - 1,
+        'volatilidad_periodo': volatilidad / 100 / np.sqrt(periodos_por_año),
+        'total_periodos': int(total_periodos),
+        # Se reporta el cierre de cada año (el periodo 0 es el monto inicial)
+        'puntos': np.arange(0, total_periodos + 1, periodos_por_año),
+        'bloques': list(zip(semillas[:-1], tamaños)),
+        # La última semilla es la del muestreo de `MuestraTrayectorias`
+        'semilla_muestra': semillas[-1],
+    }
+
+
+def resumir_montecarlo(puntos, saldos, percentiles=PERCENTILES):
+    """
+    Combina los saldos de todas las trayectorias en percentiles por periodo reportado.
+
+    Parámetros:
+    -----------
+    puntos : numpy.ndarray
+        Periodos reportados
+    saldos : numpy.ndarray
+        Matriz (len(puntos) × n_trayectorias)
+    percentiles : tuple
+        Percentiles a calcular
+
+    Retorna:
+    --------
+    resultado : dict
+        'periodos', 'percentiles' ({p: arreglo por periodo}), 'media',
+        'saldos_finales' y 'n_trayectorias'
+    """
+    valores = np.percentile(saldos, percentiles, axis=1)
+    return {
+        'periodos': puntos,
+        'percentiles': {p: valores[k] for k, p in enumerate(percentiles)},
+        'media': saldos.mean(axis=1),
+        'saldos_finales': saldos[-1].copy(),
+        'n_trayectorias': saldos.shape[1],
+    }
+
+
+class MuestraTrayectorias:
+    """
+    Combina los bloques de trayectorias a medida que llegan, con memoria acotada.
+
+    Suma los saldos (la media es exacta) y conserva una muestra uniforme de a lo
+    sumo `max_muestra` trayectorias (muestreo de reservorio), con la que se
+    calculan los percentiles. Mientras n_trayectorias <= max_muestra la muestra
+    son todas las trayectorias y los percentiles son exactos.
+
+    Parámetros:
+    -----------
+    n_filas : int
+        Valores por trayectoria (periodos reportados)
+    n_trayectorias : int
+        Trayectorias que se van a agregar (solo para dimensionar la muestra)
+    semilla : int, numpy.random.SeedSequence or None
+        Semilla del muestreo
+    max_muestra : int
+        Trayectorias conservadas como máximo
+    """
+
+    def __init__(self, n_filas, n_trayectorias, semilla=None, max_muestra=MAX_MUESTRA):
+        self.capacidad = max(1, min(int(n_trayectorias), int(max_muestra)))
+        self.muestra = np.empty((n_filas, self.capacidad))
+        self.suma = np.zeros(n_filas)
+        self.n = 0
+        self.rng = np.random.default_rng(semilla)
+
+    def agregar(self, bloque):
+        """Agrega un bloque (n_filas × trayectorias del bloque)."""
+        n_bloque = bloque.shape[1]
+        self.suma += bloque.sum(axis=1)
+        # Mientras haya espacio se copian las trayectorias tal cual
+        libres = max(0, min(self.capacidad - self.n, n_bloque))
+        self.muestra[:, self.n:self.n + libres] = bloque[:, :libres]
+        # Después, la trayectoria i-ésima reemplaza a una al azar con probabilidad capacidad / (i + 1)
+        if libres < n_bloque:
+            indices = self.n + np.arange(libres, n_bloque)
+            destino = self.rng.integers(0, indices + 1)
+            aceptadas = destino < self.capacidad
+            self.muestra[:, destino[aceptadas]] = bloque[:, libres:][:, aceptadas]
+        self.n += n_bloque
+
+    def valores(self):
+        """Matriz (n_filas × trayectorias conservadas)."""
+        return self.muestra[:, :min(self.n, self.capacidad)]
+
+    def resumir(self, puntos, percentiles=PERCENTILES):
+        """
+        Igual que `resumir_montecarlo`, con la media y 'n_trayectorias' de todas
+        las trayectorias agregadas; 'saldos_finales' son los de la muestra.
+        """
+        resultado = resumir_montecarlo(puntos, self.valores(), percentiles)
+        resultado['media'] = self.suma / self.n
+        resultado['n_trayectorias'] = self.n
+        return resultado
+
+
+def simular_montecarlo_cartera(monto_inicial, aporte_periodico, frecuencia, tea, volatilidad,
+                               edad_actual, edad_jubilacion, n_trayectorias=10000,
+                               distribucion="normal", semilla=None, percentiles=PERCENTILES,
+                               tamaño_bloque=TAMAÑO_BLOQUE):
+    """
+    Simula el crecimiento de la cartera con rendimientos aleatorios por periodo.
+
+    Las trayectorias se procesan en bloques de `tamaño_bloque` columnas, así que
+    nunca se guarda la matriz completa trayectorias × periodos: de cada bloque solo
+    se toma el saldo al cierre de cada año y se agrega a `MuestraTrayectorias`, así
+    que la memoria no crece con `n_trayectorias` más allá de `MAX_MUESTRA`.
+
+    Parámetros:
+    -----------
+    monto_inicial, aporte_periodico, frecuencia, edad_actual, edad_jubilacion :
+        Igual que en `simular_crecimiento_cartera`
+    tea : float
+        Rendimiento anual esperado en porcentaje (ej: 8 para 8%)
+    volatilidad : float
+        Volatilidad anual de los rendimientos en porcentaje (ej: 15 para 15%)
+    n_trayectorias : int
+        Número de trayectorias a simular
+    distribucion : str
+        "normal" o "lognormal"
+    semilla : int or None
+        Semilla para reproducir los resultados
+    percentiles : tuple
+        Percentiles a reportar
+    tamaño_bloque : int
+        Trayectorias simuladas a la vez
+
+    Retorna:
+    --------
+    resultado : dict
+        Ver `resumir_montecarlo`
+    """
+    plan = preparar_montecarlo(monto_inicial, aporte_periodico, frecuencia, tea, volatilidad,
+                               edad_actual, edad_jubilacion, n_trayectorias, semilla, tamaño_bloque)
+
+    muestra = MuestraTrayectorias(len(plan['puntos']), n_trayectorias, plan['semilla_muestra'])
+    for semilla_bloque, n_bloque in plan['bloques']:
+        muestra.agregar(_simular_bloque(
+            semilla_bloque, n_bloque, plan['monto_inicial'], plan['aporte_periodico'],
+            plan['media_periodo'], plan['volatilidad_periodo'], plan['total_periodos'],
+            plan['puntos'], distribucion
+        ))
+
+    return muestra.resumir(plan['puntos'], percentiles)
+
+
+def _simular_bloque_retiro(semilla, n_trayectorias, saldo_inicial, retiro_mensual, media_mes,
+                           volatilidad_mes, n_meses, distribucion):
+    """
+    Simula un bloque de trayectorias del retiro retirando `retiro_mensual` al final de cada mes.
+
+    Las trayectorias agotadas salen del cálculo: cada mes solo se generan
+    rendimientos y se actualizan saldos de las que siguen activas.
+
+    Retorna:
+    --------
+    saldos : numpy.ndarray
+        Matriz (años + 1 × n_trayectorias) con el saldo al cierre de cada año (0 si se agotó)
+    mes_agotamiento : numpy.ndarray
+        Mes en que el saldo no alcanzó para el retiro (0 si nunca se agotó)
+    """
+    rng = np.random.default_rng(semilla)
+    saldos = np.zeros((n_meses // 12 + 1, n_trayectorias))
+    saldos[0] = saldo_inicial
+    mes_agotamiento = np.zeros(n_trayectorias, dtype=np.int64)
+    # Tolerancia para no contar como ruina el residuo de redondeo de la última cuota
+    tolerancia = 1e-9 * max(saldo_inicial, retiro_mensual)
+
+    activas = np.arange(n_trayectorias)
+    saldo = np.full(n_trayectorias, float(saldo_inicial))
+    for mes in range(1, n_meses + 1):
+        factores = _generar_rendimientos(rng, 1, len(activas), media_mes, volatilidad_mes, distribucion)[0]
+        saldo *= factores
+        saldo -= retiro_mensual
+        agotadas = saldo < -tolerancia
+        if agotadas.any():
+            mes_agotamiento[activas[agotadas]] = mes
+            activas = activas[~agotadas]
+            saldo = saldo[~agotadas]
+            if len(activas) == 0:
+                break
+        if mes % 12 == 0:
+            saldos[mes // 12, activas] = np.maximum(saldo, 0.0)
+
+    return saldos, mes_agotamiento
+
+
+def simular_montecarlo_retiro(saldo_neto, pension_mensual, tasa_retorno, volatilidad, años_retiro,
+                              edad_jubilacion, n_trayectorias=10000, distribucion="normal", semilla=None,
+                              percentiles=PERCENTILES, tamaño_bloque=TAMAÑO_BLOQUE):
+    """
+    Riesgo de secuencia de rendimientos: simula el retiro con rendimientos mensuales
+    aleatorios mientras se retira `pension_mensual` cada mes.
+
+    Con volatilidad 0 reproduce la anualidad de `calcular_pension`: el saldo se
+    agota exactamente en el último mes y la probabilidad de ruina es 0.
+
+    Parámetros:
+    -----------
+    saldo_neto : float
+        Saldo disponible al jubilarse (Módulo B1)
+    pension_mensual : float
+        Retiro al final de cada mes
+    tasa_retorno : float
+        Rendimiento anual esperado durante el retiro (en decimal); la media mensual es tasa / 12
+    volatilidad : float
+        Volatilidad anual de los rendimientos en porcentaje (ej: 10 para 10%)
+    años_retiro : int
+        Años durante los que se recibe la pensión
+    edad_jubilacion : int
+        Edad al iniciar el retiro (para expresar el agotamiento como edad)
+    n_trayectorias, distribucion, semilla, percentiles, tamaño_bloque :
+        Igual que en `simular_montecarlo_cartera`
+
+    Retorna:
+    --------
+    resultado : dict
+        Lo de `resumir_montecarlo` (saldos al cierre de cada año de retiro) más
+        'probabilidad_ruina' (sobre todas las trayectorias), 'edades_agotamiento'
+        (edad en años de las trayectorias agotadas de la muestra, ver
+        `MuestraTrayectorias`) y 'percentiles_edad_agotamiento'
+    """
+    if volatilidad < 0:
+        raise ValueError("La volatilidad no puede ser negativa")
+    if n_trayectorias < 1:
+        raise ValueError("Debe simularse al menos una trayectoria")
+    if años_retiro < 1:
+        raise ValueError("Los años de retiro deben ser al menos 1")
+
+    n_meses = int(años_retiro) * 12
+    n_bloques = -(-n_trayectorias // tamaño_bloque)
+    semillas = np.random.SeedSequence(semilla).spawn(n_bloques + 1)
+    tamaños = [tamaño_bloque] * (n_bloques - 1) + [n_trayectorias - tamaño_bloque * (n_bloques - 1)]
+
+    # La muestra guarda, por trayectoria, los saldos anuales y en la última fila el mes de agotamiento
+    n_años = int(años_retiro) + 1
+    muestra = MuestraTrayectorias(n_años + 1, n_trayectorias, semillas[-1])
+    n_agotadas = 0
+    for semilla_bloque, n_bloque in zip(semillas[:-1], tamaños):
+        saldos, mes_agotamiento = _simular_bloque_retiro(
+            semilla_bloque, n_bloque, float(saldo_neto), float(pension_mensual), tasa_retorno / 12,
+            volatilidad / 100 / np.sqrt(12), n_meses, distribucion
+        )
+        n_agotadas += int(np.count_nonzero(mes_agotamiento))
+        muestra.agregar(np.vstack([saldos, mes_agotamiento]))
+
+    valores = muestra.valores()
+    resultado = resumir_montecarlo(np.arange(n_años), valores[:-1], percentiles)
+    resultado['media'] = muestra.suma[:-1] / muestra.n
+    resultado['n_trayectorias'] = muestra.n
+    mes_agotamiento = valores[-1]
+    agotadas = mes_agotamiento > 0
+    edades_agotamiento = edad_jubilacion + mes_agotamiento[agotadas] / 12
+    resultado['probabilidad_ruina'] = n_agotadas / muestra.n
+    resultado['edades_agotamiento'] = edades_agotamiento
+    resultado['percentiles_edad_agotamiento'] = (
+        {p: float(v) for p, v in zip(percentiles, np.percentile(edades_agotamiento, percentiles))}
+        if agotadas.any() else {}
+    )
+    return resultado
@@ -0,0 +1,195 @@
+import os
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+
+from nucleo.pension import ResultadoPension, _como_escalar
+
+# Tabla incluida con el simulador. Es ILUSTRATIVA: se generó con una ley de
+# Gompertz–Makeham (mu_x = A + B·c^x), no es una tabla oficial. Para cálculos
+# reales usa la tabla regulatoria con el mismo formato: columnas edad, sexo, qx.
+RUTA_TABLA_MORTALIDAD = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                     "datos", "tabla_mortalidad.csv")
+
+SEXOS = {"H": "Hombre", "M": "Mujer"}
+
+
+class TablaMortalidad(NamedTuple):
+    """Tabla de vida ya procesada: una fila por sexo, una columna por edad (o mes)."""
+    sexos: tuple
+    edades: np.ndarray
+    qx: np.ndarray
+    # Sobrevivientes a cada edad en meses (l_0 = 1), interpolados linealmente
+    # dentro de cada año (muertes uniformes): forma (sexos × edad_máxima·12 + 1)
+    l_mensual: np.ndarray
+
+
+def _procesar_tabla(df):
+    """Valida la tabla (edad, sexo, qx) y calcula los sobrevivientes mes a mes."""
+    faltantes = [c for c in ("edad", "sexo", "qx") if c not in df.columns]
+    if faltantes:
+        raise ValueError(f"Faltan columnas en la tabla de mortalidad: {', '.join(faltantes)}")
+    if ((df["qx"] < 0) | (df["qx"] > 1)).any():
+        raise ValueError("Los qx deben estar entre 0 y 1")
+
+    sexos = tuple(sorted(df["sexo"].astype(str).unique()))
+    tablas = []
+    for sexo in sexos:
+        filas = df[df["sexo"].astype(str) == sexo].sort_values("edad")
+        edades = filas["edad"].to_numpy(dtype=np.int64)
+        if edades[0] != 0 or np.any(np.diff(edades) != 1):
+            raise ValueError(f"Las edades del sexo {sexo} deben ir de 0 en adelante sin saltos")
+        tablas.append(filas["qx"].to_numpy(dtype=float))
+    if len({len(qx) for qx in tablas}) != 1:
+        raise ValueError("Todos los sexos deben tener la misma edad máxima")
+
+    qx = np.vstack(tablas)
+    qx[:, -1] = 1.0  # Nadie sobrevive a la última edad de la tabla
+    n_edades = qx.shape[1]
+    lx = np.hstack([np.ones((len(sexos), 1)), np.cumprod(1 - qx, axis=1)])
+
+    # l a edades fraccionarias: interpolación lineal entre l_x y l_{x+1}
+    meses = np.arange(n_edades * 12 + 1)
+    edad_entera, fraccion = meses // 12, (meses % 12) / 12
+    siguiente = np.minimum(edad_entera + 1, n_edades)
+    l_mensual = lx[:, edad_entera] * (1 - fraccion) + lx[:, siguiente] * fraccion
+
+    return TablaMortalidad(sexos, np.arange(n_edades), qx, l_mensual)
+
+
+@lru_cache(maxsize=8)
+def _leer_tabla_cacheada(ruta, modificacion):
+    import pandas as pd  # Import diferido: el núcleo se importa sin cargar pandas
+
+    return _procesar_tabla(pd.read_csv(ruta))
+
+
+def leer_tabla_mortalidad(ruta=RUTA_TABLA_MORTALIDAD):
+    """
+    Lee y procesa una tabla de vida desde un CSV local con columnas edad, sexo y qx.
+
+    El resultado se guarda en memoria por ruta y fecha de modificación: las
+    llamadas siguientes no vuelven a leer el archivo mientras no cambie.
+
+    Retorna:
+    --------
+    tabla : TablaMortalidad
+    """
+    ruta = os.path.abspath(ruta)
+    return _leer_tabla_cacheada(ruta, os.stat(ruta).st_mtime_ns)
+
+
+def _indices(tabla, edad, sexo):
+    """Fila de sexo y mes de inicio de cada afiliado, validados contra la tabla."""
+    nombres, inverso = np.unique(np.asarray(sexo, dtype=str), return_inverse=True)
+    for nombre in nombres:
+        if nombre not in tabla.sexos:
+            raise ValueError(f"Sexo no encontrado en la tabla de mortalidad: {nombre}")
+    fila = np.array([tabla.sexos.index(str(n)) for n in nombres], dtype=np.int64)[inverso]
+    fila = fila.reshape(np.shape(sexo))
+
+    edad = np.asarray(edad, dtype=np.int64)
+    if np.any(edad < 0) or np.any(edad >= len(tabla.edades)):
+        raise ValueError(f"La edad debe estar entre 0 y {len(tabla.edades) - 1}")
+    fila, mes_inicio = np.broadcast_arrays(fila, edad * 12)
+    return fila, mes_inicio
+
+
+def anualidad_vitalicia(tasa_retorno, edad, sexo, tabla, años_maximo=None):
+    """
+    Valor actual de 1 USD al mes (vencido) pagado mientras el afiliado viva.
+
+    Con funciones de conmutación D_j = v^j·l_j y N_j = Σ_{m≥j} D_m (j en meses),
+    la anualidad desde la edad x es N_{12x+1} / D_{12x}; así cualquier número
+    de afiliados de distintas edades se resuelve con indexación, sin bucles.
+    Las conmutaciones se calculan una vez por cada tasa distinta (en un lote
+    conviene que las tasas sean pocas y repetidas, como en los archivos de afiliados).
+
+    Parámetros:
+    -----------
+    tasa_retorno : float or numpy.ndarray
+        Tasa anual durante el retiro (en decimal); la tasa mensual es tasa / 12
+    edad : int or numpy.ndarray
+        Edad al jubilarse
+    sexo : str or numpy.ndarray
+        Código de sexo de la tabla ("H" o "M" en la tabla incluida)
+    tabla : TablaMortalidad
+        Resultado de `leer_tabla_mortalidad`
+    años_maximo : int or None
+        Si se indica, la renta deja de pagarse tras ese número de años aunque el afiliado viva
+
+    Retorna:
+    --------
+    anualidad : float or numpy.ndarray
+        Meses de pensión "esperados y descontados": saldo / anualidad es la pensión mensual
+    """
+    fila, mes_inicio = _indices(tabla, edad, sexo)
+    tasas, grupo = np.unique(np.asarray(tasa_retorno, dtype=float), return_inverse=True)
+    if np.any(tasas < 0):
+        raise ValueError("La tasa de retorno no puede ser negativa")
+    grupo, fila, mes_inicio = np.broadcast_arrays(grupo.reshape(np.shape(tasa_retorno)), fila, mes_inicio)
+
+    n_meses = tabla.l_mensual.shape[1]
+    j = np.arange(n_meses)
+    # D[tasa, sexo, mes] y N con un cero al final para los índices fuera de la tabla
+    D = np.exp(-np.log1p(tasas / 12)[:, None, None] * j) * tabla.l_mensual[None]
+    N = np.concatenate([np.cumsum(D[..., ::-1], axis=-1)[..., ::-1], np.zeros(D.shape[:-1] + (1,))], axis=-1)
+
+    fin = n_meses if años_maximo is None else np.minimum(mes_inicio + 1 + np.asarray(años_maximo) * 12, n_meses)
+    anualidad = (N[grupo, fila, mes_inicio + 1] - N[grupo, fila, fin]) / D[grupo, fila, mes_inicio]
+    return _como_escalar(anualidad)
+
+
+def factor_anualidad_vitalicia(tasa_retorno, edad, sexo, tabla, años_maximo=None):
+    """
+    Pensión mensual por cada dólar de saldo en una renta vitalicia: el análogo
+    con mortalidad de `factor_anualidad`.
+
+    Retorna:
+    --------
+    factor : float or numpy.ndarray
+        1 / `anualidad_vitalicia`
+    """
+    return 1 / anualidad_vitalicia(tasa_retorno, edad, sexo, tabla, años_maximo)
+
+
+def esperanza_vida(edad, sexo, tabla):
+    """
+    Años de vida restantes esperados a la edad dada (suma de la supervivencia mes a mes).
+
+    Retorna:
+    --------
+    años : float or numpy.ndarray
+    """
+    return anualidad_vitalicia(0.0, edad, sexo, tabla) / 12
+
+
+def calcular_pension_vitalicia(saldo_neto, tasa_retorno, edad, sexo, tabla, tasa_impuesto):
+    """
+    Pensión mensual vitalicia y totales esperados tras el impuesto sobre la rentabilidad.
+    Es el análogo de `calcular_pension` con la duración dada por la tabla de vida.
+
+    Parámetros:
+    -----------
+    saldo_neto : float or numpy.ndarray
+        Saldo disponible al jubilarse (Módulo B1)
+    tasa_retorno : float or numpy.ndarray
+        Tasa de retorno anual durante el retiro (en decimal)
+    edad, sexo, tabla :
+        Igual que en `anualidad_vitalicia`
+    tasa_impuesto : float or numpy.ndarray
+        Tasa aplicada a la ganancia del periodo de retiro (en decimal)
+
+    Retorna:
+    --------
+    resultado : ResultadoPension
+        Los totales usan los meses de pago esperados (esperanza de vida × 12)
+    """
+    pension_mensual = np.multiply(saldo_neto, factor_anualidad_vitalicia(tasa_retorno, edad, sexo, tabla))
+    total_recibido = pension_mensual * anualidad_vitalicia(0.0, edad, sexo, tabla)
+    ganancia_total = total_recibido - saldo_neto
+    impuesto_final = ganancia_total * tasa_impuesto
+    total_neto = total_recibido - impuesto_final
+    return ResultadoPension(*(_como_escalar(v) for v in (pension_mensual, total_recibido, ganancia_total,
+                                                         impuesto_final, total_neto)))
@@ -0,0 +1,188 @@
+import numpy as np
+
+from nucleo.cartera import FRECUENCIAS, _factor_acumulacion
+from nucleo.pension import factor_anualidad
+
+
+# Límites de búsqueda (los mismos que permiten los controles del Módulo A)
+TEA_MAXIMA = 50.0
+EDAD_MAXIMA = 100
+
+
+def periodos_por_año(frecuencia):
+    """
+    Periodos por año de cada frecuencia (la búsqueda de nombres se hace una sola vez).
+
+    Parámetros:
+    -----------
+    frecuencia : str or array-like of str
+        Nombres de `FRECUENCIAS` ("Mensual", "Anual", ...)
+
+    Retorna:
+    --------
+    periodos : numpy.ndarray
+        Enteros con la misma forma que `frecuencia`
+    """
+    nombres, inverso = np.unique(np.asarray(frecuencia), return_inverse=True)
+    for nombre in nombres:
+        if nombre not in FRECUENCIAS:
+            raise ValueError(f"Frecuencia no válida: {nombre}")
+    return np.array([FRECUENCIAS[str(n)] for n in nombres], dtype=np.int64)[inverso].reshape(np.shape(frecuencia))
+
+
+def coeficientes_pension(periodos_por_año, tea, edad_actual, edad_jubilacion, tasa_impuesto, tasa_retorno,
+                         años_retiro):
+    """
+    Coeficientes de la cadena A → B1 → B2, que es lineal en el monto inicial y el aporte:
+
+        pension = factor · (coef_monto · monto_inicial + coef_aporte · aporte_periodico)
+
+    Con TEA ≥ 0 la ganancia nunca es negativa, así que el impuesto de B1 es
+    tasa · (saldo - aportes) y el saldo neto queda (1 - t) · saldo + t · aportes.
+
+    Parámetros:
+    -----------
+    periodos_por_año : int or numpy.ndarray
+        Resultado de `periodos_por_año`
+    tea, edad_actual, edad_jubilacion, tasa_impuesto, tasa_retorno, años_retiro :
+        Igual que en `proyectar_pension`; admiten broadcasting
+
+    Retorna:
+    --------
+    (factor, coef_monto, coef_aporte) : tuple of numpy.ndarray
+    """
+    # (1 + i)^n con i = (1 + TEA)^(1/f) - 1 es (1 + TEA)^(n/f)
+    log_tea = np.log1p(np.asarray(tea, dtype=float) / 100)
+    tasa_periodo = np.expm1(log_tea / periodos_por_año)
+    n = np.subtract(edad_jubilacion, edad_actual) * periodos_por_año
+    crecimiento = np.exp(log_tea * (n / periodos_por_año))
+    acumulacion = _factor_acumulacion(tasa_periodo, n)
+    coef_monto = (1 - tasa_impuesto) * crecimiento + tasa_impuesto
+    coef_aporte = (1 - tasa_impuesto) * acumulacion + tasa_impuesto * n
+    factor = factor_anualidad(tasa_retorno, años_retiro)
+    return factor, coef_monto, coef_aporte
+
+
+def _pension(periodos_por_año, monto_inicial, aporte_periodico, tea, edad_actual, edad_jubilacion,
+             tasa_impuesto, tasa_retorno, años_retiro):
+    factor, coef_monto, coef_aporte = coeficientes_pension(periodos_por_año, tea, edad_actual, edad_jubilacion,
+                                                           tasa_impuesto, tasa_retorno, años_retiro)
+    return factor * (coef_monto * np.asarray(monto_inicial, dtype=float)
+                     + coef_aporte * np.asarray(aporte_periodico, dtype=float))
+
+
+def proyectar_pension(monto_inicial, aporte_periodico, frecuencia, tea, edad_actual, edad_jubilacion,
+                      tasa_impuesto, tasa_retorno, años_retiro):
+    """
+    Pensión mensual de la cadena completa: crecimiento (A), impuesto sobre la
+    ganancia (B1) y anualidad (B2), con broadcasting sobre todos los parámetros.
+
+    Parámetros:
+    -----------
+    monto_inicial, aporte_periodico, frecuencia, tea, edad_actual, edad_jubilacion :
+        Igual que en `simular_crecimiento_cartera` (TEA en porcentaje)
+    tasa_impuesto : float or numpy.ndarray
+        Tasa de B1 sobre la ganancia (en decimal)
+    tasa_retorno : float or numpy.ndarray
+        Tasa anual durante el retiro (en decimal)
+    años_retiro : int or numpy.ndarray
+        Años de pensión
+
+    Retorna:
+    --------
+    pension_mensual : numpy.ndarray
+    """
+    return _pension(periodos_por_año(frecuencia), monto_inicial, aporte_periodico, tea, edad_actual,
+                    edad_jubilacion, tasa_impuesto, tasa_retorno, años_retiro)
+
+
+def resolver_aporte(pension_objetivo, monto_inicial, frecuencia, tea, edad_actual, edad_jubilacion,
+                    tasa_impuesto, tasa_retorno, años_retiro):
+    """
+    Aporte periódico necesario para alcanzar `pension_objetivo` (fórmula cerrada).
+
+    Retorna:
+    --------
+    aporte_periodico : numpy.ndarray
+        0 cuando el monto inicial por sí solo ya alcanza el objetivo
+    """
+    factor, coef_monto, coef_aporte = coeficientes_pension(periodos_por_año(frecuencia), tea, edad_actual,
+                                                           edad_jubilacion, tasa_impuesto, tasa_retorno, años_retiro)
+    saldo_neto_objetivo = np.asarray(pension_objetivo, dtype=float) / factor
+    return np.maximum(0.0, (saldo_neto_objetivo - coef_monto * np.asarray(monto_inicial, dtype=float)) / coef_aporte)
+
+
+def resolver_monto_inicial(pension_objetivo, aporte_periodico, frecuencia, tea, edad_actual, edad_jubilacion,
+                           tasa_impuesto, tasa_retorno, años_retiro):
+    """
+    Monto inicial necesario para alcanzar `pension_objetivo` (fórmula cerrada).
+
+    Retorna:
+    --------
+    monto_inicial : numpy.ndarray
+        0 cuando los aportes por sí solos ya alcanzan el objetivo
+    """
+    factor, coef_monto, coef_aporte = coeficientes_pension(periodos_por_año(frecuencia), tea, edad_actual,
+                                                           edad_jubilacion, tasa_impuesto, tasa_retorno, años_retiro)
+    saldo_neto_objetivo = np.asarray(pension_objetivo, dtype=float) / factor
+    return np.maximum(0.0, (saldo_neto_objetivo - coef_aporte * np.asarray(aporte_periodico, dtype=float)) / coef_monto)
+
+
+def resolver_tea(pension_objetivo, monto_inicial, aporte_periodico, frecuencia, edad_actual, edad_jubilacion,
+                 tasa_impuesto, tasa_retorno, años_retiro, iteraciones=50):
+    """
+    TEA (en %) necesaria para alcanzar `pension_objetivo`.
+
+    La pensión crece con la TEA, así que se usa bisección vectorizada en [0%, 50%]
+    (50 pasos: precisión mejor que 1e-12 puntos porcentuales).
+
+    Retorna:
+    --------
+    tea : numpy.ndarray
+        NaN si el objetivo no se alcanza ni con 50% (o ya se supera con 0%, en cuyo caso es 0)
+    """
+    argumentos = dict(periodos_por_año=periodos_por_año(frecuencia), monto_inicial=monto_inicial,
+                      aporte_periodico=aporte_periodico, edad_actual=edad_actual, edad_jubilacion=edad_jubilacion,
+                      tasa_impuesto=tasa_impuesto, tasa_retorno=tasa_retorno, años_retiro=años_retiro)
+    objetivo = np.asarray(pension_objetivo, dtype=float)
+    minimo = _pension(tea=0.0, **argumentos)
+    objetivo, minimo = np.broadcast_arrays(objetivo, minimo)
+    bajo = np.zeros(objetivo.shape)
+    alto = np.full(objetivo.shape, TEA_MAXIMA)
+    alcanzable = _pension(tea=alto, **argumentos) >= objetivo
+    for _ in range(iteraciones):
+        medio = (bajo + alto) / 2
+        suficiente = _pension(tea=medio, **argumentos) >= objetivo
+        alto = np.where(suficiente, medio, alto)
+        bajo = np.where(suficiente, bajo, medio)
+    return np.where(minimo >= objetivo, 0.0, np.where(alcanzable, alto, np.nan))
+
+
+def resolver_edad_jubilacion(pension_objetivo, monto_inicial, aporte_periodico, frecuencia, tea, edad_actual,
+                             tasa_impuesto, tasa_retorno, años_retiro, edad_maxima=EDAD_MAXIMA):
+    """
+    Menor edad de jubilación (entera) con la que se alcanza `pension_objetivo`.
+
+    La pensión crece con la edad de jubilación, así que se hace bisección sobre
+    enteros entre edad_actual + 1 y `edad_maxima` (a lo más 7 pasos para 100 años).
+
+    Retorna:
+    --------
+    edad_jubilacion : numpy.ndarray
+        Edad como float; NaN si ni a `edad_maxima` se alcanza el objetivo
+    """
+    argumentos = dict(periodos_por_año=periodos_por_año(frecuencia), monto_inicial=monto_inicial,
+                      aporte_periodico=aporte_periodico, tea=tea, edad_actual=edad_actual,
+                      tasa_impuesto=tasa_impuesto, tasa_retorno=tasa_retorno, años_retiro=años_retiro)
+    objetivo = np.asarray(pension_objetivo, dtype=float)
+    bajo = np.asarray(edad_actual, dtype=np.int64) + 1
+    alto = np.full(np.broadcast(objetivo, bajo).shape, edad_maxima, dtype=np.int64)
+    bajo = np.broadcast_to(bajo, alto.shape).copy()
+    alcanzable = (_pension(edad_jubilacion=alto, **argumentos) >= objetivo) & (bajo <= alto)
+    # Invariante: la edad buscada está en [bajo, alto]
+    while np.any(bajo < alto):
+        medio = (bajo + alto) // 2
+        suficiente = _pension(edad_jubilacion=medio, **argumentos) >= objetivo
+        alto = np.where(suficiente, medio, alto)
+        bajo = np.where(suficiente, bajo, medio + 1)
+    return np.where(alcanzable, bajo.astype(float), np.nan)
@@ -0,0 +1,243 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from nucleo.montecarlo import (
+    PERCENTILES, TAMAÑO_BLOQUE, _simular_bloque, preparar_montecarlo, resumir_montecarlo
+)
+
+
+def obtener_n_trabajadores(n_trabajadores=None):
+    """
+    Número de procesos a usar: el indicado, la variable de entorno
+    SIMULADOR_TRABAJADORES o, por defecto, todos los núcleos disponibles.
+    """
+    if n_trabajadores is None:
+        n_trabajadores = int(os.environ.get("SIMULADOR_TRABAJADORES", os.cpu_count() or 1))
+    if n_trabajadores < 1:
+        raise ValueError("El número de trabajadores debe ser al menos 1")
+    return n_trabajadores
+
+
+def _compartir(arreglo):
+    """
+    Copia un arreglo a un bloque de memoria compartida.
+
+    Retorna:
+    --------
+    memoria : multiprocessing.shared_memory.SharedMemory
+        Bloque creado (el proceso principal debe cerrarlo y liberarlo)
+    descriptor : tuple
+        (nombre, forma, dtype) para que los trabajadores se conecten sin copiar datos
+    """
+    memoria = shared_memory.SharedMemory(create=True, size=max(arreglo.nbytes, 1))
+    vista = np.ndarray(arreglo.shape, dtype=arreglo.dtype, buffer=memoria.buf)
+    vista[...] = arreglo
+    return memoria, (memoria.name, arreglo.shape, arreglo.dtype.str)
+
+
+def _conectar(descriptor):
+    """Se conecta a un bloque de memoria compartida y devuelve (memoria, vista numpy)."""
+    nombre, forma, dtype = descriptor
+    memoria = shared_memory.SharedMemory(name=nombre)
+    return memoria, np.ndarray(forma, dtype=np.dtype(dtype), buffer=memoria.buf)
+
+
+def _tarea_lote(funcion, descriptores, constantes, inicio, fin):
+    """
+    Trabajo de un proceso: evalúa `funcion` sobre las filas [inicio, fin)
+    de los arreglos compartidos y devuelve sus resultados.
+    """
+    memorias = []
+    argumentos = dict(constantes)
+    try:
+        for nombre, descriptor in descriptores.items():
+            memoria, vista = _conectar(descriptor)
+            memorias.append(memoria)
+            argumentos[nombre] = vista[inicio:fin]
+        resultados = funcion(**argumentos)
+        if not isinstance(resultados, tuple):
+            resultados = (resultados,)
+        # Copiar antes de cerrar la memoria: los resultados podrían ser vistas de ella
+        return tuple(np.array(r, copy=True) for r in resultados)
+    finally:
+        argumentos.clear()
+        for memoria in memorias:
+            memoria.close()
+
+
+def ejecutar_lote_paralelo(funcion, n_trabajadores=None, tamaño_fragmento=None, **parametros):
+    """
+    Evalúa una función vectorizada por filas repartiendo las filas entre procesos.
+
+    Los parámetros que son arreglos se copian una sola vez a memoria compartida;
+    cada proceso recibe solo los nombres de los bloques y su rango de filas.
+    Los escalares se envían tal cual. Con un solo trabajador se ejecuta en el
+    proceso actual, sin pool.
+
+    Parámetros:
+    -----------
+    funcion : callable
+        Función de nivel de módulo (p. ej. `simular_cartera_lote` o
+        `calcular_pension_mensual`) que recibe arreglos por fila y devuelve
+        un arreglo o una tupla de arreglos de la misma longitud
+    n_trabajadores : int, opcional
+        Procesos a usar (ver `obtener_n_trabajadores`)
+    tamaño_fragmento : int, opcional
+        Filas por tarea; por defecto se reparte en 4 tareas por trabajador
+    **parametros :
+        Argumentos de `funcion`
+
+    Retorna:
+    --------
+    resultados : numpy.ndarray or tuple
+        Lo mismo que devolvería `funcion` con todas las filas
+    """
+    n_trabajadores = obtener_n_trabajadores(n_trabajadores)
+    arreglos = {k: np.asarray(v) for k, v in parametros.items() if np.ndim(v) > 0}
+    constantes = {k: v for k, v in parametros.items() if k not in arreglos}
+    if not arreglos:
+        raise ValueError("Se necesita al menos un parámetro con forma de arreglo")
+    n_filas = len(next(iter(arreglos.values())))
+    if any(len(a) != n_filas for a in arreglos.values()):
+        raise ValueError("Todos los arreglos deben tener la misma longitud")
+
+    if n_trabajadores == 1 or n_filas == 0:
+        return funcion(**arreglos, **constantes)
+
+    if tamaño_fragmento is None:
+        tamaño_fragmento = max(1, -(-n_filas // (4 * n_trabajadores)))
+    rangos = [(i, min(i + tamaño_fragmento, n_filas)) for i in range(0, n_filas, tamaño_fragmento)]
+
+    memorias = []
+    try:
+        descriptores = {}
+        for nombre, arreglo in arreglos.items():
+            memoria, descriptores[nombre] = _compartir(np.ascontiguousarray(arreglo))
+            memorias.append(memoria)
+
+        with ProcessPoolExecutor(max_workers=n_trabajadores) as pool:
+            futuros = [pool.submit(_tarea_lote, funcion, descriptores, constantes, inicio, fin)
+                       for inicio, fin in rangos]
+            parciales = [f.result() for f in futuros]
+    finally:
+        for memoria in memorias:
+            memoria.close()
+            memoria.unlink()
+
+    # Unir los resultados parciales en el orden original de las filas
+    resultados = tuple(np.concatenate(columna) for columna in zip(*parciales))
+    return resultados if len(resultados) > 1 else resultados[0]
+
+
+def _tarea_montecarlo(descriptor_salida, bloques, parametros):
+    """
+    Trabajo de un proceso: simula sus bloques de trayectorias y escribe los
+    saldos directamente en la matriz compartida de salida.
+    """
+    memoria, saldos = _conectar(descriptor_salida)
+    try:
+        for semilla_bloque, n_bloque, inicio in bloques:
+            saldos[:, inicio:inicio + n_bloque] = _simular_bloque(semilla_bloque, n_bloque, **parametros)
+    finally:
+        del saldos
+        memoria.close()
+
+
+def simular_montecarlo_paralelo(monto_inicial, aporte_periodico, frecuencia, tea, volatilidad,
+                                edad_actual, edad_jubilacion, n_trayectorias=10000,
+                                distribucion="normal", semilla=None, percentiles=PERCENTILES,
+                                tamaño_bloque=TAMAÑO_BLOQUE, n_trabajadores=None):
+    """
+    Versión multiproceso de `simular_montecarlo_cartera`.
+
+    Cada bloque de trayectorias tiene su propia semilla derivada de `semilla`,
+    así que el resultado es idéntico con 1, 2, 4, 8 o 16 trabajadores. Los
+    procesos escriben sus saldos en una matriz de memoria compartida y los
+    percentiles se calculan al final sobre la matriz completa.
+
+    Parámetros:
+    -----------
+    Los mismos que `simular_montecarlo_cartera`, más `n_trabajadores`.
+
+    Retorna:
+    --------
+    resultado : dict
+        Ver `resumir_montecarlo`
+    """
+    n_trabajadores = obtener_n_trabajadores(n_trabajadores)
+    plan = preparar_montecarlo(monto_inicial, aporte_periodico, frecuencia, tea, volatilidad,
+                               edad_actual, edad_jubilacion, n_trayectorias, semilla, tamaño_bloque)
+    parametros = {
+        'monto_inicial': plan['monto_inicial'],
+        'aporte_periodico': plan['aporte_periodico'],
+        'media_periodo': plan['media_periodo'],
+        'volatilidad_periodo': plan['volatilidad_periodo'],
+        'total_periodos': plan['total_periodos'],
+        'puntos': plan['puntos'],
+        'distribucion': distribucion,
+    }
+
+    # Asignar los bloques a los trabajadores de forma intercalada
+    bloques = []
+    inicio = 0
+    for semilla_bloque, n_bloque in plan['bloques']:
+        bloques.append((semilla_bloque, n_bloque, inicio))
+        inicio += n_bloque
+    asignaciones = [bloques[k::n_trabajadores] for k in range(n_trabajadores)]
+
+    forma = (len(plan['puntos']), n_trayectorias)
+    memoria, descriptor = _compartir(np.empty(forma))
+    try:
+        if n_trabajadores == 1:
+            _tarea_montecarlo(descriptor, bloques, parametros)
+        else:
+            with ProcessPoolExecutor(max_workers=n_trabajadores) as pool:
+                futuros = [pool.submit(_tarea_montecarlo, descriptor, asignados, parametros)
+                           for asignados in asignaciones if asignados]
+                for futuro in futuros:
+                    futuro.result()
+        saldos = np.ndarray(forma, dtype=np.float64, buffer=memoria.buf)
+        resultado = resumir_montecarlo(plan['puntos'], saldos, percentiles)
+        del saldos
+    finally:
+        memoria.close()
+        memoria.unlink()
+
+    return resultado
+
+
+if __name__ == "__main__":
+    # Medición de escalamiento: python -m nucleo.paralelo [trayectorias] [trabajadores...]
+    import sys
+
+    from nucleo.cartera import simular_cartera_lote
+
+    n_trayectorias = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    lista_trabajadores = [int(x) for x in sys.argv[2:]] or [1, 2, 4, 8, 16]
+
+    rng = np.random.default_rng(0)
+    n_escenarios = 1_000_000
+    escenarios = {
+        'monto_inicial': rng.uniform(0, 100000, n_escenarios),
+        'aporte_periodico': rng.uniform(0, 1000, n_escenarios),
+        'frecuencia': rng.choice(["Mensual", "Trimestral", "Semestral", "Anual"], n_escenarios),
+        'tea': rng.uniform(0, 15, n_escenarios),
+        'edad_actual': np.full(n_escenarios, 30),
+        'edad_jubilacion': rng.integers(50, 80, n_escenarios),
+    }
+
+    print(f"{'trabajadores':>12} {'montecarlo (s)':>15} {'barrido (s)':>12}")
+    for n in lista_trabajadores:
+        inicio = time.perf_counter()
+        simular_montecarlo_paralelo(5000, 200, "Mensual", 8, 15, 18, 98,
+                                    n_trayectorias=n_trayectorias, semilla=1, n_trabajadores=n)
+        t_mc = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        ejecutar_lote_paralelo(simular_cartera_lote, n_trabajadores=n, **escenarios)
+        t_barrido = time.perf_counter() - inicio
+        print(f"{n:>12} {t_mc:>15.3f} {t_barrido:>12.3f}")
@@ -0,0 +1,268 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from nucleo.cartera import _factor_acumulacion
+
+
+class ResultadoPension(NamedTuple):
+    """Resultado del Módulo B2 para el escenario principal."""
+    pension_mensual: float
+    total_recibido: float
+    ganancia_total: float
+    impuesto_final: float
+    total_neto: float
+
+
+class ResultadoEscenario(NamedTuple):
+    """Resultado de un escenario de jubilación (escalares o arreglos en lote)."""
+    saldo: float
+    pension_mensual: float
+    total: float
+    impuesto: float
+    total_neto: float
+
+
+def _como_escalar(valor):
+    """Convierte un resultado 0-d de NumPy en float y deja los arreglos como están."""
+    return float(valor) if np.ndim(valor) == 0 else valor
+
+
+def factor_anualidad(tasa_retorno, años_retiro):
+    """
+    Pago mensual por cada dólar de saldo en una anualidad vencida.
+    
+    Parámetros:
+    -----------
+    tasa_retorno : float or numpy.ndarray
+        Tasa de retorno anual durante el retiro (en decimal); la tasa mensual es tasa / 12
+    años_retiro : int or numpy.ndarray
+        Años durante los que se recibe la pensión
+    
+    Retorna:
+    --------
+    factor : float or numpy.ndarray
+        i / (1 - (1 + i)^-n), o 1 / n cuando la tasa es 0
+    """
+    tasa_mensual = np.asarray(tasa_retorno, dtype=float) / 12
+    n_meses = np.asarray(años_retiro) * 12
+    sin_tasa = tasa_mensual == 0
+    tasa_segura = np.where(sin_tasa, 1.0, tasa_mensual)
+    factor = np.where(sin_tasa, 1 / n_meses, tasa_segura / -np.expm1(-n_meses * np.log1p(tasa_segura)))
+    return _como_escalar(factor)
+
+
+def calcular_pension_mensual(saldo_neto, tasa_retorno, años_retiro):
+    """
+    Pensión mensual constante que agota el saldo en `años_retiro` (anualidad vencida).
+    
+    Parámetros:
+    -----------
+    saldo_neto : float or numpy.ndarray
+        Saldo disponible al jubilarse
+    tasa_retorno : float or numpy.ndarray
+        Tasa de retorno anual durante el retiro (en decimal); la tasa mensual es tasa / 12
+    años_retiro : int or numpy.ndarray
+        Años durante los que se recibe la pensión
+    
+    Retorna:
+    --------
+    pension_mensual : float or numpy.ndarray
+        Pago mensual; con tasa 0 es simplemente saldo / meses
+    """
+    return _como_escalar(np.multiply(saldo_neto, factor_anualidad(tasa_retorno, años_retiro)))
+
+
+def calcular_pension(saldo_neto, tasa_retorno, años_retiro, tasa_impuesto):
+    """
+    Pensión mensual del escenario principal y totales tras el impuesto sobre la rentabilidad.
+    
+    Parámetros:
+    -----------
+    saldo_neto : float
+        Saldo disponible al jubilarse (Módulo B1)
+    tasa_retorno : float
+        Tasa de retorno anual durante el retiro (en decimal)
+    años_retiro : int
+        Años durante los que se recibe la pensión
+    tasa_impuesto : float
+        Tasa aplicada a la ganancia del periodo de retiro (en decimal)
+    
+    Retorna:
+    --------
+    resultado : ResultadoPension
+    """
+    pension_mensual = calcular_pension_mensual(saldo_neto, tasa_retorno, años_retiro)
+    total_recibido = pension_mensual * años_retiro * 12
+    ganancia_total = total_recibido - saldo_neto
+    impuesto_final = ganancia_total * tasa_impuesto
+    total_neto = total_recibido - impuesto_final
+    return ResultadoPension(pension_mensual, total_recibido, ganancia_total, impuesto_final, total_neto)
+
+
+def calcular_tabla_retiro(saldo_neto, tasa_retorno, años_retiro, tasa_impuesto, pension_mensual=None):
+    """
+    Calendario mes a mes del retiro como arreglos de NumPy, con fórmulas cerradas.
+    
+    El saldo al final del mes k es S·(1 + i)^k - P·((1 + i)^k - 1) / i, con
+    P la pensión mensual. El impuesto de cada mes es la tasa sobre el interés
+    del mes, así que su suma es el `impuesto_final` de `calcular_pension`.
+    
+    Parámetros:
+    -----------
+    saldo_neto : float
+        Saldo disponible al jubilarse (Módulo B1)
+    tasa_retorno : float
+        Tasa de retorno anual durante el retiro (en decimal); la tasa mensual es tasa / 12
+    años_retiro : int
+        Años durante los que se recibe la pensión
+    tasa_impuesto : float
+        Tasa aplicada a la ganancia del periodo de retiro (en decimal)
+    pension_mensual : float, optional
+        Retiro mensual a usar en lugar de la anualidad a `años_retiro` (por
+        ejemplo, la pensión vitalicia). Si es mayor, el calendario termina en el
+        mes en que se agota el saldo y ese último retiro es lo que queda.
+    
+    Retorna:
+    --------
+    columnas : dict[str, numpy.ndarray]
+        Arreglos 'mes', 'saldo_inicial', 'interes', 'retiro', 'impuesto',
+        'retiro_neto' y 'saldo_final' de longitud años_retiro * 12 (o menos si
+        el saldo se agota antes)
+    """
+    tasa_mensual = tasa_retorno / 12
+    n_meses = int(años_retiro) * 12
+    anualidad = pension_mensual is None
+    if anualidad:
+        pension_mensual = calcular_pension_mensual(saldo_neto, tasa_retorno, años_retiro)
+    
+    mes = np.arange(1, n_meses + 1)
+    crecimiento = np.exp(np.log1p(tasa_mensual) * mes)
+    saldo_final = saldo_neto * crecimiento - pension_mensual * _factor_acumulacion(tasa_mensual, mes)
+    agotado = np.flatnonzero(saldo_final <= 0)
+    if not anualidad and agotado.size:
+        n_meses = int(agotado[0]) + 1
+        mes, saldo_final = mes[:n_meses], saldo_final[:n_meses]
+    if anualidad or agotado.size:
+        saldo_final[-1] = 0.0  # El retiro agota el saldo; evita residuos de redondeo como -1e-10
+    
+    saldo_inicial = np.empty_like(saldo_final)
+    saldo_inicial[0] = saldo_neto
+    saldo_inicial[1:] = saldo_final[:-1]
+    
+    interes = saldo_inicial * tasa_mensual
+    retiro = np.full(n_meses, float(pension_mensual))
+    if not anualidad and agotado.size:
+        retiro[-1] = saldo_inicial[-1] + interes[-1]  # Lo que queda en el último mes
+    impuesto = interes * tasa_impuesto
+    
+    return {
+        'mes': mes,
+        'saldo_inicial': saldo_inicial,
+        'interes': interes,
+        'retiro': retiro,
+        'impuesto': impuesto,
+        'retiro_neto': retiro - impuesto,
+        'saldo_final': saldo_final,
+    }
+
+
+def simular_retiro(saldo_neto, tasa_retorno, años_retiro, tasa_impuesto, pension_mensual=None):
+    """
+    Tabla mes a mes del retiro, con el mismo formato que el `df_resultados` del Módulo A.
+    `pension_mensual` es el retiro mensual opcional de `calcular_tabla_retiro`.
+    
+    Retorna:
+    --------
+    df_retiro : pandas.DataFrame
+        Columnas Mes, Saldo Inicial, Interés, Retiro, Impuesto, Retiro Neto y
+        Saldo Final (USD), redondeadas a 2 decimales
+    """
+    import pandas as pd  # Import diferido: el núcleo se importa sin cargar pandas
+    
+    columnas = calcular_tabla_retiro(saldo_neto, tasa_retorno, años_retiro, tasa_impuesto, pension_mensual)
+    return pd.DataFrame({
+        'Mes': columnas['mes'],
+        'Saldo Inicial (USD)': np.round(columnas['saldo_inicial'], 2),
+        'Interés (USD)': np.round(columnas['interes'], 2),
+        'Retiro (USD)': np.round(columnas['retiro'], 2),
+        'Impuesto (USD)': np.round(columnas['impuesto'], 2),
+        'Retiro Neto (USD)': np.round(columnas['retiro_neto'], 2),
+        'Saldo Final (USD)': np.round(columnas['saldo_final'], 2)
+    })
+
+
+def proyectar_escenario(saldo_neto, edad_actual, edad_retiro, tasa_retorno, años_retiro, tasa_impuesto):
+    """
+    Proyecta un escenario de jubilación: el saldo crece a `tasa_retorno` anual hasta
+    `edad_retiro` y luego se paga como anualidad durante `años_retiro`.
+    Todos los parámetros aceptan arreglos para evaluar muchos escenarios a la vez.
+    
+    Retorna:
+    --------
+    resultado : ResultadoEscenario
+        saldo al retiro, pension_mensual, total recibido, impuesto (nunca negativo)
+        y total_neto
+    """
+    tasa_retorno = np.asarray(tasa_retorno, dtype=float)
+    saldo = saldo_neto * (1 + tasa_retorno) ** np.subtract(edad_retiro, edad_actual)
+    pension_mensual = saldo * factor_anualidad(tasa_retorno, años_retiro)
+    total = pension_mensual * np.multiply(años_retiro, 12)
+    impuesto = np.maximum(0, (total - saldo) * tasa_impuesto)
+    total_neto = total - impuesto
+    return ResultadoEscenario(*(_como_escalar(v) for v in (saldo, pension_mensual, total, impuesto, total_neto)))
+
+
+def comparar_escenarios(saldo_neto, edad_actual, edades_retiro, tasas_retorno, años_retiro, tasa_impuesto):
+    """
+    Evalúa cualquier número de escenarios de jubilación en una sola llamada
+    vectorizada a `proyectar_escenario` y los ordena por pensión mensual.
+    
+    Parámetros:
+    -----------
+    saldo_neto : float
+        Saldo disponible (Módulo B1)
+    edad_actual : int
+        Edad actual del usuario
+    edades_retiro, tasas_retorno, años_retiro : array_like
+        Un valor por escenario; la tasa de retorno en decimal
+    tasa_impuesto : float
+        Tasa aplicada a la ganancia del periodo de retiro (en decimal)
+    
+    Retorna:
+    --------
+    df : pandas.DataFrame
+        Una fila por escenario, ordenada de mayor a menor pensión mensual, con las
+        columnas Escenario (posición en la entrada, desde 1), Ranking, Edad de retiro,
+        Tasa de retorno (%), Años de jubilación, Saldo al retiro, Pensión mensual,
+        Total, Impuesto y Total neto
+    """
+    import pandas as pd  # Import diferido: el núcleo se importa sin cargar pandas
+    
+    edades_retiro = np.asarray(edades_retiro, dtype=np.int64)
+    tasas_retorno = np.asarray(tasas_retorno, dtype=float)
+    años_retiro = np.asarray(años_retiro, dtype=np.int64)
+    if np.any(edades_retiro < edad_actual):
+        raise ValueError("La edad de retiro de cada escenario no puede ser menor que la edad actual")
+    if np.any(años_retiro < 1):
+        raise ValueError("Los años de jubilación deben ser al menos 1")
+    if np.any(tasas_retorno < 0):
+        raise ValueError("La tasa de retorno no puede ser negativa")
+    
+    saldo, pension_mensual, total, impuesto, total_neto = proyectar_escenario(
+        saldo_neto, edad_actual, edades_retiro, tasas_retorno, años_retiro, tasa_impuesto
+    )
+    df = pd.DataFrame({
+        'Escenario': np.arange(1, len(edades_retiro) + 1),
+        'Edad de retiro': edades_retiro,
+        'Tasa de retorno (%)': tasas_retorno * 100,
+        'Años de jubilación': años_retiro,
+        'Saldo al retiro': np.atleast_1d(saldo),
+        'Pensión mensual': np.atleast_1d(pension_mensual),
+        'Total': np.atleast_1d(total),
+        'Impuesto': np.atleast_1d(impuesto),
+        'Total neto': np.atleast_1d(total_neto)
+    })
+    df = df.sort_values('Pensión mensual', ascending=False, kind='stable', ignore_index=True)
+    df.insert(1, 'Ranking', np.arange(1, len(df) + 1))
+    return df
@@ -0,0 +1,75 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from nucleo.objetivo import coeficientes_pension, periodos_por_año
+
+
+# Parámetros que se pueden barrer (mismas unidades que `proyectar_pension`)
+PARAMETROS_MALLA = ("monto_inicial", "aporte_periodico", "tea", "edad_jubilacion", "tasa_retorno", "años_retiro")
+
+
+class MallaSensibilidad(NamedTuple):
+    """Pensión neta sobre una malla de parámetros: un eje por parámetro barrido."""
+    parametros: tuple
+    valores: tuple
+    pension_neta: np.ndarray
+
+
+def calcular_malla_sensibilidad(ejes, base):
+    """
+    Pensión mensual neta (A → B1 → B2) para todas las combinaciones de los valores de `ejes`.
+
+    Cada eje se coloca en su propia dimensión y el resto del cálculo es
+    broadcasting sobre las fórmulas cerradas, así que una malla de
+    100 × 100 × 40 se evalúa sin bucles de Python.
+
+    Parámetros:
+    -----------
+    ejes : dict
+        {nombre: valores} con los parámetros a barrer, en el orden de los ejes
+        del resultado; los nombres deben estar en `PARAMETROS_MALLA`
+    base : dict
+        Valor fijo del resto de parámetros: los de `PARAMETROS_MALLA` más
+        frecuencia, edad_actual, tasa_impuesto (B1) y tasa_impuesto_retiro (B2)
+
+    Retorna:
+    --------
+    malla : MallaSensibilidad
+        `pension_neta` tiene forma (len(eje_1), len(eje_2), ...); vale NaN donde
+        la edad de jubilación no supera la edad actual.
+        La pensión neta es total_neto / meses de retiro, como en `calcular_pension`
+    """
+    desconocidos = [nombre for nombre in ejes if nombre not in PARAMETROS_MALLA]
+    if desconocidos:
+        raise ValueError(f"Parámetros no válidos para la malla: {', '.join(desconocidos)}")
+
+    n_ejes = len(ejes)
+    parametros = dict(base)
+    valores = []
+    for eje, (nombre, valores_eje) in enumerate(ejes.items()):
+        valores_eje = np.asarray(valores_eje, dtype=float)
+        valores.append(valores_eje)
+        # Eje i → forma (1, ..., n_i, ..., 1)
+        forma = [1] * n_ejes
+        forma[eje] = len(valores_eje)
+        parametros[nombre] = valores_eje.reshape(forma)
+
+    edad_jubilacion = parametros["edad_jubilacion"]
+    factor, coef_monto, coef_aporte = coeficientes_pension(
+        periodos_por_año(parametros["frecuencia"]), parametros["tea"], parametros["edad_actual"],
+        np.floor(edad_jubilacion), parametros["tasa_impuesto"], parametros["tasa_retorno"],
+        np.floor(parametros["años_retiro"])
+    )
+    saldo_neto = coef_monto * parametros["monto_inicial"] + coef_aporte * parametros["aporte_periodico"]
+    pension = factor * saldo_neto
+
+    # Impuesto de B2 sobre la ganancia del retiro, repartido entre los meses de pago
+    meses = np.floor(parametros["años_retiro"]) * 12
+    tasa_retiro = parametros["tasa_impuesto_retiro"]
+    pension_neta = pension - tasa_retiro * (pension - saldo_neto / meses)
+
+    forma = tuple(len(v) for v in valores)
+    pension_neta = np.broadcast_to(pension_neta, forma)
+    pension_neta = np.where(np.floor(edad_jubilacion) > parametros["edad_actual"], pension_neta, np.nan)
+    return MallaSensibilidad(tuple(ejes), tuple(valores), pension_neta)
@@ -1,63 +1,270 @@
+"""
+Sección del reporte consolidado. El PDF solo se genera al pulsar el botón de
+descarga (reportlab se importa en ese momento) y se memoiza por el hash de sus datos.
+
+Medición:
+    python -m reporte [ejecuciones]   # costo por ejecución de la parte del PDF, antes y ahora
+"""
+import importlib.util
+from functools import partial
+
 import streamlit as st
 
+from nucleo.cache import memoizar
+from nucleo.grafo import ESTADO_DESACTUALIZADO, ESTADO_FALTANTE
+from modules.ejecucion import obtener_grafo
+
+
+def construir_pdf(datos):
+    """
+    Construye el PDF del reporte consolidado a partir de los datos de todos los módulos.
+
+    Es una función pura de `datos` (sin leer st.session_state), así que se puede
+    memoizar: mientras los resultados no cambien, el PDF no se vuelve a generar.
+
+    Parámetros:
+    -----------
+    datos : dict
+        Valores del reporte, con las llaves que arma `mostrar_reporte`
+
+    Retorna:
+    --------
+    pdf_bytes : bytes
+    """
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+    import io
+
+    monto_inicial = datos['monto_inicial']
+    aporte_periodico = datos['aporte_periodico']
+    frecuencia_aporte = datos['frecuencia_aporte']
+    tea = datos['tea']
+    saldo_bruto = datos['saldo_bruto']
+    total_aportado = datos['total_aportado']
+    interes_total = datos['interes_total']
+    tipo_inversion = datos['tipo_inversion']
+    tasa_impuesto = datos['tasa_impuesto']
+    saldo_neto = datos['saldo_neto']
+    monto_impuesto = datos['monto_impuesto']
+    ganancia = datos['ganancia']
+    tasa_retorno = datos['tasa_retorno']
+    años_retiro = datos['años_retiro']
+    pension_mensual = datos['pension_mensual']
+    total_recibido = datos['total_recibido']
+    vitalicia = datos['vitalicia']
+    escenarios = datos['escenarios']
+    n_escenarios = datos['n_escenarios']
+    bono_params = datos['bono_params']
+    bono_vp = datos['bono_vp']
+    bono_riesgo = datos['bono_riesgo']
+
+    def fmt_money(x):
+        try:
+            return f"${x:,.2f}"
+        except Exception:
+            return str(x)
+
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=letter)
+    width, height = letter
+
+    c.setFont("Helvetica-Bold", 16)
+    c.drawString(72, height - 72, "Reporte consolidado - Simulador de Jubilación")
+
+    y = height - 100
+
+    # Helper para escribir líneas y manejar salto de página
+    def write_line(text, bold=False, size=10, indent=0):
+        nonlocal y
+        font = "Helvetica-Bold" if bold else "Helvetica"
+        c.setFont(font, size)
+        c.drawString(72 + indent, y, text)
+        y -= (size + 6)
+        if y < 72:
+            c.showPage()
+            y = height - 72
+
+    # Helper: insertar una línea en blanco para separar módulos (más simple)
+    def insert_blank():
+        nonlocal y
+        y -= 12
+        if y < 72:
+            c.showPage()
+            y = height - 72
+
+    # Módulo A - entradas y resultados en líneas separadas
+    insert_blank()
+    write_line("Módulo A - Crecimiento de cartera:", bold=True, size=12)
+    write_line(f"- Monto inicial: {fmt_money(monto_inicial)}", size=10, indent=10)
+    write_line(f"- Aporte periódico: {fmt_money(aporte_periodico)}", size=10, indent=10)
+    write_line(f"- Frecuencia: {frecuencia_aporte}", size=10, indent=10)
+    write_line(f"- TEA: {tea}%", size=10, indent=10)
+    write_line("Resultados:", bold=True, size=11)
+    write_line(f"Saldo bruto (final): {fmt_money(saldo_bruto)}", size=10, indent=10)
+    write_line(f"Total aportado: {fmt_money(total_aportado)}", size=10, indent=10)
+    write_line(f"Intereses: {fmt_money(interes_total)}", size=10, indent=10)
+    write_line(" ", size=6)
+
+    # Módulo B1
+    insert_blank()
+    write_line("Módulo B1 - Impuestos:", bold=True, size=12)
+    write_line(f"- Tipo inversión: {tipo_inversion}", size=10, indent=10)
+    write_line(f"- Tasa impuesto: {tasa_impuesto*100:.1f}%", size=10, indent=10)
+    write_line("Resultados:", bold=True, size=11)
+    write_line(f"Saldo neto (post-impuestos): {fmt_money(saldo_neto)}", size=10, indent=10)
+    write_line(f"Impuesto estimado: {fmt_money(monto_impuesto)}", size=10, indent=10)
+    write_line(f"Ganancia antes de impuestos: {fmt_money(ganancia)}", size=10, indent=10)
+    write_line(" ", size=6)
+
+    # Módulo B2
+    insert_blank()
+    write_line("Módulo B2 - Pensión:", bold=True, size=12)
+    write_line(f"- Tasa retorno anual: {tasa_retorno*100:.2f}%", size=10, indent=10)
+    write_line(f"- Años de retiro: {años_retiro}", size=10, indent=10)
+    if vitalicia:
+        write_line(f"- Pensión vitalicia (tabla de mortalidad, sexo {vitalicia['sexo']}): "
+                   f"esperanza de vida de {vitalicia['esperanza_vida']:.1f} años", size=10, indent=10)
+    write_line("Resultados:", bold=True, size=11)
+    write_line(f"Pensión mensual estimada: {fmt_money(pension_mensual)}", size=10, indent=10)
+    write_line(f"Total neto estimado recibido: {fmt_money(total_recibido)}", size=10, indent=10)
+    if n_escenarios:
+        write_line(f"Escenarios comparados: {n_escenarios:,} (los 5 mejores)", bold=True, size=11)
+        for fila in escenarios:
+            write_line(
+                f"{fila['Ranking']:.0f}. Retiro a los {fila['Edad de retiro']:.0f} años, {fila['Tasa de retorno (%)']:.2f}%, "
+                f"{fila['Años de jubilación']:.0f} años: pensión {fmt_money(fila['Pensión mensual'])}",
+                size=10, indent=10
+            )
+    write_line(" ", size=6)
+
+    # Módulo C
+    insert_blank()
+    write_line("Módulo C - Bonos:", bold=True, size=12)
+    write_line(f"- Valor nominal: {fmt_money(bono_params.get('valor_nominal'))}", size=10, indent=10)
+    write_line(f"- Cupón anual: {bono_params.get('tasa_cupon')}%", size=10, indent=10)
+    write_line(f"- Frecuencia: {bono_params.get('frecuencia')}", size=10, indent=10)
+    write_line(f"- TEA (bono): {bono_params.get('tasa_tea')}%", size=10, indent=10)
+    write_line("Resultados:", bold=True, size=11)
+    write_line(f"Valor presente (bono): {fmt_money(bono_vp)}", size=10, indent=10)
+    if bono_riesgo:
+        write_line(f"Duración Macaulay: {bono_riesgo['duracion_macaulay']:.3f} años", size=10, indent=10)
+        write_line(f"Duración modificada: {bono_riesgo['duracion_modificada']:.3f}", size=10, indent=10)
+        write_line(f"Convexidad: {bono_riesgo['convexidad']:.3f}", size=10, indent=10)
+    write_line(" ", size=6)
+
+
+    c.showPage()
+    c.save()
+    buffer.seek(0)
+
+    return buffer.getvalue()
+
+
+# El PDF se regenera solo cuando cambian sus datos (la llave es el hash SHA-256 de `datos`)
+construir_pdf_cache = memoizar(construir_pdf, max_entradas=8)
+
+
+# Resultado de cada módulo que necesita el reporte
+RESULTADOS_REPORTE = {
+    "A": "Módulo A: resultados de crecimiento",
+    "B1": "Módulo B1: saldo neto después de impuestos",
+    "B2": "Módulo B2: pensión mensual estimada",
+    "C": "Módulo C: resultados del bono",
+}
+
+
+def recopilar_datos_reporte():
+    """Datos del reporte (los que recibe `construir_pdf`) leídos de `st.session_state`."""
+    escenarios = st.session_state.get('escenarios_B2') or {}
+    return {
+        'monto_inicial': st.session_state.get('monto_inicial'),
+        'aporte_periodico': st.session_state.get('aporte_periodico'),
+        'frecuencia_aporte': st.session_state.get('frecuencia_aporte'),
+        'tea': st.session_state.get('tea'),
+        'saldo_bruto': st.session_state.get('saldo_bruto'),
+        'total_aportado': st.session_state.get('aportes_totales'),
+        'interes_total': st.session_state.get('interes_total'),
+        'tipo_inversion': st.session_state.get('tipo_inversion'),
+        'tasa_impuesto': st.session_state.get('tasa_impuesto', 0),
+        'saldo_neto': st.session_state.get('saldo_neto'),
+        'monto_impuesto': st.session_state.get('monto_impuesto'),
+        'ganancia': st.session_state.get('ganancia'),
+        'tasa_retorno': st.session_state.get('tasa_retorno', 0),
+        'años_retiro': st.session_state.get('años_retiro') or st.session_state.get('anos_retiro'),
+        'pension_mensual': st.session_state.get('pension_mensual'),
+        'total_recibido': st.session_state.get('total_recibido') or st.session_state.get('total_neto'),
+        'vitalicia': st.session_state.get('pension_vitalicia'),
+        # Solo los mejores escenarios van al PDF (los que guarda el Módulo B2)
+        'escenarios': escenarios.get('mejores', []),
+        'n_escenarios': escenarios.get('total', 0),
+        'bono_params': st.session_state.get('bono_params', {}),
+        'bono_vp': st.session_state.get('bono_vp'),
+        'bono_riesgo': st.session_state.get('bono_riesgo', {}),
+    }
+
+
 def mostrar_reporte():
     """Renderiza la sección de reporte consolidado y permite generar/descargar el PDF.
-    Usa valores guardados en `st.session_state` por los demás módulos.
+    Usa los resultados de los demás módulos; con el grafo de resultados distingue
+    los que faltan de los que se calcularon con datos que ya cambiaron.
     """
     st.markdown('<div id="modExport"></div>', unsafe_allow_html=True)
     st.markdown("## 🖨️ Reporte consolidado (PDF)")
 
-    has_a = 'saldo_bruto' in st.session_state and 'aportes_totales' in st.session_state
-    has_b1 = 'saldo_neto' in st.session_state
-    has_b2 = 'pension_mensual' in st.session_state
-    has_c = 'bono_vp' in st.session_state
-
-    if not (has_a and has_b1 and has_b2 and has_c):
+    grafo = obtener_grafo()
+    estados = grafo.estados()
+    faltantes = [descripcion for nombre, descripcion in RESULTADOS_REPORTE.items() if estados[nombre] == ESTADO_FALTANTE]
+    if faltantes:
         st.info("El reporte estará disponible una vez que se hayan ejecutado los módulos A (Crecimiento), B1 (Impuestos), B2 (Pensión) y C (Bonos).\n\nActualmente faltan:")
-        faltantes = []
-        if not has_a:
-            faltantes.append("Módulo A: resultados de crecimiento")
-        if not has_b1:
-            faltantes.append("Módulo B1: saldo neto después de impuestos")
-        if not has_b2:
-            faltantes.append("Módulo B2: pensión mensual estimada")
-        if not has_c:
-            faltantes.append("Módulo C: resultados del bono")
         for f in faltantes:
             st.write(f"- {f}")
         return
 
-    st.success("✅ Todos los módulos se han ejecutado. Genera el reporte PDF abajo.")
+    desactualizados = [descripcion for nombre, descripcion in RESULTADOS_REPORTE.items()
+                       if estados[nombre] == ESTADO_DESACTUALIZADO]
+    if desactualizados:
+        st.warning(
+            "⚠️ Algunos resultados se calcularon con datos que ya cambiaron; vuelve a calcularlos "
+            "para que el reporte refleje los valores actuales:\n\n" + "\n".join(f"- {d}" for d in desactualizados)
+        )
+    else:
+        st.success("✅ Todos los módulos se han ejecutado. Genera el reporte PDF abajo.")
+
+    # Los datos solo se vuelven a reunir cuando sube la versión de B2 o C (o cambian los escenarios)
+    entradas = (st.session_state.get('escenarios_B2'), st.session_state.get('pension_vitalicia'))
+    datos, _ = grafo.actualizar("Reporte", entradas, recopilar_datos_reporte)
 
     # === VISTA SIMPLE EN LA PÁGINA: un dato por línea, sin columnas ===
     st.markdown("### Resumen rápido (vista en página)")
 
     # Módulo A
     st.markdown("**Módulo A — Crecimiento de Cartera**")
-    monto_inicial = st.session_state.get('monto_inicial')
-    aporte_periodico = st.session_state.get('aporte_periodico')
-    frecuencia_aporte = st.session_state.get('frecuencia_aporte')
-    # Leer otras variables desde session_state (si existen)
-    tea = st.session_state.get('tea')
-    saldo_bruto = st.session_state.get('saldo_bruto')
-    total_aportado = st.session_state.get('total_aportado') or st.session_state.get('aportes_totales')
-    interes_total = st.session_state.get('interes_total')
+    monto_inicial = datos['monto_inicial']
+    aporte_periodico = datos['aporte_periodico']
+    frecuencia_aporte = datos['frecuencia_aporte']
+    tea = datos['tea']
+    saldo_bruto = datos['saldo_bruto']
+    total_aportado = datos['total_aportado']
+    interes_total = datos['interes_total']
 
     # Módulo B1
-    tipo_inversion = st.session_state.get('tipo_inversion')
-    tasa_impuesto = st.session_state.get('tasa_impuesto', 0)
-    monto_impuesto = st.session_state.get('monto_impuesto')
-    ganancia = st.session_state.get('ganancia')
+    tipo_inversion = datos['tipo_inversion']
+    tasa_impuesto = datos['tasa_impuesto']
+    monto_impuesto = datos['monto_impuesto']
+    ganancia = datos['ganancia']
 
     # Módulo B2
-    tasa_retorno = st.session_state.get('tasa_retorno', 0)
-    años_retiro = st.session_state.get('años_retiro') or st.session_state.get('anos_retiro')
-    pension_mensual = st.session_state.get('pension_mensual')
-    total_recibido = st.session_state.get('total_recibido') or st.session_state.get('total_neto')
+    tasa_retorno = datos['tasa_retorno']
+    años_retiro = datos['años_retiro']
+    pension_mensual = datos['pension_mensual']
+    total_recibido = datos['total_recibido']
 
     # Módulo C
-    bono_params = st.session_state.get('bono_params', {})
-    bono_vp = st.session_state.get('bono_vp')
+    bono_params = datos['bono_params']
+    bono_vp = datos['bono_vp']
+    bono_riesgo = datos['bono_riesgo']
+    escenarios = datos['escenarios']
+    vitalicia = datos['vitalicia']
     # ---- VISTA EN PÁGINA: mostrar cada dato en una línea ----
     def fmt_money_page(x):
         try:
@@ -80,7 +287,7 @@ def mostrar_reporte():
         st.write(f"- Tasa impuesto: {tasa_impuesto*100:.1f}%")
     except Exception:
         st.write(f"- Tasa impuesto: {tasa_impuesto}")
-    st.write(f"- Saldo neto (post-impuestos): {fmt_money_page(st.session_state.get('saldo_neto'))}")
+    st.write(f"- Saldo neto (post-impuestos): {fmt_money_page(datos['saldo_neto'])}")
     st.write(f"- Impuesto estimado: {fmt_money_page(monto_impuesto)}")
     st.write(f"- Ganancia antes de impuestos: {fmt_money_page(ganancia)}")
 
@@ -90,8 +297,18 @@ def mostrar_reporte():
     except Exception:
         st.write(f"- Tasa retorno anual: {tasa_retorno}")
     st.write(f"- Años de retiro: {años_retiro}")
+    if vitalicia:
+        st.write(f"- Pensión vitalicia (tabla de mortalidad, sexo {vitalicia['sexo']}): "
+                 f"esperanza de vida de {vitalicia['esperanza_vida']:.1f} años")
     st.write(f"- Pensión mensual estimada: {fmt_money_page(pension_mensual)}")
     st.write(f"- Total neto estimado recibido: {fmt_money_page(total_recibido)}")
+    if escenarios:
+        st.write(f"- Escenarios comparados: {datos['n_escenarios']:,} (los 5 mejores):")
+        for fila in escenarios:
+            st.write(
+                f"  {fila['Ranking']:.0f}. Retiro a los {fila['Edad de retiro']:.0f} años, {fila['Tasa de retorno (%)']:.2f}%, "
+                f"{fila['Años de jubilación']:.0f} años: pensión {fmt_money_page(fila['Pensión mensual'])}"
+            )
 
     st.markdown("**Módulo C — Bonos (vista rápida)**")
     st.write(f"- Valor nominal: {fmt_money_page(bono_params.get('valor_nominal'))}")
@@ -99,101 +316,58 @@ def mostrar_reporte():
     st.write(f"- Frecuencia: {bono_params.get('frecuencia')}")
     st.write(f"- TEA (bono): {bono_params.get('tasa_tea')}%")
     st.write(f"- Valor presente (bono): {fmt_money_page(bono_vp)}")
+    if bono_riesgo:
+        st.write(f"- Duración modificada: {bono_riesgo['duracion_modificada']:.3f}")
+        st.write(f"- Convexidad: {bono_riesgo['convexidad']:.3f}")
 
-    try:
-        from reportlab.lib.pagesizes import letter
-        from reportlab.pdfgen import canvas
-        import io
-
-        def fmt_money(x):
-            try:
-                return f"${x:,.2f}"
-            except Exception:
-                return str(x)
-
-        buffer = io.BytesIO()
-        c = canvas.Canvas(buffer, pagesize=letter)
-        width, height = letter
-
-        c.setFont("Helvetica-Bold", 16)
-        c.drawString(72, height - 72, "Reporte consolidado - Simulador de Jubilación")
-
-        y = height - 100
-
-        # Helper para escribir líneas y manejar salto de página
-        def write_line(text, bold=False, size=10, indent=0):
-            nonlocal y
-            font = "Helvetica-Bold" if bold else "Helvetica"
-            c.setFont(font, size)
-            c.drawString(72 + indent, y, text)
-            y -= (size + 6)
-            if y < 72:
-                c.showPage()
-                y = height - 72
-
-        # Helper: insertar una línea en blanco para separar módulos (más simple)
-        def insert_blank():
-            nonlocal y
-            y -= 12
-            if y < 72:
-                c.showPage()
-                y = height - 72
-
-        # Módulo A - entradas y resultados en líneas separadas
-        insert_blank()
-        write_line("Módulo A - Crecimiento de cartera:", bold=True, size=12)
-        write_line(f"- Monto inicial: {fmt_money(monto_inicial)}", size=10, indent=10)
-        write_line(f"- Aporte periódico: {fmt_money(aporte_periodico)}", size=10, indent=10)
-        write_line(f"- Frecuencia: {frecuencia_aporte}", size=10, indent=10)
-        write_line(f"- TEA: {tea}%", size=10, indent=10)
-        write_line("Resultados:", bold=True, size=11)
-        write_line(f"Saldo bruto (final): {fmt_money(saldo_bruto)}", size=10, indent=10)
-        write_line(f"Total aportado: {fmt_money(total_aportado)}", size=10, indent=10)
-        write_line(f"Intereses: {fmt_money(interes_total)}", size=10, indent=10)
-        write_line(" ", size=6)
-
-        # Módulo B1
-        insert_blank()
-        write_line("Módulo B1 - Impuestos:", bold=True, size=12)
-        write_line(f"- Tipo inversión: {tipo_inversion}", size=10, indent=10)
-        write_line(f"- Tasa impuesto: {tasa_impuesto*100:.1f}%", size=10, indent=10)
-        write_line("Resultados:", bold=True, size=11)
-        write_line(f"Saldo neto (post-impuestos): {fmt_money(st.session_state.get('saldo_neto'))}", size=10, indent=10)
-        write_line(f"Impuesto estimado: {fmt_money(monto_impuesto)}", size=10, indent=10)
-        write_line(f"Ganancia antes de impuestos: {fmt_money(ganancia)}", size=10, indent=10)
-        write_line(" ", size=6)
-
-        # Módulo B2
-        insert_blank()
-        write_line("Módulo B2 - Pensión:", bold=True, size=12)
-        write_line(f"- Tasa retorno anual: {tasa_retorno*100:.2f}%", size=10, indent=10)
-        write_line(f"- Años de retiro: {años_retiro}", size=10, indent=10)
-        write_line("Resultados:", bold=True, size=11)
-        write_line(f"Pensión mensual estimada: {fmt_money(pension_mensual)}", size=10, indent=10)
-        write_line(f"Total neto estimado recibido: {fmt_money(total_recibido)}", size=10, indent=10)
-        write_line(" ", size=6)
-
-        # Módulo C
-        insert_blank()
-        write_line("Módulo C - Bonos:", bold=True, size=12)
-        write_line(f"- Valor nominal: {fmt_money(bono_params.get('valor_nominal'))}", size=10, indent=10)
-        write_line(f"- Cupón anual: {bono_params.get('tasa_cupon')}%", size=10, indent=10)
-        write_line(f"- Frecuencia: {bono_params.get('frecuencia')}", size=10, indent=10)
-        write_line(f"- TEA (bono): {bono_params.get('tasa_tea')}%", size=10, indent=10)
-        write_line("Resultados:", bold=True, size=11)
-        write_line(f"Valor presente (bono): {fmt_money(bono_vp)}", size=10, indent=10)
-        write_line(" ", size=6)
-
-
-        c.showPage()
-        c.save()
-        buffer.seek(0)
-
-        pdf_bytes = buffer.getvalue()
-
-        # Botón que descarga directamente el PDF cuando el usuario hace clic
-        st.download_button("Generar reporte PDF", data=pdf_bytes, file_name="reporte_simulador.pdf", mime="application/pdf")
-
-    except Exception as e:
-        st.error("No se pudo generar el PDF porque falta la librería 'reportlab' o ocurrió un error. Instálala con: pip install reportlab")
-        st.exception(e)
+    # Sin importar reportlab: solo se comprueba que esté instalada
+    if importlib.util.find_spec("reportlab") is None:
+        st.error("No se puede generar el PDF porque falta la librería 'reportlab'. Instálala con: pip install reportlab")
+        return
+
+    # El PDF se construye al hacer clic (en otro hilo, sin volver a ejecutar la página)
+    # y se reutiliza mientras `datos` no cambie
+    st.download_button("Generar reporte PDF", data=partial(construir_pdf_cache, datos),
+                       file_name="reporte_simulador.pdf", mime="application/pdf", on_click="ignore")
+
+
+def _medir_reporte(n_ejecuciones):
+    """Costo por ejecución de la parte del PDF: construirlo siempre, memoizado y bajo demanda."""
+    import sys
+    import time
+
+    datos = {
+        'monto_inicial': 5000.0, 'aporte_periodico': 200.0, 'frecuencia_aporte': "Mensual", 'tea': 8.0,
+        'saldo_bruto': 502440.24, 'total_aportado': 89000.0, 'interes_total': 413440.24,
+        'tipo_inversion': "BVL - Bolsa local", 'tasa_impuesto': 0.05, 'saldo_neto': 481768.22,
+        'monto_impuesto': 20672.01, 'ganancia': 413440.24, 'tasa_retorno': 0.06, 'años_retiro': 20,
+        'pension_mensual': 3179.46, 'total_recibido': 763070.4, 'vitalicia': None,
+        'escenarios': [{'Ranking': i, 'Edad de retiro': 60 + i, 'Tasa de retorno (%)': 5.0, 'Años de jubilación': 20,
+                        'Pensión mensual': 3000.0 + i} for i in range(1, 6)],
+        'n_escenarios': 5,
+        'bono_params': {'valor_nominal': 1000.0, 'tasa_cupon': 5.0, 'frecuencia': "Semestral", 'tasa_tea': 6.0,
+                        'anios': 5},
+        'bono_vp': 957.88,
+        'bono_riesgo': {'duracion_macaulay': 4.535, 'duracion_modificada': 4.278, 'convexidad': 23.41},
+    }
+
+    def medir(funcion):
+        inicio = time.perf_counter()
+        for _ in range(n_ejecuciones):
+            funcion()
+        return (time.perf_counter() - inicio) * 1000 / n_ejecuciones
+
+    inicio = time.perf_counter()
+    construir_pdf(datos)
+    primera = (time.perf_counter() - inicio) * 1000
+    print(f"reportlab importado: {'reportlab' in sys.modules} · primer PDF (con el import): {primera:,.1f} ms")
+    print(f"{'ms por ejecución':>45}")
+    print(f"{'construir el PDF en cada ejecución':<36} {medir(lambda: construir_pdf(datos)):>8,.3f}")
+    print(f"{'PDF memoizado en cada ejecución':<36} {medir(lambda: construir_pdf_cache(datos)):>8,.3f}")
+    print(f"{'bajo demanda (solo el callable)':<36} {medir(lambda: partial(construir_pdf_cache, datos)):>8,.3f}")
+
+
+if __name__ == "__main__":
+    import sys
+
+    _medir_reporte(int(next((a for a in sys.argv[1:] if a.isdigit()), 200)))
@@ -0,0 +1 @@
+"""Servicio HTTP JSON sobre el núcleo de cálculo (ver `servicio.api`)."""
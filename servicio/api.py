@@ -0,0 +1,373 @@
+"""
+API HTTP JSON local para los Módulos A, B1, B2 y C.
+
+Uso:
+    python -m servicio.api --puerto 8080 --trabajadores 4
+
+Endpoints (POST con un objeto JSON, o {"lote": [objetos...]} para varios a la vez):
+    /api/cartera      Módulo A: saldo final, total aportado e intereses
+    /api/saldo-neto   Módulo B1: saldo neto después de impuestos
+    /api/pension      Módulo B2: pensión mensual
+    /api/bono         Módulo C: valor presente de un bono
+GET:
+    /api/metricas     Histograma de latencias por endpoint
+    /api/salud        Comprobación de vida
+
+Los cálculos se ejecutan en un pool de procesos para no bloquear el bucle de eventos.
+Las peticiones individuales que llegan casi a la vez al mismo endpoint se agrupan
+y se evalúan en una sola llamada vectorizada.
+"""
+import argparse
+import asyncio
+import bisect
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from aiohttp import web
+
+from nucleo.bonos import OPCIONES_FRECUENCIA, valorar_cartera_bonos
+from nucleo.cartera import FRECUENCIAS, _validar_parametros_cartera, simular_cartera_lote
+from nucleo.impuestos import calcular_saldo_neto, obtener_tasa_impuesto
+from nucleo.paralelo import obtener_n_trabajadores
+from nucleo.pension import calcular_pension
+
+
+# ============ CÁLCULOS POR LOTE (se ejecutan en el pool de procesos) ============
+
+def _columnas(filas, nombre, dtype=float):
+    return np.array([f[nombre] for f in filas], dtype=dtype)
+
+
+def _filas(**columnas):
+    """Convierte columnas de arreglos en una lista de diccionarios con floats de Python."""
+    nombres = list(columnas)
+    return [dict(zip(nombres, valores)) for valores in zip(*(np.asarray(c).tolist() for c in columnas.values()))]
+
+
+def _lote_cartera(filas):
+    resumen = simular_cartera_lote(
+        monto_inicial=_columnas(filas, 'monto_inicial'),
+        aporte_periodico=_columnas(filas, 'aporte_periodico'),
+        frecuencia=_columnas(filas, 'frecuencia', str),
+        tea=_columnas(filas, 'tea'),
+        edad_actual=_columnas(filas, 'edad_actual', int),
+        edad_jubilacion=_columnas(filas, 'edad_jubilacion', int)
+    )
+    return _filas(**resumen._asdict())
+
+
+def _lote_saldo_neto(filas):
+    tasa_impuesto = _columnas(filas, 'tasa_impuesto')
+    resultado = calcular_saldo_neto(_columnas(filas, 'saldo_bruto'), _columnas(filas, 'aportes_totales'), tasa_impuesto)
+    return _filas(tasa_impuesto=tasa_impuesto, **resultado._asdict())
+
+
+def _lote_pension(filas):
+    resultado = calcular_pension(
+        _columnas(filas, 'saldo_neto'),
+        _columnas(filas, 'tasa_retorno') / 100,
+        _columnas(filas, 'años_retiro', int),
+        _columnas(filas, 'tasa_impuesto')
+    )
+    return _filas(**resultado._asdict())
+
+
+def _lote_bono(filas):
+    valor_presente = valorar_cartera_bonos(
+        _columnas(filas, 'valor_nominal'),
+        _columnas(filas, 'tasa_cupon'),
+        _columnas(filas, 'frecuencia', str),
+        _columnas(filas, 'tasa_tea'),
+        _columnas(filas, 'anios', int)
+    )
+    return _filas(valor_presente=valor_presente)
+
+
+# ============ VALIDACIÓN (mismos mensajes que la interfaz) ============
+
+def _campo(datos, nombre, tipo=float, defecto=None):
+    if nombre not in datos:
+        if defecto is not None:
+            return defecto
+        raise ValueError(f"Falta el campo '{nombre}'")
+    try:
+        valor = tipo(datos[nombre])
+    except (TypeError, ValueError):
+        raise ValueError(f"El campo '{nombre}' no es válido")
+    if tipo is float and not np.isfinite(valor):
+        raise ValueError(f"El campo '{nombre}' no es válido")
+    return valor
+
+
+def validar_cartera(datos):
+    fila = {
+        'monto_inicial': _campo(datos, 'monto_inicial'),
+        'aporte_periodico': _campo(datos, 'aporte_periodico'),
+        'frecuencia': _campo(datos, 'frecuencia', str),
+        'tea': _campo(datos, 'tea'),
+        'edad_actual': _campo(datos, 'edad_actual', int),
+        'edad_jubilacion': _campo(datos, 'edad_jubilacion', int),
+    }
+    if fila['frecuencia'] not in FRECUENCIAS:
+        raise ValueError(f"Frecuencia no válida: {fila['frecuencia']}")
+    if fila['monto_inicial'] == 0 and fila['aporte_periodico'] == 0:
+        raise ValueError("Debes ingresar al menos un monto inicial o un aporte periódico.")
+    _validar_parametros_cartera(fila['monto_inicial'], fila['aporte_periodico'], fila['tea'],
+                                fila['edad_actual'], fila['edad_jubilacion'])
+    return fila
+
+
+def validar_saldo_neto(datos):
+    fila = {
+        'saldo_bruto': _campo(datos, 'saldo_bruto'),
+        'aportes_totales': _campo(datos, 'aportes_totales'),
+        'tasa_impuesto': obtener_tasa_impuesto(_campo(datos, 'tipo_inversion', str, "BVL")),
+    }
+    if fila['saldo_bruto'] < 0 or fila['aportes_totales'] < 0:
+        raise ValueError("Los montos no pueden ser negativos")
+    return fila
+
+
+def validar_pension(datos):
+    fila = {
+        'saldo_neto': _campo(datos, 'saldo_neto'),
+        'tasa_retorno': _campo(datos, 'tasa_retorno'),
+        'años_retiro': _campo(datos, 'años_retiro', int),
+        'tasa_impuesto': obtener_tasa_impuesto(_campo(datos, 'tipo_inversion', str, "BVL")),
+    }
+    if fila['saldo_neto'] < 0:
+        raise ValueError("Los montos no pueden ser negativos")
+    if fila['tasa_retorno'] < 0:
+        raise ValueError("La tasa de retorno no puede ser negativa")
+    if fila['años_retiro'] < 1:
+        raise ValueError("Los años de jubilación deben ser al menos 1")
+    return fila
+
+
+def validar_bono(datos):
+    fila = {
+        'valor_nominal': _campo(datos, 'valor_nominal'),
+        'tasa_cupon': _campo(datos, 'tasa_cupon'),
+        'frecuencia': _campo(datos, 'frecuencia', str),
+        'tasa_tea': _campo(datos, 'tasa_tea'),
+        'anios': _campo(datos, 'anios', int),
+    }
+    if fila['frecuencia'] not in OPCIONES_FRECUENCIA:
+        raise ValueError(f"Frecuencia no válida: {fila['frecuencia']}")
+    if min(fila['valor_nominal'], fila['tasa_cupon'], fila['tasa_tea']) < 0 or fila['anios'] < 1:
+        raise ValueError("Los montos y tasas no pueden ser negativos y el plazo debe ser de al menos 1 año")
+    if fila['valor_nominal'] == 0 or fila['tasa_cupon'] == 0 or fila['tasa_tea'] == 0:
+        raise ValueError("Debes ingresar todos los datos para realizar el cálculo.")
+    return fila
+
+
+# Endpoint -> (validación de una fila, cálculo vectorizado de un lote)
+ENDPOINTS = {
+    'cartera': (validar_cartera, _lote_cartera),
+    'saldo-neto': (validar_saldo_neto, _lote_saldo_neto),
+    'pension': (validar_pension, _lote_pension),
+    'bono': (validar_bono, _lote_bono),
+}
+
+
+# ============ AGRUPACIÓN DE PETICIONES ============
+
+class AgrupadorPeticiones:
+    """
+    Junta las filas que llegan casi a la vez y las evalúa en una sola llamada
+    al pool: se envía el lote cuando alcanza `max_lote` filas o cuando pasan
+    `espera` segundos desde la primera fila pendiente.
+    """
+
+    def __init__(self, funcion, pool, max_lote=256, espera=0.002):
+        self.funcion = funcion
+        self.pool = pool
+        self.max_lote = max_lote
+        self.espera = espera
+        self._pendientes = []
+        self._temporizador = None
+
+    async def evaluar(self, fila):
+        loop = asyncio.get_running_loop()
+        futuro = loop.create_future()
+        self._pendientes.append((fila, futuro))
+        if len(self._pendientes) >= self.max_lote:
+            self._enviar()
+        elif self._temporizador is None:
+            self._temporizador = loop.call_later(self.espera, self._enviar)
+        return await futuro
+
+    def _enviar(self):
+        if self._temporizador is not None:
+            self._temporizador.cancel()
+            self._temporizador = None
+        pendientes, self._pendientes = self._pendientes, []
+        if pendientes:
+            asyncio.ensure_future(self._resolver(pendientes))
+
+    async def _resolver(self, pendientes):
+        loop = asyncio.get_running_loop()
+        try:
+            resultados = await loop.run_in_executor(self.pool, self.funcion, [f for f, _ in pendientes])
+        except Exception as e:
+            for _, futuro in pendientes:
+                if not futuro.done():
+                    futuro.set_exception(e)
+            return
+        for (_, futuro), resultado in zip(pendientes, resultados):
+            if not futuro.done():
+                futuro.set_result(resultado)
+
+
+# ============ MÉTRICAS ============
+
+class HistogramaLatencia:
+    """Histograma de latencias con cubetas fijas en milisegundos."""
+
+    LIMITES_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+    def __init__(self):
+        self.conteos = [0] * (len(self.LIMITES_MS) + 1)
+        self.total = 0
+        self.suma_ms = 0.0
+
+    def registrar(self, milisegundos):
+        self.conteos[bisect.bisect_left(self.LIMITES_MS, milisegundos)] += 1
+        self.total += 1
+        self.suma_ms += milisegundos
+
+    def percentil(self, p):
+        """Límite superior de la cubeta que contiene el percentil `p` (aproximado)."""
+        if self.total == 0:
+            return None
+        objetivo = p / 100 * self.total
+        acumulado = 0
+        for limite, conteo in zip(self.LIMITES_MS + (float('inf'),), self.conteos):
+            acumulado += conteo
+            if acumulado >= objetivo:
+                return limite
+        return float('inf')
+
+    def resumen(self):
+        etiquetas = [f"<={l}ms" for l in self.LIMITES_MS] + [f">{self.LIMITES_MS[-1]}ms"]
+        return {
+            'conteo': self.total,
+            'media_ms': self.suma_ms / self.total if self.total else None,
+            'p50_ms': self.percentil(50),
+            'p95_ms': self.percentil(95),
+            'p99_ms': self.percentil(99),
+            'cubetas': dict(zip(etiquetas, self.conteos)),
+        }
+
+
+# ============ APLICACIÓN ============
+
+def _error(mensaje, estado=400, **extra):
+    return web.json_response({'error': mensaje, **extra}, status=estado)
+
+
+def _crear_manejador(nombre):
+    validar, calcular = ENDPOINTS[nombre]
+
+    async def manejar(request):
+        try:
+            datos = await request.json()
+        except ValueError:
+            return _error("El cuerpo debe ser JSON válido")
+
+        if isinstance(datos, dict) and 'lote' in datos:
+            if not isinstance(datos['lote'], list):
+                return _error("'lote' debe ser una lista de objetos")
+            filas = []
+            for indice, item in enumerate(datos['lote']):
+                try:
+                    filas.append(validar(item if isinstance(item, dict) else {}))
+                except ValueError as e:
+                    return _error(str(e), indice=indice)
+            loop = asyncio.get_running_loop()
+            resultados = await loop.run_in_executor(request.app['pool'], calcular, filas) if filas else []
+            return web.json_response({'resultados': resultados})
+
+        if not isinstance(datos, dict):
+            return _error("El cuerpo debe ser un objeto JSON")
+        try:
+            fila = validar(datos)
+        except ValueError as e:
+            return _error(str(e))
+        return web.json_response(await request.app['agrupadores'][nombre].evaluar(fila))
+
+    return manejar
+
+
+@web.middleware
+async def _medir_latencia(request, handler):
+    inicio = time.perf_counter()
+    try:
+        return await handler(request)
+    finally:
+        histogramas = request.app['latencias']
+        ruta = request.match_info.route.resource.canonical if request.match_info.route.resource else 'otros'
+        histogramas.setdefault(ruta, HistogramaLatencia()).registrar((time.perf_counter() - inicio) * 1000)
+
+
+async def _metricas(request):
+    return web.json_response({ruta: h.resumen() for ruta, h in sorted(request.app['latencias'].items())})
+
+
+async def _salud(request):
+    return web.json_response({'estado': 'ok'})
+
+
+def crear_app(n_trabajadores=None, max_lote=256, espera_lote=0.002):
+    """
+    Construye la aplicación aiohttp.
+
+    Parámetros:
+    -----------
+    n_trabajadores : int, opcional
+        Procesos del pool de cálculo (ver `obtener_n_trabajadores`)
+    max_lote : int
+        Máximo de peticiones individuales agrupadas en una llamada
+    espera_lote : float
+        Segundos que se espera a otras peticiones antes de enviar un lote
+    """
+    app = web.Application(middlewares=[_medir_latencia])
+    app['latencias'] = {}
+
+    async def iniciar_pool(app):
+        app['pool'] = ProcessPoolExecutor(max_workers=obtener_n_trabajadores(n_trabajadores))
+        app['agrupadores'] = {
+            nombre: AgrupadorPeticiones(calcular, app['pool'], max_lote, espera_lote)
+            for nombre, (_, calcular) in ENDPOINTS.items()
+        }
+
+    async def cerrar_pool(app):
+        app['pool'].shutdown(wait=True, cancel_futures=True)
+
+    app.on_startup.append(iniciar_pool)
+    app.on_cleanup.append(cerrar_pool)
+
+    for nombre in ENDPOINTS:
+        app.router.add_post(f'/api/{nombre}', _crear_manejador(nombre))
+    app.router.add_get('/api/metricas', _metricas)
+    app.router.add_get('/api/salud', _salud)
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m servicio.api", description="API HTTP JSON del simulador.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8080)
+    parser.add_argument("--trabajadores", type=int, default=None,
+                        help="Procesos de cálculo (por defecto SIMULADOR_TRABAJADORES o todos los núcleos)")
+    parser.add_argument("--max-lote", type=int, default=256, help="Peticiones agrupadas por llamada al pool")
+    parser.add_argument("--espera-lote-ms", type=float, default=2.0,
+                        help="Milisegundos de espera para agrupar peticiones")
+    args = parser.parse_args(argv)
+    web.run_app(crear_app(args.trabajadores, args.max_lote, args.espera_lote_ms / 1000),
+                host=args.host, port=args.puerto)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Prueba de carga local para `servicio.api`.
+
+Uso:
+    python -m servicio.carga --iniciar --peticiones 5000 --concurrencia 64
+    python -m servicio.carga --url http://127.0.0.1:8080 --endpoint pension
+
+Con --iniciar se levanta el servicio en un subproceso en un puerto libre y se
+detiene al terminar, así que no hace falta nada más que esta máquina.
+"""
+import argparse
+import asyncio
+import random
+import socket
+import subprocess
+import sys
+import time
+
+import aiohttp
+import numpy as np
+
+
+def _cuerpo(endpoint, rng):
+    """Genera una petición válida y aleatoria para el endpoint."""
+    if endpoint == 'cartera':
+        edad = rng.randint(18, 60)
+        return {'monto_inicial': rng.uniform(0, 50000), 'aporte_periodico': rng.uniform(50, 1000),
+                'frecuencia': rng.choice(["Mensual", "Trimestral", "Semestral", "Anual"]),
+                'tea': rng.uniform(0, 15), 'edad_actual': edad, 'edad_jubilacion': edad + rng.randint(1, 40)}
+    if endpoint == 'saldo-neto':
+        aportes = rng.uniform(1000, 200000)
+        return {'saldo_bruto': aportes * rng.uniform(1, 5), 'aportes_totales': aportes,
+                'tipo_inversion': rng.choice(["BVL", "BEX"])}
+    if endpoint == 'pension':
+        return {'saldo_neto': rng.uniform(10000, 1e6), 'tasa_retorno': rng.uniform(0, 10),
+                'años_retiro': rng.randint(5, 40), 'tipo_inversion': rng.choice(["BVL", "BEX", "Sin impuesto"])}
+    return {'valor_nominal': 1000, 'tasa_cupon': rng.uniform(1, 10), 'frecuencia': rng.choice(["Anual", "Semestral", "Mensual"]),
+            'tasa_tea': rng.uniform(1, 12), 'anios': rng.randint(1, 30)}
+
+
+async def _ejecutar(url, endpoints, peticiones, concurrencia, semilla):
+    rng = random.Random(semilla)
+    trabajos = [(e, _cuerpo(e, rng)) for e in (rng.choice(endpoints) for _ in range(peticiones))]
+    latencias = []
+    errores = 0
+    cola = asyncio.Queue()
+    for trabajo in trabajos:
+        cola.put_nowait(trabajo)
+
+    async def cliente(sesion):
+        nonlocal errores
+        while not cola.empty():
+            endpoint, cuerpo = cola.get_nowait()
+            inicio = time.perf_counter()
+            async with sesion.post(f"{url}/api/{endpoint}", json=cuerpo) as respuesta:
+                await respuesta.read()
+                if respuesta.status != 200:
+                    errores += 1
+            latencias.append((time.perf_counter() - inicio) * 1000)
+
+    conector = aiohttp.TCPConnector(limit=concurrencia)
+    async with aiohttp.ClientSession(connector=conector) as sesion:
+        inicio = time.perf_counter()
+        await asyncio.gather(*(cliente(sesion) for _ in range(concurrencia)))
+        duracion = time.perf_counter() - inicio
+        async with sesion.get(f"{url}/api/metricas") as respuesta:
+            metricas = await respuesta.json()
+    return np.array(latencias), errores, duracion, metricas
+
+
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _esperar_servicio(url, proceso, limite=30):
+    import urllib.request
+    fin = time.time() + limite
+    while time.time() < fin:
+        if proceso.poll() is not None:
+            raise SystemExit("El servicio terminó antes de estar listo")
+        try:
+            urllib.request.urlopen(f"{url}/api/salud", timeout=1)
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise SystemExit("El servicio no respondió a tiempo")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m servicio.carga", description="Prueba de carga del servicio API.")
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("--endpoint", choices=["cartera", "saldo-neto", "pension", "bono", "todos"], default="todos")
+    parser.add_argument("--peticiones", type=int, default=2000)
+    parser.add_argument("--concurrencia", type=int, default=64)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--iniciar", action="store_true", help="Levanta el servicio local en un subproceso")
+    parser.add_argument("--trabajadores", type=int, default=None, help="Procesos del servicio (con --iniciar)")
+    args = parser.parse_args(argv)
+
+    endpoints = ["cartera", "saldo-neto", "pension", "bono"] if args.endpoint == "todos" else [args.endpoint]
+    proceso = None
+    url = args.url
+    if args.iniciar:
+        puerto = _puerto_libre()
+        url = f"http://127.0.0.1:{puerto}"
+        comando = [sys.executable, "-m", "servicio.api", "--puerto", str(puerto)]
+        if args.trabajadores:
+            comando += ["--trabajadores", str(args.trabajadores)]
+        proceso = subprocess.Popen(comando, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        _esperar_servicio(url, proceso)
+
+    try:
+        latencias, errores, duracion, metricas = asyncio.run(
+            _ejecutar(url, endpoints, args.peticiones, args.concurrencia, args.semilla)
+        )
+    finally:
+        if proceso is not None:
+            proceso.terminate()
+            proceso.wait()
+
+    print(f"Peticiones: {len(latencias):,}  errores: {errores}  duración: {duracion:.2f} s  "
+          f"rendimiento: {len(latencias) / duracion:,.0f} pet/s")
+    p50, p95, p99 = np.percentile(latencias, [50, 95, 99])
+    print(f"Latencia cliente (ms): p50={p50:.1f}  p95={p95:.1f}  p99={p99:.1f}  máx={latencias.max():.1f}")
+    print("Latencia servidor (ms, según /api/metricas):")
+    for ruta, m in metricas.items():
+        print(f"  {ruta:<18} n={m['conteo']:<7} p50<={m['p50_ms']}  p95<={m['p95_ms']}  p99<={m['p99_ms']}")
+    return 0 if errores == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,23 @@
+import numpy as np
+
+from nucleo.bonos import calcular_rendimiento, precio_bono, valorar_bono, valorar_cartera_bonos
+
+
+def test_precio_rendimiento_precio_con_años_fraccionarios():
+    # Los años no enteros se truncan al mismo número de cupones en todas las rutas
+    valor_nominal = np.array([1000.0, 1000.0, 500.0, 2000.0])
+    tasa_cupon = np.array([5.0, 0.0, 8.0, 3.5])
+    frecuencia = np.array(["Semestral", "Anual", "Trimestral", "Mensual"])
+    tasa_tea = np.array([6.0, 4.0, 12.0, 2.5])
+    anios = np.array([10.3, 7.9, 3.6, 25.05])
+
+    precio = valorar_cartera_bonos(valor_nominal, tasa_cupon, frecuencia, tasa_tea, anios)
+    np.testing.assert_allclose(precio_bono(valor_nominal, tasa_cupon, frecuencia, tasa_tea, anios), precio)
+    assert np.isclose(valorar_bono(1000, 5, 2, 6.0, 10.3).valor_presente, precio[0])
+
+    rendimiento = calcular_rendimiento(precio, valor_nominal, tasa_cupon, frecuencia, anios)
+    assert rendimiento.convergido.all()
+    np.testing.assert_allclose(rendimiento.tea, tasa_tea, rtol=1e-8)
+    np.testing.assert_allclose(
+        valorar_cartera_bonos(valor_nominal, tasa_cupon, frecuencia, rendimiento.tea, anios), precio, rtol=1e-9
+    )